@@ -6,6 +6,119 @@ class Settings(BaseSettings):
     finnhub_api_key: str = ""
     debug: bool = False
 
+    # Deployment role: which API routers this process mounts -- "scam",
+    # "signals" (analysis, signals, sentiment) or "all".  Health and metrics
+    # are always mounted; routers of other roles are never imported.
+    service_role: str = "scam"
+    # Spawn indicator worker processes (and their pandas imports) during
+    # startup rather than on the first signal request
+    warm_up_on_startup: bool = False
+
+    # Shared Anthropic client pool (empty base URL = the public API; point it
+    # at a local stub for load tests)
+    anthropic_base_url: str = ""
+    anthropic_max_connections: int = 100
+    anthropic_max_keepalive_connections: int = 20
+    anthropic_keepalive_expiry: float = 30.0
+    anthropic_connect_timeout: float = 5.0
+    anthropic_read_timeout: float = 60.0
+    anthropic_max_retries: int = 2
+    anthropic_shutdown_grace: float = 10.0
+
+    # Cache tier shared by every worker on the host, behind the in-process
+    # scam, signal, LLM and sentiment caches (a SQLite file in WAL mode, e.g.
+    # var/cache.sqlite3; empty keeps every cache per process)
+    shared_cache_path: str = ""
+    shared_cache_max_entries: int = 200_000
+    # Lookups run on the event loop, so they wait at most this long for a
+    # lock held by another worker and otherwise count as a miss
+    shared_cache_busy_timeout: float = 0.005
+
+    # Scam analysis response cache
+    scam_cache_enabled: bool = True
+    scam_cache_max_entries: int = 10_000
+    scam_cache_ttl: float = 3600.0
+
+    # Near-duplicate verdict reuse for scam analysis
+    scam_near_duplicate_enabled: bool = True
+    scam_near_duplicate_threshold: float = 0.8
+    scam_near_duplicate_max_entries: int = 5_000
+
+    # Batch scam analysis
+    scam_batch_max_items: int = 500
+    scam_batch_group_size: int = 8
+    scam_batch_concurrency: int = 4
+
+    # Rule-based scam scorer (empty path = bundled app/data/scam_rules.json)
+    scam_rules_path: str = ""
+
+    # Tiered triage: rules settle clear-cut messages, the LLM sees the rest
+    scam_triage_enabled: bool = False
+    scam_triage_benign_max_score: int = 15
+    scam_triage_critical_min_score: int = 87
+
+    # Requests served from the candle store are analysed over the symbol's
+    # whole stored history, kept up to date incrementally per symbol (only
+    # without pandas-ta, whose values the incremental state does not match)
+    incremental_indicators: bool = False
+    indicator_state_max_symbols: int = 1024
+
+    # Local memory-mapped candle store ("yfinance" or "offline" fetcher)
+    candle_store_dir: str = "var/candles"
+    candle_fetcher: str = "yfinance"
+    candle_backfill_period: str = "3mo"
+    candle_refresh_interval: float = 900.0
+    candle_window: int = 63
+
+    # Executors for blocking work (indicator_executor: process, thread or inline)
+    io_executor_workers: int = 16
+    io_executor_queue: int = 64
+    io_task_timeout: float = 30.0
+    indicator_executor: str = "process"
+    indicator_executor_workers: int = 2
+    indicator_executor_queue: int = 64
+    indicator_task_timeout: float = 10.0
+    loop_lag_interval: float = 0.1
+
+    # Signal generation caches (signals, indicators and LLM layers)
+    signal_cache_enabled: bool = True
+    signal_cache_max_entries: int = 2_048
+    signal_cache_ttl: float = 30.0
+
+    # Upstream concurrency limits shared by all signal requests
+    market_data_concurrency: int = 8
+    llm_concurrency: int = 8
+
+    # Symbols per batched deep-analysis request in multi-symbol generation
+    llm_batch_size: int = 8
+
+    # Fast decisions: skip the LLM when technicals and sentiment alone put
+    # the weighted score past this threshold (optionally enrich afterwards).
+    # The LLM could still have pulled such a signal back to HOLD (never to the
+    # opposite side); 0.65 (decision threshold + LLM weight) rules that out.
+    fast_decision_enabled: bool = False
+    fast_decision_threshold: float = 0.3
+    fast_decision_enrich: bool = False
+
+    # Per-article sentiment cache (persisted and shared across workers in the
+    # shared cache tier; a path here gives it a SQLite file of its own)
+    sentiment_cache_enabled: bool = True
+    sentiment_cache_max_entries: int = 50_000
+    sentiment_cache_ttl: float = 86_400.0
+    sentiment_cache_path: str = ""
+
+    # Large article lists are split into chunks of at most this many
+    # estimated input tokens / articles, classified concurrently
+    sentiment_chunk_token_budget: int = 2_000
+    sentiment_chunk_max_articles: int = 25
+    sentiment_concurrency: int = 4
+
+    # Streamed multi-symbol scans (POST /signals/scan)
+    scan_max_symbols: int = 5_000
+    scan_concurrency: int = 32
+    # Seconds a scan stays cancellable by id before its stream starts
+    scan_start_timeout: float = 60.0
+
     class Config:
         env_file = ".env"
 
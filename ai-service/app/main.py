@@ -1,14 +1,79 @@
 """FastAPI application entry point for the Kohlcorp Shield AI Service."""
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import importlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from .services.startup_profile import startup_profile
+
+with startup_profile.phase("import fastapi"):
+    from fastapi import APIRouter, FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+with startup_profile.phase("import core services"):
+    from .config import settings
+    from .routers import health, metrics
+    from .services.anthropic_pool import client_registry
+    from .services.executors import executors
+    from .services.metrics import MetricsMiddleware
+    from .services.shared_cache import close_backends
+
+# API routers mounted for each ``settings.service_role``.  Only these are
+# imported, so a scam-only worker never loads pandas, pandas-ta or numba.
+ROLE_ROUTERS = {
+    "scam": ("scam",),
+    "signals": ("analysis", "signals", "sentiment"),
+    "all": ("scam", "analysis", "signals", "sentiment"),
+}
+
+
+def _role_routers(role: str) -> dict[str, APIRouter]:
+    """Import the router modules of *role*, timing each import."""
+    if role not in ROLE_ROUTERS:
+        raise ValueError(
+            f"Unknown service_role {role!r}; expected one of {', '.join(ROLE_ROUTERS)}."
+        )
+    routers = {}
+    for name in ROLE_ROUTERS[role]:
+        with startup_profile.phase(f"import routers.{name}"):
+            routers[name] = importlib.import_module(f".routers.{name}", __package__).router
+    return routers
+
+
+role_routers = _role_routers(settings.service_role)
+
+
+# ---------------------------------------------------------------------------
+# Lifespan: shared resources created once per process
+# ---------------------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Open the shared Anthropic client pool and executors; close them on exit.
+
+    With ``warm_up_on_startup``, indicator worker processes are spawned here
+    for roles that serve signals.  The time of each step is recorded in the
+    startup profile (``/health/startup``).
+    """
+    with startup_profile.phase("anthropic client pool"):
+        await client_registry.startup()
+    with startup_profile.phase("executors"):
+        await executors.startup(
+            prewarm=settings.warm_up_on_startup and "analysis" in role_routers
+        )
+    startup_profile.ready()
+    try:
+        yield
+    finally:
+        await executors.shutdown()
+        await client_registry.shutdown()
+        close_backends()
 
-from .routers import health, scam
 
 app = FastAPI(
     title="Kohlcorp Shield AI Service",
     version="2.0.0",
     description="Microservice for scam analysis and consumer protection.",
+    lifespan=lifespan,
 )
 
 # ---------------------------------------------------------------------------
@@ -22,11 +87,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latency and in-flight counts per route, exported at /metrics.
+app.add_middleware(MetricsMiddleware)
+
 # ---------------------------------------------------------------------------
 # Include routers
 # ---------------------------------------------------------------------------
-app.include_router(scam.router)
+for router in role_routers.values():
+    app.include_router(router)
 app.include_router(health.router)
+app.include_router(metrics.router)
 
 
 # ---------------------------------------------------------------------------
@@ -1,6 +1,6 @@
 """Pydantic models for request/response schemas."""
 
-from typing import Optional
+from typing import Literal, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -15,6 +15,25 @@ class CandleData(BaseModel):
     volume: float = Field(..., description="Trading volume")
 
 
+class CandleColumns(BaseModel):
+    """Columnar candle history: one parallel array per field.
+
+    With ``encoding="json"`` each column is a JSON array.  With
+    ``encoding="f64le"`` each column is a base64 string of little-endian
+    values -- int64 for ``time``, float64 for the others.
+    """
+
+    encoding: Literal["json", "f64le"] = Field(
+        "json", description="Column encoding: json arrays or base64 little-endian buffers"
+    )
+    time: Union[list[int], str] = Field(..., description="Unix timestamps")
+    open: Union[list[float], str] = Field(..., description="Opening prices")
+    high: Union[list[float], str] = Field(..., description="High prices")
+    low: Union[list[float], str] = Field(..., description="Low prices")
+    close: Union[list[float], str] = Field(..., description="Closing prices")
+    volume: Union[list[float], str] = Field(..., description="Trading volumes")
+
+
 class AnalyzeRequest(BaseModel):
     """Request body for single stock analysis."""
 
@@ -22,6 +41,10 @@ class AnalyzeRequest(BaseModel):
     candles: list[CandleData] = Field(
         default_factory=list, description="Historical candle data"
     )
+    columns: Optional[CandleColumns] = Field(
+        None,
+        description="Columnar candle data; takes precedence over candles when set",
+    )
 
 
 class SignalResponse(BaseModel):
@@ -50,6 +73,13 @@ class SignalResponse(BaseModel):
     stop_loss: Optional[float] = Field(
         None, description="Suggested stop loss level"
     )
+    decision_path: Literal["llm", "fast", "enriched", "error"] = Field(
+        "llm",
+        description=(
+            "What produced the signal: the full LLM path, a fast local "
+            "decision, a fast decision later enriched by the LLM, or an error"
+        ),
+    )
 
 
 class ArticleInput(BaseModel):
@@ -87,9 +117,220 @@ class HealthResponse(BaseModel):
     uptime: float = Field(..., description="Uptime in seconds")
 
 
+class LLMPoolStats(BaseModel):
+    """Occupancy of the shared Anthropic HTTP connection pool."""
+
+    configured: bool = Field(..., description="Whether an Anthropic API key is set")
+    active: bool = Field(..., description="Whether the pooled client has been created")
+    in_flight: int = Field(..., description="Requests currently awaiting a response")
+    peak_in_flight: int = Field(..., description="Highest concurrent in-flight count")
+    total_requests: int = Field(..., description="Requests sent since the pool opened")
+    open_connections: int = Field(..., description="Connections currently held by the pool")
+    idle_connections: int = Field(..., description="Keep-alive connections ready for reuse")
+    max_connections: int = Field(..., description="Configured connection limit")
+    max_keepalive_connections: int = Field(
+        ..., description="Configured keep-alive connection limit"
+    )
+
+
+class LLMEndpointUsage(BaseModel):
+    """Token and prompt-cache usage of one LLM call site."""
+
+    calls: int = Field(..., description="Calls that returned a response")
+    cache_hits: int = Field(..., description="Calls that read their prefix from the prompt cache")
+    input_tokens: int = Field(..., description="Uncached input tokens")
+    output_tokens: int = Field(..., description="Output tokens")
+    cache_read_input_tokens: int = Field(..., description="Input tokens read from the prompt cache")
+    cache_creation_input_tokens: int = Field(
+        ..., description="Input tokens written to the prompt cache"
+    )
+    cache_read_ratio: float = Field(
+        ..., description="Share of all prompt tokens served from the cache"
+    )
+    avg_latency_ms_cached: float = Field(..., description="Mean latency of cache-hit calls")
+    avg_latency_ms_uncached: float = Field(..., description="Mean latency of other calls")
+
+
+class LLMUsageStats(BaseModel):
+    """Per-endpoint LLM usage since the process started."""
+
+    endpoints: dict[str, LLMEndpointUsage]
+
+
+class StructuredOutputEndpointStats(BaseModel):
+    """Tool-use output validation counters of one LLM call site."""
+
+    calls: int = Field(..., description="Responses validated")
+    no_tool_calls: int = Field(..., description="Responses without the requested tool call")
+    entries: int = Field(..., description="Entries expected (symbols, articles, messages)")
+    invalid_entries: int = Field(..., description="Entries missing or invalid on first reply")
+    repair_calls: int = Field(..., description="Repair prompts sent")
+    repaired_entries: int = Field(..., description="Entries fixed by a repair prompt")
+    failed_entries: int = Field(..., description="Entries left to the caller's fallback")
+    parse_failure_rate: float = Field(..., description="invalid_entries / entries")
+
+
+class StructuredOutputStats(BaseModel):
+    """Per-endpoint structured-output validation since the process started."""
+
+    endpoints: dict[str, StructuredOutputEndpointStats]
+
+
+class CacheStats(BaseModel):
+    """Counters for an in-process response cache."""
+
+    name: str = Field(..., description="Cache name")
+    enabled: bool = Field(..., description="Whether the cache is active")
+    shared: bool = Field(..., description="Whether a host-wide shared tier backs the cache")
+    size: int = Field(..., description="Entries currently cached")
+    maxsize: int = Field(..., description="Maximum number of entries")
+    ttl: float = Field(..., description="Entry time-to-live in seconds")
+    hits: int = Field(..., description="Lookups answered from the cache")
+    persistent_hits: int = Field(..., description="Lookups answered from the shared tier")
+    misses: int = Field(..., description="Lookups that started a computation")
+    coalesced: int = Field(
+        ..., description="Lookups that joined an identical in-flight computation"
+    )
+    errors: int = Field(..., description="Computations that failed and were not cached")
+    in_flight: int = Field(..., description="Computations currently running")
+    hit_rate: float = Field(
+        ..., description="(hits + persistent_hits + coalesced) / lookups"
+    )
+
+
+class NearDuplicateStats(BaseModel):
+    """Counters for a near-duplicate (MinHash/LSH) index."""
+
+    size: int = Field(..., description="Messages currently indexed")
+    maxsize: int = Field(..., description="Maximum number of indexed messages")
+    threshold: float = Field(..., description="Minimum similarity to reuse a verdict")
+    lookups: int = Field(..., description="Queries against the index")
+    matches: int = Field(..., description="Queries that reused a stored verdict")
+    match_rate: float = Field(..., description="matches / lookups")
+    avg_candidates: float = Field(
+        ..., description="Average LSH candidates compared per lookup"
+    )
+
+
+class TriageStats(BaseModel):
+    """Counters for rule-first scam triage."""
+
+    benign_max: int = Field(..., description="Rule scores at or below this are settled as benign")
+    critical_min: int = Field(
+        ..., description="Rule scores at or above this are settled as critical"
+    )
+    total: int = Field(..., description="Messages triaged")
+    decided_benign: int = Field(..., description="Messages settled as benign by rules")
+    decided_critical: int = Field(..., description="Messages settled as critical by rules")
+    escalated: int = Field(..., description="Ambiguous messages sent on to the LLM")
+    escalation_rate: float = Field(..., description="escalated / total")
+
+
+class CandleStoreStats(BaseModel):
+    """Counters of the local candle store."""
+
+    reads: int = Field(..., description="Window reads served")
+    fresh_hits: int = Field(..., description="Reads served without a refresh")
+    refreshes: int = Field(..., description="Refreshes attempted against the fetcher")
+    fetch_errors: int = Field(..., description="Refreshes whose fetch failed")
+    bars_appended: int = Field(..., description="Bars written to disk")
+
+
+class SentimentCacheStats(BaseModel):
+    """Counters of the per-article sentiment cache."""
+
+    enabled: bool = Field(..., description="Whether the cache is active")
+    persistent: bool = Field(..., description="Whether entries are also kept in SQLite")
+    size: int = Field(..., description="Entries held in memory")
+    maxsize: int = Field(..., description="Maximum entries in memory")
+    ttl: float = Field(..., description="Entry time-to-live in seconds")
+    hits: int = Field(..., description="Articles answered from memory")
+    persistent_hits: int = Field(..., description="Articles answered from the SQLite file")
+    misses: int = Field(..., description="Articles sent to the model")
+    hit_rate: float = Field(..., description="(hits + persistent_hits) / lookups")
+
+
+class SignalCacheStats(BaseModel):
+    """Per-layer cache counters of the signal generator."""
+
+    signals: CacheStats
+    candles: CandleStoreStats
+    indicators: CacheStats
+    llm: CacheStats
+    sentiment: SentimentCacheStats
+    decision_paths: dict[str, int] = Field(
+        ..., description="Signals computed per decision path (llm, fast, enriched)"
+    )
+
+
+class ExecutorPoolStats(BaseModel):
+    """Occupancy and outcome counters of one executor pool."""
+
+    name: str = Field(..., description="Pool name")
+    kind: str = Field(..., description="thread, process or inline")
+    max_workers: int = Field(..., description="Worker threads or processes")
+    max_queue: int = Field(..., description="Tasks allowed to wait for a worker")
+    timeout: float = Field(..., description="Default per-task timeout in seconds")
+    pending: int = Field(..., description="Tasks running or queued")
+    peak_pending: int = Field(..., description="Highest pending count")
+    submitted: int = Field(..., description="Tasks submitted")
+    completed: int = Field(..., description="Tasks that returned a result")
+    failed: int = Field(..., description="Tasks that raised")
+    timeouts: int = Field(..., description="Tasks abandoned after their timeout")
+    rejected: int = Field(..., description="Tasks refused because the pool was full")
+
+
+class LoopLagStats(BaseModel):
+    """Event-loop wake-up delay over the recent sampling window."""
+
+    running: bool = Field(..., description="Whether the monitor is sampling")
+    interval_ms: float = Field(..., description="Sampling interval")
+    samples: int = Field(..., description="Samples in the window")
+    last_ms: float = Field(..., description="Most recent lag")
+    p50_ms: float = Field(..., description="Median lag")
+    p99_ms: float = Field(..., description="99th percentile lag")
+    max_ms: float = Field(..., description="Worst lag since start")
+
+
+class ExecutorStats(BaseModel):
+    """Executor pools and event-loop responsiveness."""
+
+    pools: list[ExecutorPoolStats]
+    loop_lag: LoopLagStats
+
+
+class StartupPhaseStats(BaseModel):
+    """One timed step of the process cold start."""
+
+    name: str = Field(..., description="Import or initialisation step")
+    seconds: float = Field(..., description="Wall time of the step")
+    modules_loaded: int = Field(..., description="Modules first imported during the step")
+    packages: list[str] = Field(..., description="Third-party packages first imported")
+
+
+class StartupStats(BaseModel):
+    """Import and initialisation cost of this process's cold start."""
+
+    ready: bool = Field(..., description="Whether startup has completed")
+    total_seconds: float = Field(..., description="From importing app.main to ready")
+    modules_loaded: int = Field(..., description="Modules loaded in the process")
+    phases: list[StartupPhaseStats]
+
+
 class SignalGenerateRequest(BaseModel):
     """Request body for generating signals for multiple symbols."""
 
     symbols: list[str] = Field(
         ..., description="List of stock ticker symbols", examples=[["AAPL", "MSFT"]]
     )
+
+
+class SignalScanRequest(BaseModel):
+    """Request body for a streamed multi-symbol signal scan."""
+
+    symbols: list[str] = Field(
+        ...,
+        min_length=1,
+        description="Stock ticker symbols to scan",
+        examples=[["AAPL", "MSFT", "NVDA"]],
+    )
@@ -5,28 +5,40 @@ import logging
 from fastapi import APIRouter, HTTPException
 
 from ..models.schemas import AnalyzeRequest, SignalResponse
-from ..services.signal_generator import SignalGenerator
+from ..services.candles import CandleArrays
+from ..services.executors import ExecutorSaturated
+from ..services.signal_generator import signal_generator
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["analysis"])
 
-_generator = SignalGenerator()
-
 
 @router.post("/analyze", response_model=SignalResponse)
 async def analyze_stock(request: AnalyzeRequest) -> SignalResponse:
     """Analyse a single stock and return a trading signal.
 
-    Accepts a symbol and optional historical candle data. If candle data is
-    not provided the service will attempt to fetch it via yfinance.
+    Accepts a symbol and optional historical candle data, either as a list
+    of candles or in columnar form (``columns``). If candle data is not
+    provided the service will attempt to fetch it via yfinance.
     """
+    candles = request.candles
+    if request.columns is not None:
+        try:
+            candles = CandleArrays.from_columns(request.columns)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+
     try:
-        signal = await _generator.generate_signal(
+        signal = await signal_generator.generate_signal(
             symbol=request.symbol.upper(),
-            candles=request.candles,
+            candles=candles,
         )
         return signal
+    except ExecutorSaturated as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": "1"}
+        ) from exc
     except Exception as exc:
         logger.exception("Error analysing %s", request.symbol)
         raise HTTPException(
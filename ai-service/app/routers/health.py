@@ -4,7 +4,19 @@ import time
 
 from fastapi import APIRouter
 
-from ..models.schemas import HealthResponse
+from ..models.schemas import (
+    ExecutorStats,
+    HealthResponse,
+    LLMPoolStats,
+    LLMUsageStats,
+    StartupStats,
+    StructuredOutputStats,
+)
+from ..services.anthropic_pool import client_registry
+from ..services.executors import executors
+from ..services.llm_usage import llm_usage
+from ..services.startup_profile import startup_profile
+from ..services.structured_output import structured_output
 
 router = APIRouter(tags=["health"])
 
@@ -22,3 +34,33 @@ async def health_check() -> HealthResponse:
         version=APP_VERSION,
         uptime=round(uptime, 2),
     )
+
+
+@router.get("/health/llm-pool", response_model=LLMPoolStats)
+async def llm_pool_stats() -> LLMPoolStats:
+    """Return occupancy of this process's shared Anthropic connection pool."""
+    return LLMPoolStats(**client_registry.stats())
+
+
+@router.get("/health/llm-usage", response_model=LLMUsageStats)
+async def llm_usage_stats() -> LLMUsageStats:
+    """Return token and prompt-cache usage per LLM endpoint for this process."""
+    return LLMUsageStats(**llm_usage.stats())
+
+
+@router.get("/health/llm-parsing", response_model=StructuredOutputStats)
+async def llm_parsing_stats() -> StructuredOutputStats:
+    """Return structured-output parse failures and repairs per LLM endpoint."""
+    return StructuredOutputStats(**structured_output.stats())
+
+
+@router.get("/health/executors", response_model=ExecutorStats)
+async def executor_stats() -> ExecutorStats:
+    """Return executor pool occupancy and event-loop lag for this process."""
+    return ExecutorStats(**executors.stats())
+
+
+@router.get("/health/startup", response_model=StartupStats)
+async def startup_stats() -> StartupStats:
+    """Return the import and initialisation time of each cold-start step."""
+    return StartupStats(**startup_profile.report())
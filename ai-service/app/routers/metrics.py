@@ -0,0 +1,81 @@
+"""Router for the Prometheus ``/metrics`` endpoint.
+
+Besides the metrics recorded by the pipelines, the scrape includes the
+counters already kept for the ``/health/*`` endpoints (Anthropic pool,
+executors, structured-output parsing), converted at scrape time.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from ..services.anthropic_pool import client_registry
+from ..services.executors import executors
+from ..services.metrics import CONTENT_TYPE, MetricFamily, metrics, stats_families
+from ..services.structured_output import structured_output
+
+router = APIRouter(tags=["health"])
+
+_POOL_FIELDS = {
+    "in_flight": ("gauge", "Anthropic requests currently in flight."),
+    "open_connections": ("gauge", "Open connections in the Anthropic pool."),
+    "idle_connections": ("gauge", "Idle keep-alive connections in the Anthropic pool."),
+    "total_requests": ("counter", "Requests sent through the Anthropic pool."),
+}
+
+_EXECUTOR_FIELDS = {
+    "pending": ("gauge", "Jobs queued or running on the executor."),
+    "submitted": ("counter", "Jobs submitted to the executor."),
+    "completed": ("counter", "Jobs that completed."),
+    "failed": ("counter", "Jobs that raised."),
+    "timeouts": ("counter", "Jobs that exceeded the executor timeout."),
+    "rejected": ("counter", "Jobs rejected because the queue was full."),
+}
+
+_PARSING_FIELDS = {
+    "calls": ("counter", "Structured-output calls."),
+    "entries": ("counter", "Entries requested from the model."),
+    "invalid_entries": ("counter", "Entries missing or failing validation."),
+    "repair_calls": ("counter", "Follow-up calls made to repair invalid entries."),
+    "repaired_entries": ("counter", "Entries fixed by a repair call."),
+    "failed_entries": ("counter", "Entries still invalid after repair."),
+}
+
+
+def _collect_pool() -> list[MetricFamily]:
+    return stats_families("ai_service_llm_pool", _POOL_FIELDS, [({}, client_registry.stats())])
+
+
+def _collect_executors() -> list[MetricFamily]:
+    stats = executors.stats()
+    families = stats_families(
+        "ai_service_executor",
+        _EXECUTOR_FIELDS,
+        [({"pool": pool["name"]}, pool) for pool in stats["pools"]],
+    )
+    lag = MetricFamily(
+        "ai_service_event_loop_lag_seconds",
+        "gauge",
+        "Event-loop lag over the recent sampling window.",
+    )
+    for quantile in ("p50", "p99", "max"):
+        lag.add(stats["loop_lag"][f"{quantile}_ms"] / 1000, quantile=quantile)
+    return [*families, lag]
+
+
+def _collect_parsing() -> list[MetricFamily]:
+    endpoints = structured_output.stats()["endpoints"]
+    return stats_families(
+        "ai_service_structured_output",
+        _PARSING_FIELDS,
+        [({"endpoint": name}, counters) for name, counters in endpoints.items()],
+    )
+
+
+for _collector in (_collect_pool, _collect_executors, _collect_parsing):
+    metrics.register_collector(_collector)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    """Return every metric of this process in the Prometheus text format."""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
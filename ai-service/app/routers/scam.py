@@ -1,21 +1,40 @@
 """Router for scam analysis endpoints."""
 
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Optional
+import time
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from ..config import settings
+from ..models.schemas import CacheStats, NearDuplicateStats, TriageStats
+from ..services.anthropic_pool import client_registry
+from ..services.executors import LoopSemaphore
+from ..services.llm_usage import cached_system, llm_usage
+from ..services.metrics import ERRORS, FALLBACKS, IN_FLIGHT, STAGE_SECONDS, metrics
+from ..services.near_duplicate import NearDuplicateIndex, normalise_text
+from ..services.partial_json import StreamingObjectParser
+from ..services.response_cache import AsyncResponseCache
+from ..services.scam_rules import RuleTriage, default_rules
+from ..services.shared_cache import model_codec, shared_tier
+from ..services.structured_output import (
+    SINGLE,
+    StructuredOutputError,
+    ToolSpec,
+    derive_model,
+    structured_output,
+)
 
-logger = logging.getLogger(__name__)
-
-try:
+if TYPE_CHECKING:
     import anthropic
-except ImportError:
-    anthropic = None
-    logger.warning("anthropic package not installed; scam analysis will use fallback.")
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analyze", tags=["analyze"])
 
@@ -35,101 +54,559 @@ class ScamAnalyzeResponse(BaseModel):
     redFlags: list[str] = Field(default_factory=list, description="Identified red flags")
     analysis: str = Field(..., description="Full analysis text")
     recommendedAction: str = Field(..., description="block, report, or ignore")
+    nearDuplicate: bool = Field(
+        False, description="True if the verdict was reused from a near-identical message"
+    )
+    similarity: Optional[float] = Field(
+        None, description="Estimated similarity to the message whose verdict was reused"
+    )
+    tier: str = Field(
+        "llm",
+        description=(
+            "Which tier produced the verdict: rules (triage), llm, "
+            "near_duplicate, or fallback (rules because AI was unavailable)"
+        ),
+    )
+
+
+class ScamBatchRequest(BaseModel):
+    """Request body for batch scam analysis."""
+    items: list[ScamAnalyzeRequest] = Field(
+        ..., min_length=1, description="Messages to analyze"
+    )
+
+
+class ScamBatchItem(BaseModel):
+    """Verdict for one message of a batch, in input order."""
+    index: int = Field(..., description="Position of the message in the request")
+    result: ScamAnalyzeResponse = Field(..., description="Scam analysis verdict")
+    error: Optional[str] = Field(
+        None, description="Set when AI analysis failed and the rule-based fallback was used"
+    )
+
+
+class ScamBatchResponse(BaseModel):
+    """Response from batch scam analysis."""
+    results: list[ScamBatchItem] = Field(..., description="One entry per input message")
+
+
+class ScamStatsResponse(BaseModel):
+    """Runtime counters for the scam analysis pipeline."""
+    cache: CacheStats = Field(..., description="Exact-match response cache counters")
+    near_duplicate: NearDuplicateStats = Field(
+        ..., description="Near-duplicate verdict reuse counters"
+    )
+    triage: TriageStats = Field(..., description="Rule-first triage counters")
+
+
+_scam_cache: AsyncResponseCache[ScamAnalyzeResponse] = AsyncResponseCache(
+    name="scam",
+    maxsize=settings.scam_cache_max_entries,
+    ttl=settings.scam_cache_ttl,
+    enabled=settings.scam_cache_enabled,
+    shared=shared_tier("scam", model_codec(ScamAnalyzeResponse)),
+)
+
+_near_duplicates: NearDuplicateIndex[ScamAnalyzeResponse] = NearDuplicateIndex(
+    maxsize=(
+        settings.scam_near_duplicate_max_entries
+        if settings.scam_near_duplicate_enabled
+        else 0
+    ),
+    threshold=settings.scam_near_duplicate_threshold,
+    ttl=settings.scam_cache_ttl,
+)
+
+_triage = RuleTriage(
+    benign_max=settings.scam_triage_benign_max_score,
+    critical_min=settings.scam_triage_critical_min_score,
+)
+
+metrics.register_cache(_scam_cache.stats)
+
+# Upstream calls made by /analyze/scam/batch, bounded across all requests.
+_batch_slots = LoopSemaphore(settings.scam_batch_concurrency)
+
+_in_flight = IN_FLIGHT.labels("scam")
+_rules_seconds = STAGE_SECONDS.labels("scam", "rules")
 
 
 @router.post("/scam", response_model=ScamAnalyzeResponse)
 async def analyze_scam(request: ScamAnalyzeRequest) -> ScamAnalyzeResponse:
-    """Analyze a suspicious message for scam indicators using Claude."""
-
-    client = None
-    if anthropic and settings.anthropic_api_key:
-        client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
-
-    if client:
-        try:
-            prompt = (
-                "You are a cybersecurity expert specializing in consumer fraud detection. "
-                f"Analyze the following {request.type} message for scam indicators.\n\n"
-                f"Message type: {request.type}\n"
-            )
-            if request.sender:
-                prompt += f"Sender: {request.sender}\n"
-            prompt += (
-                f"Content:\n---\n{request.content}\n---\n\n"
-                "Provide your analysis as a JSON object with EXACTLY these keys:\n"
-                '  "riskScore": integer 0-100 (0=safe, 100=definite scam)\n'
-                '  "riskLevel": one of "low", "medium", "high", "critical"\n'
-                '  "category": one of "phishing", "impersonation", "lottery", "tech_support", "romance", "investment", "other"\n'
-                '  "redFlags": array of specific red flags found (strings)\n'
-                '  "analysis": detailed multi-sentence analysis explaining your assessment\n'
-                '  "recommendedAction": one of "block", "report", "ignore"\n\n'
-                "Respond with ONLY the JSON object. No additional text."
+    """Analyze a suspicious message for scam indicators using Claude.
+
+    Identical messages (after normalisation) are answered from a TTL/LRU
+    cache, and concurrent identical requests share one upstream call.
+    Messages that closely resemble a recently analysed one (same campaign,
+    different name, link or amount) reuse its verdict with
+    ``nearDuplicate`` set.  With triage enabled, clear-cut messages are
+    settled by the rule engine and only the ambiguous band reaches Claude.
+    """
+    client = client_registry.client
+
+    with _in_flight.track_in_progress():
+        if client:
+            triaged = _triage_request(request)
+            if triaged is not None:
+                return triaged
+            try:
+                return await _scam_cache.get_or_compute(
+                    _cache_key(request),
+                    lambda: _analyze_uncached(client, request),
+                )
+            except Exception:
+                logger.exception("Error during scam analysis; using fallback.")
+                ERRORS.labels("scam", "llm").inc()
+
+        # Fallback analysis without AI
+        FALLBACKS.labels("scam", "llm_error" if client else "unavailable").inc()
+        return _fallback_analysis(request).model_copy(update={"tier": "fallback"})
+
+
+@router.post("/scam/batch", response_model=ScamBatchResponse)
+async def analyze_scam_batch(batch: ScamBatchRequest) -> ScamBatchResponse:
+    """Analyze many suspicious messages in one round trip.
+
+    Every message is first pre-screened by the rule-based scorer (settling
+    clear-cut messages when triage is enabled), the exact-match cache and the
+    near-duplicate index.  Remaining unique
+    messages are sent to Claude several per prompt, with a bounded number of
+    prompts in flight.  Results come back in input order; a message whose AI
+    analysis fails gets the rule-based verdict plus an ``error`` note instead
+    of failing the whole batch.
+    """
+    if len(batch.items) > settings.scam_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.scam_batch_max_items} messages per batch.",
+        )
+    with _in_flight.track_in_progress():
+        return await _analyze_batch(batch)
+
+
+async def _analyze_batch(batch: ScamBatchRequest) -> ScamBatchResponse:
+    results: list[Optional[ScamAnalyzeResponse]] = [None] * len(batch.items)
+    errors: list[Optional[str]] = [None] * len(batch.items)
+    fallbacks = [
+        _fallback_analysis(item).model_copy(update={"tier": "fallback"})
+        for item in batch.items
+    ]
+
+    client = client_registry.client
+    if client is None:
+        FALLBACKS.labels("scam", "unavailable").inc(len(batch.items))
+        return _batch_response(fallbacks, errors)
+
+    # --- Pre-screen: triage, exact cache, near-duplicates; dedupe the rest -
+    pending: dict[str, list[int]] = {}
+    for i, item in enumerate(batch.items):
+        if settings.scam_triage_enabled and _triage.decide(fallbacks[i].riskScore):
+            results[i] = fallbacks[i].model_copy(update={"tier": "rules"})
+            continue
+        key = _cache_key(item)
+        cached = _scam_cache.get(key)
+        if cached is not None:
+            results[i] = cached
+            continue
+        if key in pending:
+            pending[key].append(i)
+            continue
+        match = _near_duplicates.query(item.content, namespace=normalise_text(item.type))
+        if match is not None:
+            verdict, similarity = match
+            results[i] = verdict.model_copy(
+                update={
+                    "nearDuplicate": True,
+                    "similarity": round(similarity, 4),
+                    "tier": "near_duplicate",
+                }
             )
+            _scam_cache.set(key, results[i])
+            continue
+        pending[key] = [i]
+
+    # --- Upstream: several messages per prompt, bounded concurrency -------
+    # Group calls and single-message retries share the process-wide slots.
+    keys = list(pending)
+    group_size = max(1, settings.scam_batch_group_size)
+
+    def _fail(key: str) -> None:
+        FALLBACKS.labels("scam", "llm_error").inc(len(pending[key]))
+        for i in pending[key]:
+            errors[i] = "AI analysis failed; rule-based fallback used."
+
+    def _store(key: str, request: ScamAnalyzeRequest, verdict: ScamAnalyzeResponse) -> None:
+        _scam_cache.set(key, verdict)
+        _near_duplicates.add(request.content, verdict, namespace=normalise_text(request.type))
+        for i in pending[key]:
+            results[i] = verdict
+
+    async def _retry(key: str, request: ScamAnalyzeRequest) -> None:
+        async with _batch_slots:
+            try:
+                verdict = await _llm_analysis(client, request, "scam.batch")
+            except Exception:
+                logger.exception("Scam analysis retry failed; using fallback.")
+                ERRORS.labels("scam", "llm").inc()
+                _fail(key)
+                return
+        _store(key, request, verdict)
+
+    async def _run_group(group_keys: list[str]) -> None:
+        requests = [batch.items[pending[key][0]] for key in group_keys]
+        async with _batch_slots:
+            try:
+                verdicts = await _llm_analysis_group(client, requests)
+            except Exception:
+                logger.exception("Batch scam analysis failed for a group of %d.", len(requests))
+                ERRORS.labels("scam", "llm").inc()
+                for key in group_keys:
+                    _fail(key)
+                return
+
+        # Messages the model skipped or garbled are retried on their own,
+        # after the group has given its slot back.
+        retries = []
+        for j, (key, request) in enumerate(zip(group_keys, requests)):
+            verdict = verdicts.get(j)
+            if verdict is None:
+                retries.append(_retry(key, request))
+            else:
+                _store(key, request, verdict)
+        await asyncio.gather(*retries)
+
+    await asyncio.gather(
+        *[_run_group(keys[k : k + group_size]) for k in range(0, len(keys), group_size)]
+    )
+
+    return _batch_response(
+        [r if r is not None else fallbacks[i] for i, r in enumerate(results)], errors
+    )
+
+
+@router.post("/scam/stream")
+async def analyze_scam_stream(request: ScamAnalyzeRequest) -> StreamingResponse:
+    """Stream a scam analysis as Server-Sent Events.
+
+    Events, in order:
 
-            response = await client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}],
+    * ``provisional`` -- the rule-based verdict, sent immediately.
+    * ``field`` -- ``{"name", "value"}`` for ``riskScore``, ``riskLevel``,
+      ``category`` and ``recommendedAction`` as soon as each is complete.
+    * ``red_flag`` -- ``{"value"}`` for each red flag as it is produced.
+    * ``analysis_delta`` -- ``{"text"}`` chunks of the analysis text.
+    * ``error`` -- ``{"detail"}`` if the AI analysis failed mid-stream.
+    * ``final`` -- the complete :class:`ScamAnalyzeResponse`.
+
+    Cached, near-duplicate and triaged verdicts skip straight to ``final``.
+    """
+    return StreamingResponse(
+        _stream_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/scam/stats", response_model=ScamStatsResponse)
+async def scam_stats() -> ScamStatsResponse:
+    """Return cache, near-duplicate and triage counters for the scam pipeline."""
+    return ScamStatsResponse(
+        cache=CacheStats(**_scam_cache.stats()),
+        near_duplicate=NearDuplicateStats(**_near_duplicates.stats()),
+        triage=TriageStats(**_triage.stats()),
+    )
+
+
+def _batch_response(
+    results: list[ScamAnalyzeResponse], errors: list[Optional[str]]
+) -> ScamBatchResponse:
+    return ScamBatchResponse(
+        results=[
+            ScamBatchItem(index=i, result=result, error=error)
+            for i, (result, error) in enumerate(zip(results, errors))
+        ]
+    )
+
+
+async def _stream_events(request: ScamAnalyzeRequest) -> AsyncIterator[str]:
+    with _in_flight.track_in_progress():
+        async for event in _verdict_events(request):
+            yield event
+
+
+async def _verdict_events(request: ScamAnalyzeRequest) -> AsyncIterator[str]:
+    provisional = _fallback_analysis(request)
+    yield _sse("provisional", provisional.model_dump())
+
+    client = client_registry.client
+    if client is None:
+        FALLBACKS.labels("scam", "unavailable").inc()
+        yield _sse("final", provisional.model_copy(update={"tier": "fallback"}).model_dump())
+        return
+
+    triaged = _triage_request(request)
+    if triaged is not None:
+        yield _sse("final", triaged.model_dump())
+        return
+
+    key = _cache_key(request)
+    namespace = normalise_text(request.type)
+    verdict = _scam_cache.get(key)
+    if verdict is None:
+        match = _near_duplicates.query(request.content, namespace=namespace)
+        if match is not None:
+            verdict = match[0].model_copy(
+                update={
+                    "nearDuplicate": True,
+                    "similarity": round(match[1], 4),
+                    "tier": "near_duplicate",
+                }
             )
+            _scam_cache.set(key, verdict)
+    if verdict is not None:
+        yield _sse("final", verdict.model_dump())
+        return
 
-            raw_text = response.content[0].text.strip()
-            if raw_text.startswith("```"):
-                raw_text = raw_text.split("\n", 1)[-1]
-                if raw_text.endswith("```"):
-                    raw_text = raw_text[:-3].strip()
-
-            parsed = json.loads(raw_text)
-
-            return ScamAnalyzeResponse(
-                riskScore=max(0, min(100, int(parsed.get("riskScore", 50)))),
-                riskLevel=parsed.get("riskLevel", "medium"),
-                category=parsed.get("category", "other"),
-                redFlags=parsed.get("redFlags", []),
-                analysis=parsed.get("analysis", "Analysis completed."),
-                recommendedAction=parsed.get("recommendedAction", "report"),
+    parser = StreamingObjectParser()
+    try:
+        started = time.perf_counter()
+        async with client.messages.stream(
+            model=_SCAM_MODEL,
+            max_tokens=1024,
+            system=cached_system(_SYSTEM_PROMPT),
+            tools=[_VERDICT_TOOL.param()],
+            tool_choice=_VERDICT_TOOL.choice(),
+            messages=[{"role": "user", "content": _single_prompt(request)}],
+        ) as stream:
+            async for chunk in stream:
+                if chunk.type != "input_json":
+                    continue
+                for event in parser.feed(chunk.partial_json):
+                    if event.key == "analysis":
+                        if event.kind == "delta":
+                            yield _sse("analysis_delta", {"text": event.value})
+                    elif event.key == "redFlags":
+                        if event.kind == "item":
+                            yield _sse("red_flag", {"value": event.value})
+                    elif event.kind == "field":
+                        yield _sse("field", {"name": event.key, "value": event.value})
+            final = await stream.get_final_message()
+        llm_usage.record("scam.stream", final, time.perf_counter() - started)
+        # The parser only drove the live events; the verdict is validated
+        # (and repaired if needed) from the final tool call.
+        verdict = _single_verdict(
+            await structured_output.complete(
+                client,
+                final,
+                endpoint="scam.stream",
+                model=_SCAM_MODEL,
+                system=_SYSTEM_PROMPT,
+                tool=_VERDICT_TOOL,
             )
+        )
+    except Exception:
+        logger.exception("Error during streamed scam analysis; using fallback.")
+        ERRORS.labels("scam", "llm").inc()
+        FALLBACKS.labels("scam", "llm_error").inc()
+        yield _sse("error", {"detail": "AI analysis failed; rule-based fallback used."})
+        yield _sse("final", provisional.model_copy(update={"tier": "fallback"}).model_dump())
+        return
+
+    _scam_cache.set(key, verdict)
+    _near_duplicates.add(request.content, verdict, namespace=namespace)
+    yield _sse("final", verdict.model_dump())
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _triage_request(request: ScamAnalyzeRequest) -> Optional[ScamAnalyzeResponse]:
+    """Return the rule-based verdict if triage settles *request*, else ``None``."""
+    if not settings.scam_triage_enabled:
+        return None
+    screened = _fallback_analysis(request)
+    if _triage.decide(screened.riskScore) is None:
+        return None
+    return screened.model_copy(update={"tier": "rules"})
+
+
+def _cache_key(request: ScamAnalyzeRequest) -> str:
+    """Return a content-addressed key for *request* (type, content, sender)."""
+    parts = (
+        normalise_text(request.type),
+        normalise_text(request.content),
+        normalise_text(request.sender or ""),
+    )
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+async def _analyze_uncached(
+    client: "anthropic.AsyncAnthropic", request: ScamAnalyzeRequest
+) -> ScamAnalyzeResponse:
+    """Reuse a near-duplicate verdict if one exists, otherwise ask Claude."""
+    namespace = normalise_text(request.type)
+    match = _near_duplicates.query(request.content, namespace=namespace)
+    if match is not None:
+        verdict, similarity = match
+        return verdict.model_copy(
+            update={
+                "nearDuplicate": True,
+                "similarity": round(similarity, 4),
+                "tier": "near_duplicate",
+            }
+        )
 
-        except Exception:
-            logger.exception("Error during scam analysis; using fallback.")
+    result = await _llm_analysis(client, request)
+    _near_duplicates.add(request.content, result, namespace=namespace)
+    return result
 
-    # Fallback analysis without AI
-    return _fallback_analysis(request)
+
+_SCAM_MODEL = "claude-sonnet-4-5-20250929"
+
+_VERDICT_SPEC = (
+    '  "riskScore": integer 0-100 (0=safe, 100=definite scam)\n'
+    '  "riskLevel": one of "low", "medium", "high", "critical"\n'
+    '  "category": one of "phishing", "impersonation", "lottery", "tech_support", "romance", "investment", "other"\n'
+    '  "redFlags": array of specific red flags found (strings)\n'
+    '  "analysis": detailed multi-sentence analysis explaining your assessment\n'
+    '  "recommendedAction": one of "block", "report", "ignore"\n'
+)
+
+# Shared by the single, streamed and batched prompts and sent as a cached
+# system prefix; the user message carries only the message(s) to analyze.
+_SYSTEM_PROMPT = (
+    "You are a cybersecurity expert specializing in consumer fraud detection. "
+    "Analyze the suspicious messages you are given for scam indicators and "
+    "provide for each:\n"
+    f"{_VERDICT_SPEC}\n"
+    "Record your analysis by calling the tool provided. When given several "
+    "numbered messages, analyze each independently and record one entry per "
+    "message number."
+)
+
+# The verdict fields the model fills in, with the allowed values enforced.
+_SCAM_VERDICT = derive_model(
+    "ScamVerdict",
+    ScamAnalyzeResponse,
+    ["riskScore", "riskLevel", "category", "redFlags", "analysis", "recommendedAction"],
+    choices={
+        "riskLevel": ("low", "medium", "high", "critical"),
+        "category": (
+            "phishing", "impersonation", "lottery", "tech_support", "romance", "investment", "other"
+        ),
+        "recommendedAction": ("block", "report", "ignore"),
+    },
+)
+_VERDICT_TOOL = ToolSpec(
+    "record_verdict", "Record the scam analysis of the message.", _SCAM_VERDICT
+)
+_BATCH_VERDICT_TOOL = ToolSpec(
+    "record_verdicts",
+    "Record the scam analysis of each message, keyed by message number.",
+    _SCAM_VERDICT,
+    keyed=True,
+)
+
+
+def _single_prompt(request: ScamAnalyzeRequest) -> str:
+    """Build the user message for analysing *request* on its own."""
+    prompt = (
+        f"Analyze the following {request.type} message.\n\n"
+        f"Message type: {request.type}\n"
+    )
+    if request.sender:
+        prompt += f"Sender: {request.sender}\n"
+    prompt += f"Content:\n---\n{request.content}\n---"
+    return prompt
+
+
+async def _llm_analysis(
+    client: "anthropic.AsyncAnthropic",
+    request: ScamAnalyzeRequest,
+    endpoint: str = "scam.analyze",
+) -> ScamAnalyzeResponse:
+    """Analyze *request* with Claude; raises if the call or validation fails."""
+    entries = await structured_output.request(
+        client,
+        endpoint=endpoint,
+        model=_SCAM_MODEL,
+        max_tokens=1024,
+        system=_SYSTEM_PROMPT,
+        prompt=_single_prompt(request),
+        tool=_VERDICT_TOOL,
+    )
+    return _single_verdict(entries)
+
+
+def _single_verdict(entries: dict[str, BaseModel]) -> ScamAnalyzeResponse:
+    if SINGLE not in entries:
+        raise StructuredOutputError("no valid verdict after repair")
+    return _parse_verdict(entries[SINGLE].model_dump())
+
+
+async def _llm_analysis_group(
+    client: "anthropic.AsyncAnthropic", requests: list[ScamAnalyzeRequest]
+) -> dict[int, ScamAnalyzeResponse]:
+    """Analyze several messages in one Claude call.
+
+    Returns the verdicts keyed by position in *requests*; entries still
+    missing or invalid after the structured-output repair are left out so
+    the caller can retry them individually.  Raises if the call itself
+    fails.
+    """
+    messages_text = ""
+    for i, request in enumerate(requests, start=1):
+        messages_text += f"Message {i}\nMessage type: {request.type}\n"
+        if request.sender:
+            messages_text += f"Sender: {request.sender}\n"
+        messages_text += f"Content:\n---\n{request.content}\n---\n\n"
+
+    prompt = (
+        f"Analyze each of the following {len(requests)} messages independently.\n\n"
+        f"{messages_text}"
+    ).rstrip()
+
+    entries = await structured_output.request(
+        client,
+        endpoint="scam.batch",
+        model=_SCAM_MODEL,
+        max_tokens=min(8192, 768 * len(requests)),
+        system=_SYSTEM_PROMPT,
+        prompt=prompt,
+        tool=_BATCH_VERDICT_TOOL,
+        keys=[str(i + 1) for i in range(len(requests))],
+    )
+    return {
+        i: _parse_verdict(entries[str(i + 1)].model_dump())
+        for i in range(len(requests))
+        if str(i + 1) in entries
+    }
+
+
+def _parse_verdict(parsed: dict) -> ScamAnalyzeResponse:
+    return ScamAnalyzeResponse(
+        riskScore=max(0, min(100, int(parsed.get("riskScore", 50)))),
+        riskLevel=parsed.get("riskLevel", "medium"),
+        category=parsed.get("category", "other"),
+        redFlags=parsed.get("redFlags", []),
+        analysis=parsed.get("analysis", "Analysis completed."),
+        recommendedAction=parsed.get("recommendedAction", "report"),
+        tier="llm",
+    )
 
 
 def _fallback_analysis(request: ScamAnalyzeRequest) -> ScamAnalyzeResponse:
     """Simple rule-based fallback when AI is unavailable."""
-    red_flags = []
-    content_lower = request.content.lower()
-
-    checks = [
-        (["urgent", "immediately", "right now", "act fast"], "Creates false urgency"),
-        (["click", "link", "http", "www."], "Contains suspicious links"),
-        (["verify", "confirm your"], "Requests account verification"),
-        (["password", "ssn", "social security", "credit card"], "Asks for sensitive information"),
-        (["won", "prize", "lottery", "congratulations"], "Promises unexpected prizes"),
-        (["irs", "government", "fbi", "police"], "Impersonates a government agency"),
-        (["suspended", "locked", "disabled", "compromised"], "Claims account is compromised"),
-        (["wire transfer", "gift card", "bitcoin", "crypto"], "Requests unusual payment method"),
-    ]
-
-    for keywords, flag in checks:
-        if any(kw in content_lower for kw in keywords):
-            red_flags.append(flag)
+    with _rules_seconds.time():
+        matched = default_rules.match(request.content)
+    red_flags = matched.red_flags
 
     risk_score = min(100, len(red_flags) * 18 + 15)
     risk_level = "critical" if risk_score >= 80 else "high" if risk_score >= 60 else "medium" if risk_score >= 30 else "low"
 
-    category = "other"
-    if any(w in content_lower for w in ["bank", "account", "verify", "paypal"]):
-        category = "phishing"
-    elif any(w in content_lower for w in ["irs", "government", "police", "fbi"]):
-        category = "impersonation"
-    elif any(w in content_lower for w in ["won", "lottery", "prize"]):
-        category = "lottery"
-    elif any(w in content_lower for w in ["invest", "crypto", "bitcoin", "trading"]):
-        category = "investment"
-    elif any(w in content_lower for w in ["tech support", "microsoft", "apple support"]):
-        category = "tech_support"
+    category = matched.category
 
     recommended_action = "block" if risk_score >= 60 else "report" if risk_score >= 30 else "ignore"
 
@@ -145,4 +622,5 @@ def _fallback_analysis(request: ScamAnalyzeRequest) -> ScamAnalyzeResponse:
             f"Recommended action: {recommended_action}."
         ),
         recommendedAction=recommended_action,
+        tier="rules",
     )
@@ -1,20 +1,22 @@
 """Router for multi-symbol signal generation endpoint."""
 
-import asyncio
+import json
 import logging
-from typing import Optional
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from ..models.schemas import SignalResponse
-from ..services.signal_generator import SignalGenerator
+from ..config import settings
+from ..models.schemas import SignalCacheStats, SignalResponse, SignalScanRequest
+from ..services.executors import ExecutorSaturated
+from ..services.signal_generator import signal_generator
+from ..services.signal_scan import SignalScan, scan_registry
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/signals", tags=["signals"])
 
-_generator = SignalGenerator()
-
 
 @router.get("/generate", response_model=list[SignalResponse])
 async def generate_signals(
@@ -26,7 +28,9 @@ async def generate_signals(
     """Generate trading signals for multiple stocks.
 
     Accepts a comma-separated ``symbols`` query parameter and returns a list
-    of signal responses -- one per symbol.
+    of signal responses -- one per symbol.  Symbols that failed or were shed
+    under load come back as HOLD entries with ``decision_path="error"``; the
+    request is a 503 only if every symbol was shed.
     """
     symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()]
 
@@ -39,22 +43,91 @@ async def generate_signals(
             detail="Maximum 20 symbols per request.",
         )
 
-    async def _safe_generate(sym: str) -> Optional[SignalResponse]:
-        try:
-            return await _generator.generate_signal(symbol=sym, candles=[])
-        except Exception:
-            logger.exception("Error generating signal for %s", sym)
-            return SignalResponse(
+    results = await signal_generator.generate_signals(symbol_list)
+    # Shed symbols become error entries; only a fully shed request is a 503.
+    if all(isinstance(result, ExecutorSaturated) for result in results):
+        raise HTTPException(
+            status_code=503, detail=str(results[0]), headers={"Retry-After": "1"}
+        ) from results[0]
+
+    signals: list[SignalResponse] = []
+    for sym, result in zip(symbol_list, results):
+        if isinstance(result, SignalResponse):
+            signals.append(result)
+            continue
+        if isinstance(result, ExecutorSaturated):
+            logger.warning("Signal for %s shed: %s", sym, result)
+            reasoning = f"Server busy; retry {sym} shortly."
+        else:
+            logger.error("Error generating signal for %s", sym, exc_info=result)
+            reasoning = f"Error generating signal for {sym}."
+        signals.append(
+            SignalResponse(
                 symbol=sym,
                 signal_type="HOLD",
                 confidence=0.0,
-                reasoning=f"Error generating signal for {sym}.",
+                reasoning=reasoning,
                 technical_summary="Unavailable due to error.",
                 sentiment_summary="Unavailable due to error.",
                 risk_level="HIGH",
                 price_target=None,
                 stop_loss=None,
+                decision_path="error",
             )
+        )
+    return signals
+
+
+@router.get("/stats", response_model=SignalCacheStats)
+async def signal_cache_stats() -> SignalCacheStats:
+    """Return per-layer cache counters (signals, candles, indicators, LLM)."""
+    return SignalCacheStats(**signal_generator.cache_stats())
+
+
+@router.post("/scan")
+async def scan_signals(request: SignalScanRequest) -> StreamingResponse:
+    """Generate signals for up to ``scan_max_symbols`` symbols as NDJSON.
+
+    Symbols are processed ``scan_concurrency`` at a time, in batches of
+    ``llm_batch_size`` that share one LLM request, and each line is written
+    as soon as its batch finishes:
+
+    * ``{"type": "scan", "scan_id", "total"}`` -- first line.
+    * ``{"type": "result", "index", "symbol", "signal"}`` per success.
+    * ``{"type": "error", "index", "symbol", "detail"}`` per failure.
+    * ``{"type": "done", "completed", "failed", "cancelled", "elapsed"}``.
+
+    The scan stops when the client disconnects or calls
+    ``DELETE /signals/scan/{scan_id}`` (the id is also in ``X-Scan-Id``).
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in request.symbols if s.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No valid symbols provided.")
+    if len(symbols) > settings.scan_max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.scan_max_symbols} symbols per scan.",
+        )
+
+    scan = scan_registry.start(symbols, settings.scan_concurrency, settings.llm_batch_size)
+    return StreamingResponse(
+        _scan_lines(scan),
+        media_type="application/x-ndjson",
+        headers={"X-Scan-Id": scan.scan_id, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/scan/{scan_id}", status_code=204)
+async def cancel_scan(scan_id: str) -> Response:
+    """Cancel a running scan; its stream ends with ``"cancelled": true``."""
+    if not scan_registry.cancel(scan_id):
+        raise HTTPException(status_code=404, detail="Unknown or finished scan.")
+    return Response(status_code=204)
+
 
-    results = await asyncio.gather(*[_safe_generate(sym) for sym in symbol_list])
-    return [r for r in results if r is not None]
+async def _scan_lines(scan: SignalScan) -> AsyncIterator[str]:
+    try:
+        async for event in scan.events(signal_generator.generate_signals):
+            yield json.dumps(event) + "\n"
+    finally:
+        scan_registry.finish(scan.scan_id)
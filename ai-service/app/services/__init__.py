@@ -1,4 +1,33 @@
-from .technical import TechnicalAnalyzer
-from .sentiment import SentimentAnalyzer
-from .llm_client import LLMClient
-from .signal_generator import SignalGenerator
+"""Service layer of the AI service.
+
+The analyzer classes below are imported on first access rather than with the
+package, so importing a lightweight service module (``scam_rules``,
+``metrics``, ...) does not pull in pandas, pandas-ta and the Anthropic SDK.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .llm_client import LLMClient
+    from .sentiment import SentimentAnalyzer
+    from .signal_generator import SignalGenerator
+    from .technical import TechnicalAnalyzer
+
+_LAZY_EXPORTS = {
+    "TechnicalAnalyzer": ".technical",
+    "SentimentAnalyzer": ".sentiment",
+    "LLMClient": ".llm_client",
+    "SignalGenerator": ".signal_generator",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
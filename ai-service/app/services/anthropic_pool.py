@@ -0,0 +1,180 @@
+"""Process-wide Anthropic client registry with a shared, pooled HTTP transport."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    import anthropic
+
+# The SDK itself is imported when the first client is built, so processes
+# without an API key (and imports of this module) never load it.
+HAS_ANTHROPIC = find_spec("anthropic") is not None
+if not HAS_ANTHROPIC:
+    logger.warning("anthropic package not installed; LLM features will use fallbacks.")
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that calls *on_close* once, when the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]) -> None:
+        self._stream = stream
+        self._on_close: Optional[Callable[[], None]] = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close, on_close = None, self._on_close
+                on_close()
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that tracks in-flight requests for pool occupancy metrics.
+
+    A request stays in flight until its response body is closed, so streamed
+    (SSE) responses count for as long as they are being read.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.total_requests += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+        response.stream = _TrackedStream(response.stream, self._release)
+        return response
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    def connection_counts(self) -> tuple[int, int]:
+        """Return ``(open_connections, idle_connections)`` in the pool."""
+        connections = list(self._pool.connections)
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return len(connections), idle
+
+
+class AnthropicClientRegistry:
+    """Own the single ``AsyncAnthropic`` client shared by every call site.
+
+    The client is created on :meth:`startup` (called from the FastAPI
+    lifespan) or lazily on first access, so scripts that never start the app
+    still get a pooled client.  :meth:`shutdown` waits for in-flight requests
+    to drain, bounded by ``anthropic_shutdown_grace``, before closing the pool.
+    """
+
+    def __init__(self) -> None:
+        self._client: Optional["anthropic.AsyncAnthropic"] = None
+        self._transport: Optional[_InstrumentedTransport] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def client(self) -> Optional["anthropic.AsyncAnthropic"]:
+        """Return the shared client, or ``None`` if Anthropic is not configured."""
+        if self._client is None and HAS_ANTHROPIC and settings.anthropic_api_key:
+            self._client = self._build_client()
+        return self._client
+
+    async def startup(self) -> None:
+        """Create the shared client eagerly at application start."""
+        if self.client is not None:
+            logger.info(
+                "Anthropic client pool ready (max_connections=%d, keepalive=%d).",
+                settings.anthropic_max_connections,
+                settings.anthropic_max_keepalive_connections,
+            )
+
+    async def shutdown(self) -> None:
+        """Drain in-flight requests and close the shared client."""
+        if self._client is None:
+            return
+
+        deadline = time.monotonic() + settings.anthropic_shutdown_grace
+        while self._transport and self._transport.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._transport and self._transport.in_flight:
+            logger.warning(
+                "Closing Anthropic client with %d request(s) still in flight.",
+                self._transport.in_flight,
+            )
+
+        client, self._client = self._client, None
+        self._transport = None
+        await client.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool occupancy figures for this process."""
+        transport = self._transport
+        open_connections, idle_connections = (
+            transport.connection_counts() if transport else (0, 0)
+        )
+        return {
+            "configured": bool(HAS_ANTHROPIC and settings.anthropic_api_key),
+            "active": transport is not None,
+            "in_flight": transport.in_flight if transport else 0,
+            "peak_in_flight": transport.peak_in_flight if transport else 0,
+            "total_requests": transport.total_requests if transport else 0,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "max_connections": settings.anthropic_max_connections,
+            "max_keepalive_connections": settings.anthropic_max_keepalive_connections,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _build_client(self) -> "anthropic.AsyncAnthropic":
+        import anthropic
+
+        limits = httpx.Limits(
+            max_connections=settings.anthropic_max_connections,
+            max_keepalive_connections=settings.anthropic_max_keepalive_connections,
+            keepalive_expiry=settings.anthropic_keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            settings.anthropic_read_timeout,
+            connect=settings.anthropic_connect_timeout,
+        )
+        self._transport = _InstrumentedTransport(limits=limits)
+        http_client = anthropic.DefaultAsyncHttpxClient(
+            transport=self._transport,
+            timeout=timeout,
+        )
+        return anthropic.AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            base_url=settings.anthropic_base_url or None,
+            max_retries=settings.anthropic_max_retries,
+            timeout=timeout,
+            http_client=http_client,
+        )
+
+
+client_registry = AnthropicClientRegistry()
@@ -0,0 +1,388 @@
+"""Vectorised backtest of the technical scoring rules over price history.
+
+:func:`indicator_series` computes, for every bar of every symbol, the
+indicators :meth:`TechnicalAnalyzer.analyze` would return for the history up
+to that bar -- in one pass over bars vectorised across symbols for the
+recursive indicators, and with cumulative sums for the windowed ones.
+:func:`score_series` applies :meth:`TechnicalAnalyzer.get_signal_from_technicals`
+to all of them as array operations, and :func:`run_backtest` turns the
+signals of each :class:`WeightSet` into hit rate, return and drawdown
+figures, so thresholds and ``TECHNICAL_WEIGHT`` can be tuned
+offline.
+
+Panels follow :mod:`.indicator_engine`: ``(symbols, bars)`` arrays, oldest
+bar first, right-aligned with left padding.  Only the technical layer is
+replayed; sentiment and LLM terms count as zero.
+
+Values match the NumPy fallback path of ``analyze()``.  Its pandas-ta path,
+which the live service takes when pandas-ta is installed, gives the same
+windowed indicators but seeds the EMA (and so MACD) and RSI averages
+differently; the recursive values converge over the first hundred or so
+bars of a history, so tune on histories longer than that.  Run
+``python -m benchmarks.check_backtest_parity`` to check parity and to see
+the size of the pandas-ta differences.
+"""
+
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+
+from .indicator_engine import _DEFAULTS, INDICATOR_KEYS
+from .technical import (
+    DECISION_THRESHOLD,
+    DEFAULT_SCORING_RULES,
+    TECHNICAL_WEIGHT,
+    ScoringRules,
+)
+
+# Signal codes in the arrays returned by :func:`score_series`.
+BUY, HOLD, SELL = 1, 0, -1
+
+
+@dataclass(frozen=True)
+class WeightSet:
+    """One configuration to evaluate: scoring rules plus the final weighting.
+
+    Signals are scored on NumPy-fallback indicators (see the module notes on
+    the pandas-ta path).
+    """
+
+    name: str
+    rules: ScoringRules = DEFAULT_SCORING_RULES
+    technical_weight: float = TECHNICAL_WEIGHT
+    decision_threshold: float = DECISION_THRESHOLD
+
+
+@dataclass
+class BacktestResult:
+    """Performance of one :class:`WeightSet` over the whole panel.
+
+    ``hit_rate`` and ``avg_signal_return`` score each BUY / SELL against the
+    return over the next *horizon* bars.  The equity figures come from an
+    equal-weight portfolio that holds every symbol's latest signal (long,
+    short or flat) for one bar at a time.
+    """
+
+    name: str
+    signals: int = 0
+    buys: int = 0
+    sells: int = 0
+    hit_rate: float = 0.0
+    avg_signal_return: float = 0.0
+    total_return: float = 0.0
+    max_drawdown: float = 0.0
+    exposure: float = 0.0
+    weight_set: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+# ---------------------------------------------------------------------------
+# Indicator series
+# ---------------------------------------------------------------------------
+
+
+def _validate_panel(
+    close: np.ndarray, volume: np.ndarray, lengths: Optional[np.ndarray]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    if close.ndim != 2 or close.shape != volume.shape:
+        raise ValueError("close and volume must be 2-D arrays of the same shape")
+    n_symbols, n_bars = close.shape
+    if lengths is None:
+        lengths = np.full(n_symbols, n_bars, dtype=np.int64)
+    else:
+        lengths = np.minimum(np.asarray(lengths, dtype=np.int64), n_bars)
+    return close, volume, lengths
+
+
+def _rolling_stats(
+    close: np.ndarray, valid: np.ndarray, count: np.ndarray, period: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Trailing mean and sample std over *period* valid bars, at every bar."""
+    # Prices are shifted by each symbol's first valid close so the running
+    # sums of squares stay small relative to the window variance.
+    first = np.argmax(valid, axis=1)
+    offset = close[np.arange(close.shape[0]), first][:, None]
+    shifted = np.where(valid, close - offset, 0.0)
+    sums = np.cumsum(shifted, axis=1)
+    squares = np.cumsum(shifted * shifted, axis=1)
+    sums[:, period:] -= sums[:, :-period].copy()
+    squares[:, period:] -= squares[:, :-period].copy()
+
+    n = np.minimum(count, period).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / n
+        var = (squares - n * mean * mean) / (n - 1)
+        std = np.sqrt(np.maximum(var, 0.0))
+    std[n < 2] = np.nan
+    return mean + offset, std
+
+
+def indicator_series(
+    close: np.ndarray,
+    volume: np.ndarray,
+    lengths: Optional[np.ndarray] = None,
+) -> dict[str, np.ndarray]:
+    """Return every indicator of :meth:`TechnicalAnalyzer.analyze` at every bar.
+
+    Each value is ``(symbols, bars)``; entry ``[i, t]`` is what ``analyze()``
+    returns for symbol *i*'s candles up to and including bar *t*.  Padding
+    bars, and bars with fewer than two candles of history, hold the neutral
+    defaults.
+    """
+    close, volume, lengths = _validate_panel(close, volume, lengths)
+    n_symbols, n_bars = close.shape
+    start = n_bars - lengths
+    bars = np.arange(n_bars)
+    valid = bars[None, :] >= start[:, None]
+    count = np.where(valid, bars[None, :] - start[:, None] + 1, 0)
+
+    # --- Recursive indicators: one pass over bars, vectorised over symbols --
+    # Written bar-major so each step fills one contiguous row.
+    ema_12 = np.empty((n_bars, n_symbols))
+    ema_26 = np.empty((n_bars, n_symbols))
+    signal = np.empty((n_bars, n_symbols))
+    avg_gain = np.empty((n_bars, n_symbols))
+    avg_loss = np.empty((n_bars, n_symbols))
+    e12 = np.zeros(n_symbols)
+    e26 = np.zeros(n_symbols)
+    sig = np.zeros(n_symbols)
+    gain_avg = np.zeros(n_symbols)
+    loss_avg = np.zeros(n_symbols)
+    prev_close = np.zeros(n_symbols)
+    for t in range(n_bars):
+        x = close[:, t]
+        first = start == t
+        active = start <= t
+        delta = x - prev_close
+        e12 = np.where(active, np.where(first, x, e12 + 2 / 13 * (x - e12)), e12)
+        e26 = np.where(active, np.where(first, x, e26 + 2 / 27 * (x - e26)), e26)
+        macd_now = e12 - e26
+        sig = np.where(active, np.where(first, macd_now, sig + 2 / 10 * (macd_now - sig)), sig)
+        gain = np.where(first, 0.0, np.maximum(delta, 0.0))
+        loss = np.where(first, 0.0, np.maximum(-delta, 0.0))
+        gain_avg = np.where(
+            active, np.where(first, gain, gain_avg + 1 / 14 * (gain - gain_avg)), gain_avg
+        )
+        loss_avg = np.where(
+            active, np.where(first, loss, loss_avg + 1 / 14 * (loss - loss_avg)), loss_avg
+        )
+        prev_close = np.where(active, x, prev_close)
+        ema_12[t], ema_26[t], signal[t] = e12, e26, sig
+        avg_gain[t], avg_loss[t] = gain_avg, loss_avg
+
+    ema_12, ema_26, signal = ema_12.T, ema_26.T, signal.T
+    macd = ema_12 - ema_26
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = avg_gain.T / np.where(avg_loss.T == 0, np.nan, avg_loss.T)
+        rsi = 100.0 - 100.0 / (1.0 + rs)
+    rsi[count < 14] = np.nan
+
+    # --- Window indicators: running sums ----------------------------------
+    sma_20, std_20 = _rolling_stats(close, valid, count, 20)
+    sma_50, _ = _rolling_stats(close, valid, count, 50)
+    bb_upper = sma_20 + 2.0 * std_20
+    bb_lower = sma_20 - 2.0 * std_20
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_volume = np.cumsum(np.where(valid, volume, 0.0), axis=1) / np.maximum(count, 1)
+        volume_ratio = np.where(avg_volume > 0, volume / avg_volume, 1.0)
+
+    result = {
+        "rsi": np.where(np.isnan(rsi), 50.0, rsi),
+        "macd": macd,
+        "macd_signal": signal,
+        "macd_histogram": macd - signal,
+        "bb_upper": np.nan_to_num(bb_upper, nan=0.0),
+        "bb_middle": sma_20,
+        "bb_lower": np.nan_to_num(bb_lower, nan=0.0),
+        "sma_20": sma_20,
+        "sma_50": sma_50,
+        "ema_12": ema_12,
+        "ema_26": ema_26,
+        "current_price": close,
+        "avg_volume": avg_volume,
+        "volume_ratio": volume_ratio,
+    }
+    short = count < 2
+    return {
+        key: np.where(short, _DEFAULTS[key], result[key]) for key in INDICATOR_KEYS
+    }
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+
+def score_series(
+    indicators: dict[str, np.ndarray], rules: ScoringRules = DEFAULT_SCORING_RULES
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorised :meth:`TechnicalAnalyzer.get_signal_from_technicals`.
+
+    Returns ``(signal, confidence)`` arrays shaped like the indicators, with
+    signals coded as :data:`BUY`, :data:`HOLD` and :data:`SELL`.  Terms are
+    added in the same order as the scalar scorer, so equal inputs give
+    identical scores.
+    """
+    rsi = indicators["rsi"]
+    price = indicators["current_price"]
+
+    # --- RSI ---
+    score = np.select(
+        [
+            rsi < rules.rsi_oversold,
+            rsi < rules.rsi_weak_oversold,
+            rsi > rules.rsi_overbought,
+            rsi > rules.rsi_weak_overbought,
+        ],
+        [
+            rules.rsi_strong_weight,
+            rules.rsi_weak_weight,
+            -rules.rsi_strong_weight,
+            -rules.rsi_weak_weight,
+        ],
+        0.0,
+    )
+
+    # --- MACD ---
+    scaled = indicators["macd_histogram"] * rules.macd_scale
+    score = score + np.where(
+        indicators["macd_histogram"] > 0,
+        np.minimum(rules.macd_cap, scaled),
+        np.maximum(-rules.macd_cap, scaled),
+    )
+
+    # --- Bollinger Bands position ---
+    bb_upper, bb_lower = indicators["bb_upper"], indicators["bb_lower"]
+    bb_range = bb_upper - bb_lower
+    banded = (bb_upper > bb_lower) & (price > 0) & (bb_range > 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bb_position = (price - bb_lower) / np.where(banded, bb_range, 1.0)
+    score = score + np.select(
+        [banded & (bb_position < rules.bb_low), banded & (bb_position > rules.bb_high)],
+        [rules.bb_weight, -rules.bb_weight],
+        0.0,
+    )
+
+    # --- SMA / EMA crossovers ---
+    for fast, slow, weight in (
+        ("sma_20", "sma_50", rules.sma_weight),
+        ("ema_12", "ema_26", rules.ema_weight),
+    ):
+        both = (indicators[fast] > 0) & (indicators[slow] > 0)
+        score = score + np.where(
+            both, np.where(indicators[fast] > indicators[slow], weight, -weight), 0.0
+        )
+
+    # --- Volume ---
+    volume_ratio = indicators["volume_ratio"]
+    score = score * np.select(
+        [volume_ratio > rules.high_volume_ratio, volume_ratio < rules.low_volume_ratio],
+        [rules.high_volume_factor, rules.low_volume_factor],
+        1.0,
+    )
+
+    score = np.clip(score, -1.0, 1.0)
+    signal = np.select(
+        [score > rules.signal_threshold, score < -rules.signal_threshold], [BUY, SELL], HOLD
+    ).astype(np.int8)
+    confidence = np.round(np.minimum(1.0, np.abs(score)), 4)
+    return signal, confidence
+
+
+def final_signals(
+    indicators: dict[str, np.ndarray], weight_set: WeightSet
+) -> np.ndarray:
+    """Signals of ``SignalGenerator`` with only the technical term weighted in."""
+    signal, confidence = score_series(indicators, weight_set.rules)
+    combined = signal * confidence * weight_set.technical_weight
+    return np.select(
+        [combined > weight_set.decision_threshold, combined < -weight_set.decision_threshold],
+        [BUY, SELL],
+        HOLD,
+    ).astype(np.int8)
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+
+
+def run_backtest(
+    close: np.ndarray,
+    volume: np.ndarray,
+    weight_sets: Sequence[WeightSet],
+    lengths: Optional[np.ndarray] = None,
+    horizon: int = 1,
+    min_history: int = 50,
+) -> list[BacktestResult]:
+    """Evaluate each of *weight_sets* over the panel.
+
+    Indicators are computed once, as on the NumPy fallback path of
+    ``analyze()`` (see the module notes on pandas-ta), and shared by every
+    weight set.  A bar produces a signal only once its symbol has
+    *min_history* bars and *horizon* more bars follow it.
+    """
+    close, volume, lengths = _validate_panel(close, volume, lengths)
+    n_symbols, n_bars = close.shape
+    indicators = indicator_series(close, volume, lengths)
+
+    start = n_bars - lengths
+    bars = np.arange(n_bars)
+    tradable = (bars[None, :] >= (start + min_history - 1)[:, None]) & (
+        bars[None, :] < n_bars - horizon
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        forward = np.zeros_like(close)
+        forward[:, : n_bars - horizon] = close[:, horizon:] / close[:, :-horizon] - 1.0
+        next_bar = np.zeros_like(close)
+        next_bar[:, :-1] = close[:, 1:] / close[:, :-1] - 1.0
+    forward = np.nan_to_num(forward, nan=0.0, posinf=0.0, neginf=0.0)
+    next_bar = np.nan_to_num(next_bar, nan=0.0, posinf=0.0, neginf=0.0)
+    holding = (bars[None, :] >= (start + min_history - 1)[:, None]) & (bars[None, :] < n_bars - 1)
+    active_symbols = holding.sum(axis=0)
+
+    results = []
+    for weight_set in weight_sets:
+        signals = final_signals(indicators, weight_set)
+        position = np.where(tradable, signals, 0)
+        directional = position != 0
+        n_signals = int(directional.sum())
+        signal_returns = (position * forward)[directional]
+
+        held = np.where(holding, signals, 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            portfolio = np.where(
+                active_symbols > 0, (held * next_bar).sum(axis=0) / active_symbols, 0.0
+            )
+        equity = np.cumprod(1.0 + portfolio)
+        peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+        drawdown = 1.0 - equity / peak
+
+        results.append(
+            BacktestResult(
+                name=weight_set.name,
+                signals=n_signals,
+                buys=int((position == BUY).sum()),
+                sells=int((position == SELL).sum()),
+                hit_rate=round(float((signal_returns > 0).mean()), 4) if n_signals else 0.0,
+                avg_signal_return=round(float(signal_returns.mean()), 6) if n_signals else 0.0,
+                total_return=round(float(equity[-1] - 1.0), 6) if len(equity) else 0.0,
+                max_drawdown=round(float(drawdown.max()), 6) if len(drawdown) else 0.0,
+                exposure=(
+                    round(float((held != 0).sum() / holding.sum()), 4) if holding.any() else 0.0
+                ),
+                weight_set={
+                    "technical_weight": weight_set.technical_weight,
+                    "decision_threshold": weight_set.decision_threshold,
+                    "rules": asdict(weight_set.rules),
+                },
+            )
+        )
+    return results
@@ -0,0 +1,323 @@
+"""Local on-disk OHLCV store backed by memory-mapped column files.
+
+Each symbol has a directory holding one raw little-endian file per field
+(``time.bin`` as int64, the prices and volume as float64).  Files are only
+ever appended to -- apart from the last bar, which is overwritten in place
+while it is still forming -- so reading the latest window maps the file and
+copies the trailing slice straight into NumPy -- no parsing and no per-row
+objects.  Writes take an exclusive ``flock`` on the symbol's ``.lock`` file
+and reads a shared one, so workers never see a half-written bar.
+
+Gaps are filled by a pluggable :class:`CandleFetcher`.  A symbol whose data
+was refreshed within ``refresh_interval`` seconds is served from disk
+without touching the fetcher; after that bars from the last stored one on
+are requested: that bar is replaced by its latest version and newer ones
+are appended.  The time of the last refresh is the
+modification time of ``time.bin``, so it is shared across workers and
+survives restarts.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import re
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from pathlib import Path
+from typing import Any, Optional, Protocol, Union
+
+import numpy as np
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:  # Windows: a single worker, so the asyncio locks suffice
+    HAS_FCNTL = False
+
+from .candles import CandleArrays
+from .executors import ExecutorSaturated, LoopSemaphore
+from .metrics import ERRORS, FALLBACKS
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = ("time", "open", "high", "low", "close", "volume")
+_DTYPES = {"time": np.dtype("<i8")} | {field: np.dtype("<f8") for field in _FIELDS[1:]}
+_ITEMSIZE = 8
+_UNSAFE_CHARS = re.compile(r"[^A-Z0-9._^=-]")
+
+
+def _empty() -> CandleArrays:
+    return CandleArrays(*(np.empty(0, dtype=_DTYPES[field]) for field in _FIELDS))
+
+
+class CandleFetcher(Protocol):
+    """Source of candles used to fill the store."""
+
+    def fetch(self, symbol: str, since: Optional[int]) -> CandleArrays:
+        """Return candles for *symbol*, newer than *since* if given.
+
+        Called off the event loop; may block.  Overlapping bars are fine --
+        the store rewrites its last stored bar and keeps only newer ones.
+        """
+        ...
+
+
+class YFinanceFetcher:
+    """Fetch daily candles from Yahoo Finance via yfinance."""
+
+    def __init__(self, backfill_period: str = "3mo", interval: str = "1d") -> None:
+        self.backfill_period = backfill_period
+        self.interval = interval
+
+    def fetch(self, symbol: str, since: Optional[int]) -> CandleArrays:
+        import yfinance as yf
+
+        ticker = yf.Ticker(symbol)
+        if since is None:
+            df = ticker.history(period=self.backfill_period, interval=self.interval)
+        else:
+            # yfinance takes day-granular bounds; the store drops the overlap.
+            df = ticker.history(start=time.strftime("%Y-%m-%d", time.gmtime(since)), interval=self.interval)
+        if df.empty:
+            return _empty()
+
+        values = df[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype=np.float64)
+        return CandleArrays(
+            df.index.to_numpy(dtype="datetime64[s]").astype(np.int64),
+            *values.T,
+        ).sorted()
+
+
+class OfflineFetcher:
+    """Fetcher that never goes to the network; the store serves what it has."""
+
+    def fetch(self, symbol: str, since: Optional[int]) -> CandleArrays:
+        return _empty()
+
+
+class CandleStore:
+    """Append-only per-symbol candle files with a freshness window.
+
+    Parameters
+    ----------
+    root:
+        Directory holding one sub-directory per symbol.
+    fetcher:
+        Source used to fill gaps.
+    refresh_interval:
+        Seconds a symbol's data is considered fresh after a refresh.
+    window:
+        Default number of most recent bars returned by :meth:`window`.
+    run_blocking:
+        Coroutine function ``(fn, *args)`` used to run the fetcher off the
+        event loop; defaults to :func:`asyncio.to_thread`.
+    max_concurrent_fetches:
+        Fetches allowed in flight at once across all symbols.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        fetcher: CandleFetcher,
+        refresh_interval: float = 900.0,
+        window: int = 63,
+        run_blocking: Optional[Callable[..., Awaitable[Any]]] = None,
+        max_concurrent_fetches: int = 8,
+    ) -> None:
+        self.root = Path(root)
+        self.fetcher = fetcher
+        self.refresh_interval = refresh_interval
+        self.default_window = window
+        self._run_blocking = run_blocking or asyncio.to_thread
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._fetch_slots = LoopSemaphore(max_concurrent_fetches)
+
+        self.reads = 0
+        self.fresh_hits = 0
+        self.refreshes = 0
+        self.fetch_errors = 0
+        self.bars_appended = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def window(self, symbol: str, bars: Optional[int] = None) -> CandleArrays:
+        """Return the latest *bars* candles for *symbol*, refreshing if stale.
+
+        Concurrent calls for the same symbol share a single refresh.  If the
+        fetcher fails, whatever is already stored is returned.
+        """
+        self.reads += 1
+        if self.is_fresh(symbol):
+            self.fresh_hits += 1
+        else:
+            lock = self._locks.setdefault(symbol, asyncio.Lock())
+            async with lock:
+                # Another request may have refreshed while we waited.
+                if not self.is_fresh(symbol):
+                    await self.refresh(symbol)
+        return self.read(symbol, bars or self.default_window)
+
+    async def refresh(self, symbol: str) -> int:
+        """Fetch and store bars from the last stored one on.
+
+        Returns the number of bars written (see :meth:`append`).  Fetch
+        errors fall back to the stored data, but :class:`ExecutorSaturated`
+        is raised so the request is shed rather than served stale.
+        """
+        self.refreshes += 1
+        since = self.last_time(symbol)
+        try:
+            async with self._fetch_slots:
+                fetched = await self._run_blocking(self.fetcher.fetch, symbol, since)
+        except ExecutorSaturated:
+            raise
+        except Exception:
+            self.fetch_errors += 1
+            ERRORS.labels("signals", "candles").inc()
+            FALLBACKS.labels("signals", "stored_candles").inc()
+            logger.warning("Candle fetch failed for %s; serving stored data.", symbol)
+            return 0
+        appended = self.append(symbol, fetched)
+        self._touch(symbol)
+        return appended
+
+    def history(self, symbol: str) -> CandleArrays:
+        """Return every stored candle of *symbol*, oldest first."""
+        return self.read(symbol, self._count(self._dir(symbol)))
+
+    def read(self, symbol: str, bars: int) -> CandleArrays:
+        """Return up to *bars* of the most recent stored candles."""
+        directory = self._dir(symbol)
+        if self._count(directory) == 0:
+            return _empty()
+        with self._locked(directory, exclusive=False):
+            count = self._count(directory)
+            n = min(bars, count)
+            offset = (count - n) * _ITEMSIZE
+            columns = []
+            for field in _FIELDS:
+                mapped = np.memmap(
+                    directory / f"{field}.bin", dtype=_DTYPES[field], mode="r", offset=offset, shape=(n,)
+                )
+                columns.append(np.array(mapped))
+                del mapped
+        return CandleArrays(*columns)
+
+    def append(self, symbol: str, candles: CandleArrays) -> int:
+        """Store the bars of *candles* from the last stored one on.
+
+        A bar with the same timestamp as the last stored bar replaces it --
+        the current period's bar keeps changing until it closes -- and newer
+        bars are appended.  Returns the number of bars written.
+        """
+        if not len(candles):
+            return 0
+        directory = self._dir(symbol)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._locked(directory, exclusive=True):
+            count = self._count(directory)
+            last = self._last_time(directory, count)
+            start = 0 if last is None else int(np.searchsorted(candles.time, last, side="left"))
+            if start >= len(candles):
+                return 0
+            new = candles.tail(start)
+            if last is not None and new.time[0] == last:
+                count -= 1
+            # Time is written last, and a column only counts up to the
+            # shortest file, so a crash mid-write never exposes a partial new
+            # row.  Files are never shortened, so a reader that sized its
+            # slice before we started still maps within them.
+            for field in (*_FIELDS[1:], "time"):
+                with open(directory / f"{field}.bin", "r+b" if count else "wb") as fh:
+                    fh.seek(count * _ITEMSIZE)
+                    fh.write(np.ascontiguousarray(getattr(new, field), dtype=_DTYPES[field]).tobytes())
+        self.bars_appended += len(new)
+        return len(new)
+
+    def last_time(self, symbol: str) -> Optional[int]:
+        """Timestamp of the newest stored bar, or ``None`` if there is none."""
+        directory = self._dir(symbol)
+        if self._count(directory) == 0:
+            return None
+        with self._locked(directory, exclusive=False):
+            return self._last_time(directory, self._count(directory))
+
+    def is_fresh(self, symbol: str) -> bool:
+        try:
+            refreshed_at = (self._dir(symbol) / "time.bin").stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - refreshed_at < self.refresh_interval
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "reads": self.reads,
+            "fresh_hits": self.fresh_hits,
+            "refreshes": self.refreshes,
+            "fetch_errors": self.fetch_errors,
+            "bars_appended": self.bars_appended,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _dir(self, symbol: str) -> Path:
+        name = _UNSAFE_CHARS.sub("_", symbol.upper())
+        if name in ("", ".", ".."):
+            name = f"_{name}"
+        return self.root / name
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _locked(directory: Path, exclusive: bool) -> Iterator[None]:
+        """Hold the symbol's file lock, shared with other workers."""
+        if not HAS_FCNTL:
+            yield
+            return
+        with open(directory / ".lock", "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _last_time(directory: Path, count: int) -> Optional[int]:
+        if count == 0:
+            return None
+        with open(directory / "time.bin", "rb") as fh:
+            fh.seek((count - 1) * _ITEMSIZE)
+            return int(np.frombuffer(fh.read(_ITEMSIZE), dtype=_DTYPES["time"])[0])
+
+    @staticmethod
+    def _count(directory: Path) -> int:
+        try:
+            sizes = [os.path.getsize(directory / f"{field}.bin") for field in _FIELDS]
+        except FileNotFoundError:
+            return 0
+        return min(sizes) // _ITEMSIZE
+
+    def _touch(self, symbol: str) -> None:
+        """Record a refresh, even when it brought no new bars.
+
+        Unknown symbols get empty column files, so they are not re-fetched
+        on every request either.
+        """
+        directory = self._dir(symbol)
+        directory.mkdir(parents=True, exist_ok=True)
+        for field in _FIELDS:
+            (directory / f"{field}.bin").touch()
+
+
+def build_fetcher(name: str, backfill_period: str = "3mo") -> CandleFetcher:
+    """Return the fetcher named by ``settings.candle_fetcher``."""
+    if name == "offline":
+        return OfflineFetcher()
+    if name == "yfinance":
+        return YFinanceFetcher(backfill_period)
+    raise ValueError(f"unknown candle fetcher: {name!r}")
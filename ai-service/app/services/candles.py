@@ -0,0 +1,130 @@
+"""Columnar candle container shared by the analysis services.
+
+A year of minute bars sent as ``list[CandleData]`` costs one Pydantic object
+per row.  :class:`CandleArrays` holds the same history as six NumPy columns,
+built either from such a list or directly from a :class:`CandleColumns`
+payload (JSON arrays or base64 little-endian buffers) without creating any
+per-row objects.  Instances are always ordered by time.
+"""
+
+import base64
+import binascii
+import hashlib
+from dataclasses import dataclass
+from typing import Union
+
+import numpy as np
+
+from ..models.schemas import CandleColumns, CandleData
+
+_FIELDS = ("time", "open", "high", "low", "close", "volume")
+# Wire dtypes of the "f64le" encoding: int64 timestamps, float64 prices.
+_BINARY_DTYPES = {"time": np.dtype("<i8")} | {
+    field: np.dtype("<f8") for field in _FIELDS[1:]
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CandleArrays:
+    """Time-ordered candle history as parallel NumPy columns."""
+
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_columns(cls, columns: CandleColumns) -> "CandleArrays":
+        """Decode a columnar payload.
+
+        Raises ``ValueError`` if a column is malformed or the columns differ
+        in length.
+        """
+        arrays = {}
+        for field in _FIELDS:
+            value = getattr(columns, field)
+            if columns.encoding == "f64le":
+                if not isinstance(value, str):
+                    raise ValueError(f"column '{field}' must be a base64 string for f64le")
+                arrays[field] = _decode_binary(field, value)
+            else:
+                if isinstance(value, str):
+                    raise ValueError(f"column '{field}' must be a JSON array for json encoding")
+                dtype = np.int64 if field == "time" else np.float64
+                arrays[field] = np.asarray(value, dtype=dtype)
+
+        lengths = {len(a) for a in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError("all candle columns must have the same length")
+        return cls(**arrays).sorted()
+
+    @classmethod
+    def from_candles(cls, candles: list[CandleData]) -> "CandleArrays":
+        """Copy a list of :class:`CandleData` into columns."""
+        n = len(candles)
+        return cls(
+            time=np.fromiter((c.time for c in candles), dtype=np.int64, count=n),
+            open=np.fromiter((c.open for c in candles), dtype=np.float64, count=n),
+            high=np.fromiter((c.high for c in candles), dtype=np.float64, count=n),
+            low=np.fromiter((c.low for c in candles), dtype=np.float64, count=n),
+            close=np.fromiter((c.close for c in candles), dtype=np.float64, count=n),
+            volume=np.fromiter((c.volume for c in candles), dtype=np.float64, count=n),
+        ).sorted()
+
+    @classmethod
+    def coerce(cls, candles: Union["CandleArrays", list[CandleData]]) -> "CandleArrays":
+        """Return *candles* as :class:`CandleArrays`, converting a list if needed."""
+        if isinstance(candles, cls):
+            return candles
+        return cls.from_candles(candles)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def sorted(self) -> "CandleArrays":
+        """Return the candles ordered by time (``self`` if already ordered)."""
+        if len(self.time) < 2 or bool(np.all(self.time[1:] >= self.time[:-1])):
+            return self
+        order = np.argsort(self.time, kind="stable")
+        return CandleArrays(*(getattr(self, field)[order] for field in _FIELDS))
+
+    def fingerprint(self) -> str:
+        """Digest identifying this window by its time, close and volume columns.
+
+        These are the only columns the indicators read, so equal
+        fingerprints mean equal analysis inputs.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for column in (self.time, self.close, self.volume):
+            digest.update(np.ascontiguousarray(column))
+        return digest.hexdigest()
+
+    def tail(self, start: int) -> "CandleArrays":
+        """Return the candles from index *start* onwards (views, no copy)."""
+        return CandleArrays(*(getattr(self, field)[start:] for field in _FIELDS))
+
+    def head(self, stop: int) -> "CandleArrays":
+        """Return the candles before index *stop* (views, no copy)."""
+        return CandleArrays(*(getattr(self, field)[:stop] for field in _FIELDS))
+
+
+def _decode_binary(field: str, value: str) -> np.ndarray:
+    dtype = _BINARY_DTYPES[field]
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError) as exc:
+        raise ValueError(f"column '{field}' is not valid base64") from exc
+    if len(raw) % dtype.itemsize:
+        raise ValueError(f"column '{field}' length is not a multiple of {dtype.itemsize} bytes")
+    # frombuffer is a view over the decoded bytes; native-endian hosts need no copy.
+    return np.frombuffer(raw, dtype=dtype).astype(dtype.newbyteorder("="), copy=False)
@@ -0,0 +1,316 @@
+"""Executor layer that keeps blocking work off the event loop.
+
+Two pools are shared per process: an ``io`` thread pool for blocking network
+calls (market-data fetches) and an ``indicators`` pool -- a process pool by
+default -- for CPU-bound indicator math.  Each pool bounds how much work may
+wait for a worker and applies a per-task timeout; work beyond the bound is
+rejected with :class:`ExecutorSaturated` (mapped to HTTP 503 by the routers)
+rather than queued indefinitely.
+
+:class:`LoopLagMonitor` samples how late the event loop wakes up from a
+short sleep, which is the latency every other request on the worker pays.
+:class:`LoopSemaphore` bounds concurrent calls to an upstream from
+module-level singletons built before any event loop runs.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Optional, TypeVar
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when a pool's workers and queue are all occupied."""
+
+
+class LoopSemaphore:
+    """An :class:`asyncio.Semaphore` created in the running event loop.
+
+    Services built at import time cannot create their semaphores up front;
+    this one is created on first use, and again if the running loop changes
+    (e.g. between ``asyncio.run`` calls in a script).  Use it as
+    ``async with``.
+    """
+
+    def __init__(self, value: int) -> None:
+        self.value = max(1, value)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._loop, self._semaphore = loop, asyncio.Semaphore(self.value)
+        await self._semaphore.acquire()
+
+    async def __aexit__(self, *_: Any) -> None:
+        assert self._semaphore is not None
+        self._semaphore.release()
+
+
+def _warm_indicator_worker() -> None:
+    """Import the indicator stack once per worker process."""
+    from . import technical  # noqa: F401
+
+
+class ExecutorPool:
+    """A bounded thread or process pool with per-task timeouts.
+
+    Parameters
+    ----------
+    name:
+        Label used in stats and log messages.
+    kind:
+        ``"thread"``, ``"process"`` or ``"inline"`` (run on the calling
+        thread; useful for debugging and single-core deployments).
+    max_workers:
+        Worker threads/processes.
+    max_queue:
+        Tasks allowed to wait for a free worker before new ones are rejected.
+    timeout:
+        Default seconds :meth:`run` waits for a result.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        max_workers: int,
+        max_queue: int,
+        timeout: float,
+    ) -> None:
+        if kind not in ("thread", "process", "inline"):
+            raise ValueError(f"unknown executor kind: {kind!r}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.peak_pending = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def run(
+        self, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None
+    ) -> T:
+        """Run ``fn(*args)`` on the pool and return its result.
+
+        Raises :class:`ExecutorSaturated` if the pool is full and
+        ``TimeoutError`` if the result takes longer than *timeout* seconds
+        (the pool default when ``None``).  A timed-out task that already
+        started keeps its worker until it finishes and still counts towards
+        the queue bound.
+        """
+        if self.kind == "inline":
+            self.submitted += 1
+            try:
+                result = fn(*args)
+            except Exception:
+                self.failed += 1
+                raise
+            self.completed += 1
+            return result
+
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.name} executor is saturated")
+            self._pending += 1
+            self.peak_pending = max(self.peak_pending, self._pending)
+        self.submitted += 1
+
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            result = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout if timeout is not None else self.timeout
+            )
+        except TimeoutError:
+            self.timeouts += 1
+            logger.warning("%s task %s timed out", self.name, getattr(fn, "__qualname__", fn))
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        return result
+
+    @property
+    def executor(self) -> Executor:
+        """The underlying executor, created on first use."""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_indicator_worker,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the workers, cancelling tasks that have not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "timeout": self.timeout,
+            "pending": self._pending,
+            "peak_pending": self.peak_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _release(self, _: Optional[Future]) -> None:
+        # Runs on a worker or pool-management thread.
+        with self._lock:
+            self._pending -= 1
+
+
+class LoopLagMonitor:
+    """Measure event-loop responsiveness by timing a periodic sleep.
+
+    Every *interval* seconds the monitor records how much later than
+    scheduled it woke up; a loop blocked by synchronous work shows up as
+    lag of the same duration.
+    """
+
+    def __init__(self, interval: float = 0.1, samples: int = 600) -> None:
+        self.interval = interval
+        self._samples: deque[float] = deque(maxlen=samples)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag = 0.0
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self.max_lag = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        samples = sorted(self._samples)
+        n = len(samples)
+
+        def pct(q: float) -> float:
+            return round(samples[min(n - 1, int(q * n))] * 1000, 3) if n else 0.0
+
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_ms": self.interval * 1000,
+            "samples": n,
+            "last_ms": round(self._samples[-1] * 1000, 3) if n else 0.0,
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max_lag * 1000, 3),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+
+class ExecutorRegistry:
+    """Owns this process's executor pools and the loop-lag monitor."""
+
+    def __init__(self) -> None:
+        self.io = ExecutorPool(
+            "io",
+            "thread",
+            max_workers=settings.io_executor_workers,
+            max_queue=settings.io_executor_queue,
+            timeout=settings.io_task_timeout,
+        )
+        self.indicators = ExecutorPool(
+            "indicators",
+            settings.indicator_executor,
+            max_workers=settings.indicator_executor_workers,
+            max_queue=settings.indicator_executor_queue,
+            timeout=settings.indicator_task_timeout,
+        )
+        self.loop_lag = LoopLagMonitor(interval=settings.loop_lag_interval)
+
+    async def startup(self, prewarm: bool = False) -> None:
+        """Start the loop-lag monitor.
+
+        With *prewarm*, also spawn the indicator worker processes now so the
+        first requests do not pay the spawn and import cost.
+        """
+        await self.loop_lag.start()
+        if prewarm and self.indicators.kind == "process":
+            pool = self.indicators.executor
+            await asyncio.gather(*[
+                asyncio.wrap_future(pool.submit(_warm_indicator_worker))
+                for _ in range(self.indicators.max_workers)
+            ])
+
+    async def shutdown(self) -> None:
+        await self.loop_lag.stop()
+        self.io.shutdown()
+        self.indicators.shutdown()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pools": [self.io.stats(), self.indicators.stats()],
+            "loop_lag": self.loop_lag.stats(),
+        }
+
+
+executors = ExecutorRegistry()
@@ -0,0 +1,170 @@
+"""Vectorised indicator engine for many symbols at once.
+
+Prices are passed as 2-D ``(symbols, bars)`` NumPy panels, right-aligned so
+the most recent bar of every symbol is in the last column; shorter histories
+are left-padded (the padding values are ignored).  All recursive indicators
+(EMA 12/26, MACD signal, Wilder-smoothed RSI gains/losses) are advanced
+together in a single loop over bars that is vectorised across symbols, and
+the window indicators (SMA, Bollinger) only touch the trailing window.
+
+The latest values match :meth:`TechnicalAnalyzer.analyze` on its pure
+NumPy/pandas fallback path (i.e. without pandas-ta), including its neutral
+defaults for short or degenerate histories.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+INDICATOR_KEYS = (
+    "rsi",
+    "macd",
+    "macd_signal",
+    "macd_histogram",
+    "bb_upper",
+    "bb_middle",
+    "bb_lower",
+    "sma_20",
+    "sma_50",
+    "ema_12",
+    "ema_26",
+    "current_price",
+    "avg_volume",
+    "volume_ratio",
+)
+
+# Neutral values returned for symbols with fewer than two bars.
+_DEFAULTS = {key: 0.0 for key in INDICATOR_KEYS} | {"rsi": 50.0, "volume_ratio": 1.0}
+
+
+def _window_stats(
+    close: np.ndarray, valid: np.ndarray, period: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Mean and sample std of the trailing *period* valid bars (``min_periods=1``)."""
+    window = close[:, -period:]
+    mask = valid[:, -period:]
+    count = mask.sum(axis=1)
+    values = np.where(mask, window, 0.0)
+    mean = values.sum(axis=1) / np.maximum(count, 1)
+    sq = np.where(mask, (window - mean[:, None]) ** 2, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(sq / (count - 1))
+    std[count < 2] = np.nan
+    return mean, std
+
+
+def latest_indicators(
+    close: np.ndarray,
+    volume: np.ndarray,
+    lengths: Optional[np.ndarray] = None,
+) -> dict[str, np.ndarray]:
+    """Return the latest indicator values for every symbol in the panel.
+
+    Parameters
+    ----------
+    close, volume:
+        ``float64`` arrays of shape ``(symbols, bars)``, oldest bar first,
+        right-aligned.
+    lengths:
+        Number of valid (right-most) bars per symbol.  Defaults to the full
+        panel width for every symbol.
+
+    Returns
+    -------
+    dict[str, numpy.ndarray]
+        One ``(symbols,)`` array per key of :meth:`TechnicalAnalyzer.analyze`.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    if close.ndim != 2 or close.shape != volume.shape:
+        raise ValueError("close and volume must be 2-D arrays of the same shape")
+
+    n_symbols, n_bars = close.shape
+    if lengths is None:
+        lengths = np.full(n_symbols, n_bars, dtype=np.int64)
+    else:
+        lengths = np.minimum(np.asarray(lengths, dtype=np.int64), n_bars)
+    start = n_bars - lengths
+    valid = np.arange(n_bars)[None, :] >= start[:, None]
+
+    # --- Recursive indicators: one pass over bars, vectorised over symbols --
+    # rows: ema_12, ema_26, macd signal, avg gain, avg loss
+    alpha = np.array([2 / 13, 2 / 27, 2 / 10, 1 / 14, 1 / 14])[:, None]
+    state = np.zeros((5, n_symbols))
+    prev_close = np.zeros(n_symbols)
+    for t in range(n_bars):
+        x = close[:, t]
+        first = start == t
+        active = start <= t
+        delta = x - prev_close
+        ema_12 = np.where(first, x, state[0] + alpha[0] * (x - state[0]))
+        ema_26 = np.where(first, x, state[1] + alpha[1] * (x - state[1]))
+        macd_now = ema_12 - ema_26
+        signal = np.where(first, macd_now, state[2] + alpha[2] * (macd_now - state[2]))
+        gain = np.where(first, 0.0, np.maximum(delta, 0.0))
+        loss = np.where(first, 0.0, np.maximum(-delta, 0.0))
+        avg_gain = np.where(first, gain, state[3] + alpha[3] * (gain - state[3]))
+        avg_loss = np.where(first, loss, state[4] + alpha[4] * (loss - state[4]))
+        updated = np.stack([ema_12, ema_26, signal, avg_gain, avg_loss])
+        state = np.where(active, updated, state)
+        prev_close = np.where(active, x, prev_close)
+
+    ema_12, ema_26, macd_signal, avg_gain, avg_loss = state
+    macd = ema_12 - ema_26
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = avg_gain / np.where(avg_loss == 0, np.nan, avg_loss)
+        rsi = 100.0 - 100.0 / (1.0 + rs)
+    rsi[lengths < 14] = np.nan
+
+    # --- Window indicators: trailing bars only ---------------------------
+    sma_20, std_20 = _window_stats(close, valid, 20)
+    sma_50, _ = _window_stats(close, valid, 50)
+    bb_upper = sma_20 + 2.0 * std_20
+    bb_lower = sma_20 - 2.0 * std_20
+
+    current_price = close[:, -1]
+    vol_count = np.maximum(lengths, 1)
+    avg_volume = np.where(valid, volume, 0.0).sum(axis=1) / vol_count
+    with np.errstate(invalid="ignore", divide="ignore"):
+        volume_ratio = np.where(avg_volume > 0, volume[:, -1] / avg_volume, 1.0)
+
+    result = {
+        "rsi": np.where(np.isnan(rsi), 50.0, rsi),
+        "macd": macd,
+        "macd_signal": macd_signal,
+        "macd_histogram": macd - macd_signal,
+        "bb_upper": np.nan_to_num(bb_upper, nan=0.0),
+        "bb_middle": sma_20,
+        "bb_lower": np.nan_to_num(bb_lower, nan=0.0),
+        "sma_20": sma_20,
+        "sma_50": sma_50,
+        "ema_12": ema_12,
+        "ema_26": ema_26,
+        "current_price": current_price,
+        "avg_volume": avg_volume,
+        "volume_ratio": volume_ratio,
+    }
+
+    short = lengths < 2
+    if short.any():
+        for key, default in _DEFAULTS.items():
+            result[key] = np.where(short, default, result[key])
+    return result
+
+
+def stack_panel(
+    series: list[tuple[np.ndarray, np.ndarray]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Right-align per-symbol ``(close, volume)`` arrays into a padded panel.
+
+    Returns ``(close, volume, lengths)`` ready for :func:`latest_indicators`.
+    """
+    lengths = np.array([len(c) for c, _ in series], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    close = np.zeros((len(series), width))
+    volume = np.zeros((len(series), width))
+    for i, (c, v) in enumerate(series):
+        if len(c):
+            close[i, width - len(c):] = c
+            volume[i, width - len(v):] = v
+    return close, volume, lengths
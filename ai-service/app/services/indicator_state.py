@@ -0,0 +1,295 @@
+"""Incremental (streaming) technical indicator state.
+
+:class:`IndicatorState` keeps the small running state behind every indicator
+produced by :meth:`TechnicalAnalyzer.analyze` -- EMA 12/26, the MACD signal
+EMA, Wilder-smoothed RSI gains/losses, the trailing 50 closes for SMA and
+Bollinger bands, and the running volume sum -- so a new candle updates all
+of them in constant time instead of recomputing over the whole history.
+Values match the NumPy fallback path of ``analyze()``.
+
+:class:`IndicatorStateStore` caches one state per symbol.  It pays off for
+a symbol's whole, append-only stored history (see
+:class:`~app.services.candle_store.CandleStore`), where each request adds
+at most a few candles; a sliding window of the latest bars never extends
+the previous one.
+"""
+
+import asyncio
+import copy
+import math
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional, Union
+
+from cachetools import TTLCache
+
+from ..models.schemas import CandleData
+from .candles import CandleArrays
+
+_WINDOW = 50
+_ALPHA_EMA_12 = 2 / 13
+_ALPHA_EMA_26 = 2 / 27
+_ALPHA_SIGNAL = 2 / 10
+_ALPHA_RSI = 1 / 14
+
+
+class IndicatorState:
+    """Running indicator state for a single symbol."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.last_time: Optional[int] = None
+        self.prev_close = 0.0
+        self.last_volume = 0.0
+        self.volume_sum = 0.0
+        self.ema_12 = 0.0
+        self.ema_26 = 0.0
+        self.macd_signal = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.closes: deque[float] = deque(maxlen=_WINDOW)
+
+    # ------------------------------------------------------------------
+    # Construction / serialisation
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_candles(
+        cls, candles: Union[list[CandleData], CandleArrays]
+    ) -> "IndicatorState":
+        """Seed a state from a full candle history (any order)."""
+        state = cls()
+        state.extend(CandleArrays.coerce(candles))
+        return state
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the state."""
+        return {
+            "count": self.count,
+            "last_time": self.last_time,
+            "prev_close": self.prev_close,
+            "last_volume": self.last_volume,
+            "volume_sum": self.volume_sum,
+            "ema_12": self.ema_12,
+            "ema_26": self.ema_26,
+            "macd_signal": self.macd_signal,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "closes": list(self.closes),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "IndicatorState":
+        """Rebuild a state from :meth:`to_dict` output."""
+        state = cls()
+        for key, value in data.items():
+            if key == "closes":
+                state.closes.extend(value)
+            else:
+                setattr(state, key, value)
+        return state
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update(self, candle: CandleData) -> None:
+        """Advance every indicator by one candle in O(1).
+
+        Raises ``ValueError`` if *candle* is not newer than the last one seen.
+        """
+        self.update_values(candle.time, candle.close, candle.volume)
+
+    def extend(self, candles: CandleArrays) -> None:
+        """Apply every candle of a time-ordered :class:`CandleArrays`."""
+        for t, close, volume in zip(
+            candles.time.tolist(), candles.close.tolist(), candles.volume.tolist()
+        ):
+            self.update_values(t, close, volume)
+
+    def update_values(self, time: int, close: float, volume: float) -> None:
+        """:meth:`update` for a candle given as plain values."""
+        if self.last_time is not None and time <= self.last_time:
+            raise ValueError(
+                f"candle at {time} is not newer than last update at {self.last_time}"
+            )
+
+        close = float(close)
+        if self.count == 0:
+            self.ema_12 = self.ema_26 = close
+            self.macd_signal = 0.0
+            self.avg_gain = self.avg_loss = 0.0
+        else:
+            delta = close - self.prev_close
+            self.ema_12 += _ALPHA_EMA_12 * (close - self.ema_12)
+            self.ema_26 += _ALPHA_EMA_26 * (close - self.ema_26)
+            self.macd_signal += _ALPHA_SIGNAL * ((self.ema_12 - self.ema_26) - self.macd_signal)
+            self.avg_gain += _ALPHA_RSI * (max(delta, 0.0) - self.avg_gain)
+            self.avg_loss += _ALPHA_RSI * (max(-delta, 0.0) - self.avg_loss)
+
+        self.count += 1
+        self.last_time = int(time)
+        self.prev_close = close
+        self.last_volume = float(volume)
+        self.volume_sum += self.last_volume
+        self.closes.append(close)
+
+    def peek(self, time: int, close: float, volume: float) -> dict:
+        """Return :meth:`indicators` with one more candle applied to a copy.
+
+        Used for a still-forming candle, whose values change until it
+        closes; the state itself is left unchanged.
+        """
+        state = copy.copy(self)
+        state.closes = deque(self.closes, maxlen=_WINDOW)
+        state.update_values(time, close, volume)
+        return state.indicators()
+
+    def indicators(self) -> dict:
+        """Return the current indicators in the shape of ``analyze()``."""
+        if self.count < 2:
+            return {
+                "rsi": 50.0,
+                "macd": 0.0,
+                "macd_signal": 0.0,
+                "macd_histogram": 0.0,
+                "bb_upper": 0.0,
+                "bb_middle": 0.0,
+                "bb_lower": 0.0,
+                "sma_20": 0.0,
+                "sma_50": 0.0,
+                "ema_12": 0.0,
+                "ema_26": 0.0,
+                "current_price": 0.0,
+                "avg_volume": 0.0,
+                "volume_ratio": 1.0,
+            }
+
+        rsi = 50.0
+        if self.count >= 14 and self.avg_loss != 0:
+            rsi = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+        closes = list(self.closes)
+        window_20 = closes[-20:]
+        sma_20 = sum(window_20) / len(window_20)
+        sma_50 = sum(closes) / len(closes)
+        bb_upper = bb_lower = 0.0
+        if len(window_20) > 1:
+            std_20 = math.sqrt(
+                sum((c - sma_20) ** 2 for c in window_20) / (len(window_20) - 1)
+            )
+            bb_upper = sma_20 + 2.0 * std_20
+            bb_lower = sma_20 - 2.0 * std_20
+
+        macd = self.ema_12 - self.ema_26
+        avg_volume = self.volume_sum / self.count
+        return {
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": self.macd_signal,
+            "macd_histogram": macd - self.macd_signal,
+            "bb_upper": bb_upper,
+            "bb_middle": sma_20,
+            "bb_lower": bb_lower,
+            "sma_20": sma_20,
+            "sma_50": sma_50,
+            "ema_12": self.ema_12,
+            "ema_26": self.ema_26,
+            "current_price": self.prev_close,
+            "avg_volume": avg_volume,
+            "volume_ratio": self.last_volume / avg_volume if avg_volume > 0 else 1.0,
+        }
+
+
+class IndicatorStateStore:
+    """Bounded per-symbol cache of :class:`IndicatorState` objects.
+
+    A cached state covers every candle of a symbol's history but the last,
+    which may still be forming (the candle store rewrites it until it
+    closes); :meth:`advance` applies that candle to a copy.  The state is
+    reused when the supplied history starts with exactly the candles it was
+    built from -- checked against a fingerprint of that prefix -- and only
+    the newly closed candles are applied.  Otherwise, or when more than
+    ``max_inline_updates`` candles are new, it is re-seeded with
+    *run_blocking*, off the event loop.
+
+    Parameters
+    ----------
+    maxsize, ttl:
+        Bound and lifetime of the per-symbol cache.
+    run_blocking:
+        Coroutine function ``(fn, *args)`` used to re-seed; defaults to
+        :func:`asyncio.to_thread`.
+    max_inline_updates:
+        New candles applied on the event loop before re-seeding instead.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 86_400.0,
+        run_blocking: Optional[Callable[..., Awaitable[Any]]] = None,
+        max_inline_updates: int = 256,
+    ) -> None:
+        # (state, fingerprint of the candles it covers) by symbol.
+        self._states: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._run_blocking = run_blocking or asyncio.to_thread
+        self.max_inline_updates = max_inline_updates
+        self.incremental_updates = 0
+        self.reseeds = 0
+
+    def get(self, symbol: str) -> Optional[IndicatorState]:
+        entry = self._states.get(symbol)
+        return entry[0] if entry is not None else None
+
+    async def advance(
+        self, symbol: str, candles: Union[list[CandleData], CandleArrays]
+    ) -> dict:
+        """Return indicators for *symbol* given its full candle history.
+
+        Raises ``ValueError`` if the history repeats a timestamp; the
+        symbol's state is dropped and the caller should compute the
+        indicators in full instead.
+        """
+        arrays = CandleArrays.coerce(candles)
+        if not len(arrays):
+            return IndicatorState().indicators()
+        closed = len(arrays) - 1
+        entry = self._states.get(symbol)
+        try:
+            if entry is not None and self._extends(entry, arrays, closed):
+                state, fingerprint = entry
+                if state.count < closed:
+                    state.extend(arrays.head(closed).tail(state.count))
+                    fingerprint = arrays.head(closed).fingerprint()
+                self.incremental_updates += 1
+            else:
+                state = await self._run_blocking(IndicatorState.from_candles, arrays.head(closed))
+                fingerprint = arrays.head(closed).fingerprint()
+                self.reseeds += 1
+            self._states[symbol] = (state, fingerprint)
+            return state.peek(
+                int(arrays.time[-1]), float(arrays.close[-1]), float(arrays.volume[-1])
+            )
+        except ValueError:
+            # A partly applied update leaves the cached state unusable.
+            self._states.pop(symbol, None)
+            raise
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._states),
+            "incremental_updates": self.incremental_updates,
+            "reseeds": self.reseeds,
+        }
+
+    def _extends(
+        self, entry: tuple[IndicatorState, str], candles: CandleArrays, closed: int
+    ) -> bool:
+        """Whether the first ``closed`` *candles* extend the history of *entry*."""
+        state, fingerprint = entry
+        return (
+            state.count <= closed
+            and closed - state.count <= self.max_inline_updates
+            and candles.head(state.count).fingerprint() == fingerprint
+        )
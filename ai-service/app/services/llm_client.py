@@ -1,18 +1,57 @@
 """LLM client for deep stock analysis using Claude Sonnet."""
 
-import json
 import logging
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Literal, Optional
 
-from ..config import settings
+from pydantic import BaseModel, Field
 
-logger = logging.getLogger(__name__)
+from .anthropic_pool import client_registry
+from .metrics import ERRORS, FALLBACKS
+from .structured_output import SINGLE, ToolSpec, structured_output
 
-try:
+if TYPE_CHECKING:
     import anthropic
-except ImportError:
-    anthropic = None  # type: ignore[assignment]
-    logger.warning("anthropic package not installed; LLM deep analysis will return defaults.")
+
+logger = logging.getLogger(__name__)
+
+
+
+# Same keys as ``_normalise_response``; the docstring and field descriptions
+# are sent to the model as the tool schema.
+class DeepAnalysis(BaseModel):
+    """One stock's trading recommendation."""
+
+    signal: Literal["BUY", "SELL", "HOLD"] = Field(..., description="Trading recommendation")
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence between 0 and 1")
+    reasoning: str = Field(..., description="Detailed multi-sentence reasoning")
+    risk_level: Literal["LOW", "MEDIUM", "HIGH"] = Field(..., description="Risk assessment")
+    price_target: Optional[float] = Field(None, description="Suggested price target, or null")
+    stop_loss: Optional[float] = Field(None, description="Suggested stop loss, or null")
+    technical_summary: str = Field(..., description="One-paragraph technical analysis summary")
+    sentiment_summary: str = Field(..., description="One-paragraph sentiment analysis summary")
+
+
+_ANALYSIS_TOOL = ToolSpec(
+    "record_analysis",
+    "Record the trading recommendation for the stock.",
+    DeepAnalysis,
+)
+_BATCH_ANALYSIS_TOOL = ToolSpec(
+    "record_analyses",
+    "Record one trading recommendation per stock, keyed by ticker symbol.",
+    DeepAnalysis,
+    keyed=True,
+)
+
+# Identical on every call, so it is sent as a cached system prefix; only the
+# per-symbol data goes in the user message.
+_SYSTEM_PROMPT = (
+    "You are a professional stock analyst. For each stock you are given, "
+    "analyse its technical indicators and sentiment data and provide a "
+    "comprehensive trading recommendation. Record it by calling the tool "
+    "provided. When given several stocks, analyse each independently and "
+    "record one entry per ticker symbol."
+)
 
 
 class LLMClient:
@@ -20,12 +59,15 @@ class LLMClient:
 
     SONNET_MODEL = "claude-sonnet-4-5-20250929"
 
-    def __init__(self) -> None:
-        self._client: Optional["anthropic.AsyncAnthropic"] = None
-        if anthropic and settings.anthropic_api_key:
-            self._client = anthropic.AsyncAnthropic(
-                api_key=settings.anthropic_api_key,
-            )
+    @property
+    def _client(self) -> Optional["anthropic.AsyncAnthropic"]:
+        """Return the process-wide pooled client (``None`` when unconfigured)."""
+        return client_registry.client
+
+    @property
+    def available(self) -> bool:
+        """Whether an Anthropic client is configured."""
+        return self._client is not None
 
     # ------------------------------------------------------------------
     # Public API
@@ -46,30 +88,79 @@ class LLMClient:
         """
         if self._client is None:
             logger.info("Anthropic API key not configured; returning default HOLD analysis.")
+            FALLBACKS.labels("signals", "unavailable").inc()
             return self._default_analysis(symbol, price)
 
         prompt = self._build_prompt(symbol, technical_data, sentiment_data, price)
 
         try:
-            response = await self._client.messages.create(
+            entries = await structured_output.request(
+                self._client,
+                endpoint="signals.deep_analysis",
                 model=self.SONNET_MODEL,
                 max_tokens=2048,
-                messages=[{"role": "user", "content": prompt}],
+                system=_SYSTEM_PROMPT,
+                prompt=prompt,
+                tool=_ANALYSIS_TOOL,
             )
+            analysis = entries[SINGLE]
+            return self._normalise_response(analysis.model_dump(), symbol, price)
+
+        except Exception:
+            logger.exception("Error during LLM deep analysis; returning defaults.")
+            ERRORS.labels("signals", "llm").inc()
+            FALLBACKS.labels("signals", "llm_defaults").inc()
+            # Flagged so callers can avoid caching a transient failure.
+            return {**self._default_analysis(symbol, price), "fallback": True}
 
-            raw_text = response.content[0].text.strip()
-            # Strip markdown code fences if present
-            if raw_text.startswith("```"):
-                raw_text = raw_text.split("\n", 1)[-1]
-                if raw_text.endswith("```"):
-                    raw_text = raw_text[: -len("```")].strip()
+    async def deep_analysis_batch(
+        self, requests: list[dict[str, Any]]
+    ) -> list[Optional[dict[str, Any]]]:
+        """Analyse several symbols in one call.
 
-            parsed: dict = json.loads(raw_text)
-            return self._normalise_response(parsed, symbol, price)
+        Each item of *requests* holds the keyword arguments of
+        :meth:`deep_analysis` (``symbol``, ``technical_data``,
+        ``sentiment_data``, ``price``); symbols must be unique.  The shared
+        instructions are sent once and the model records one entry per
+        symbol through a tool call.  Results are returned in request order,
+        with ``None`` for entries still missing or invalid after the
+        structured-output repair -- or for all of them, if the call itself
+        fails.  Callers re-run those with :meth:`deep_analysis`, under
+        whatever concurrency limit they apply to LLM calls.
+        """
+        if len(requests) <= 1 or self._client is None:
+            return [await self.deep_analysis(**request) for request in requests]
 
+        entries: dict[str, BaseModel] = {}
+        try:
+            entries = await structured_output.request(
+                self._client,
+                endpoint="signals.deep_analysis_batch",
+                model=self.SONNET_MODEL,
+                max_tokens=min(8192, 1024 * len(requests)),
+                system=_SYSTEM_PROMPT,
+                prompt=self._build_batch_prompt(requests),
+                tool=_BATCH_ANALYSIS_TOOL,
+                keys=[request["symbol"] for request in requests],
+            )
         except Exception:
-            logger.exception("Error during LLM deep analysis; returning defaults.")
-            return self._default_analysis(symbol, price)
+            ERRORS.labels("signals", "llm").inc()
+            logger.exception(
+                "Batched LLM deep analysis failed for %d symbols; retrying individually.",
+                len(requests),
+            )
+
+        results: list[Optional[dict[str, Any]]] = []
+        for request in requests:
+            entry = entries.get(request["symbol"])
+            results.append(
+                None
+                if entry is None
+                else self._normalise_response(
+                    entry.model_dump(), request["symbol"], request["price"]
+                )
+            )
+        return results
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -86,23 +177,31 @@ class LLMClient:
         sent_summary = "\n".join(f"  {k}: {v}" for k, v in sentiment_data.items())
 
         return (
-            "You are a professional stock analyst. Analyse the following data "
-            f"for {symbol} (current price: ${price:.2f}) and provide a "
-            "comprehensive trading recommendation.\n\n"
+            f"Analyse the following data for {symbol} (current price: ${price:.2f}).\n\n"
             "TECHNICAL INDICATORS:\n"
             f"{tech_summary}\n\n"
             "SENTIMENT DATA:\n"
-            f"{sent_summary}\n\n"
-            "Provide your analysis as a JSON object with EXACTLY these keys:\n"
-            '  "signal": one of "BUY", "SELL", or "HOLD"\n'
-            '  "confidence": float between 0 and 1\n'
-            '  "reasoning": detailed multi-sentence reasoning\n'
-            '  "risk_level": one of "LOW", "MEDIUM", or "HIGH"\n'
-            '  "price_target": suggested price target as a float or null\n'
-            '  "stop_loss": suggested stop loss as a float or null\n'
-            '  "technical_summary": one-paragraph technical analysis summary\n'
-            '  "sentiment_summary": one-paragraph sentiment analysis summary\n\n'
-            "Respond with ONLY the JSON object. No additional text."
+            f"{sent_summary}"
+        )
+
+    @staticmethod
+    def _build_batch_prompt(requests: list[dict[str, Any]]) -> str:
+        blocks = []
+        for request in requests:
+            tech_summary = "\n".join(f"  {k}: {v}" for k, v in request["technical_data"].items())
+            sent_summary = "\n".join(f"  {k}: {v}" for k, v in request["sentiment_data"].items())
+            blocks.append(
+                f"=== {request['symbol']} (current price: ${request['price']:.2f}) ===\n"
+                "TECHNICAL INDICATORS:\n"
+                f"{tech_summary}\n"
+                "SENTIMENT DATA:\n"
+                f"{sent_summary}"
+            )
+        symbols = ", ".join(request["symbol"] for request in requests)
+
+        return (
+            f"Analyse each of the following {len(requests)} stocks ({symbols}).\n\n"
+            + "\n\n".join(blocks)
         )
 
     @staticmethod
@@ -0,0 +1,132 @@
+"""Per-endpoint token and prompt-cache accounting for Anthropic calls.
+
+Every call site sends its fixed instructions as a ``system`` block marked
+with :func:`cached_system`, so Anthropic can serve that prefix from its
+prompt cache, and passes the response to :meth:`LLMUsageTracker.record`.
+The tracker sums the ``usage`` counters per endpoint -- including
+``cache_read_input_tokens`` and ``cache_creation_input_tokens`` -- and
+splits latency by whether the call read from the cache, which is where the
+savings show up.  Latency and token totals per model also go to the
+``/metrics`` histograms and counters.
+"""
+
+import logging
+from typing import Any
+
+from .metrics import LLM_REQUEST_SECONDS, LLM_TOKENS, STAGE_SECONDS, pipeline_of
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+# ``kind`` label of each field in the token counter.
+_TOKEN_KINDS = {
+    "input_tokens": "input",
+    "output_tokens": "output",
+    "cache_read_input_tokens": "cache_read",
+    "cache_creation_input_tokens": "cache_write",
+}
+
+
+def cached_system(text: str) -> list[dict[str, Any]]:
+    """Return *text* as a ``system`` parameter marked for prompt caching.
+
+    Prefixes shorter than the model's minimum cacheable length are sent
+    normally; the API then reports no cache reads or writes for them.
+    """
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+class _EndpointUsage:
+    """Running totals for one endpoint."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cache_hits = 0
+        self.tokens = dict.fromkeys(_TOKEN_FIELDS, 0)
+        self.cached_seconds = 0.0
+        self.uncached_seconds = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        uncached_calls = self.calls - self.cache_hits
+        prompt_tokens = (
+            self.tokens["input_tokens"]
+            + self.tokens["cache_read_input_tokens"]
+            + self.tokens["cache_creation_input_tokens"]
+        )
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            **self.tokens,
+            "cache_read_ratio": (
+                round(self.tokens["cache_read_input_tokens"] / prompt_tokens, 4)
+                if prompt_tokens
+                else 0.0
+            ),
+            "avg_latency_ms_cached": (
+                round(self.cached_seconds / self.cache_hits * 1000, 1) if self.cache_hits else 0.0
+            ),
+            "avg_latency_ms_uncached": (
+                round(self.uncached_seconds / uncached_calls * 1000, 1) if uncached_calls else 0.0
+            ),
+        }
+
+
+class LLMUsageTracker:
+    """Collect token usage per endpoint for this process."""
+
+    def __init__(self) -> None:
+        self._endpoints: dict[str, _EndpointUsage] = {}
+
+    def record(self, endpoint: str, response: Any, elapsed: float) -> None:
+        """Add the ``usage`` of *response* (a ``Message``) to *endpoint*.
+
+        Never raises: responses without usage information are counted as a
+        call with zero tokens.
+        """
+        usage = getattr(response, "usage", None)
+        counts = {field: int(getattr(usage, field, 0) or 0) for field in _TOKEN_FIELDS}
+
+        entry = self._endpoints.setdefault(endpoint, _EndpointUsage())
+        entry.calls += 1
+        for field, value in counts.items():
+            entry.tokens[field] += value
+        if counts["cache_read_input_tokens"]:
+            entry.cache_hits += 1
+            entry.cached_seconds += elapsed
+        else:
+            entry.uncached_seconds += elapsed
+
+        model = getattr(response, "model", None) or "unknown"
+        LLM_REQUEST_SECONDS.labels(endpoint, model).observe(elapsed)
+        STAGE_SECONDS.labels(pipeline_of(endpoint), "llm").observe(elapsed)
+        for field, value in counts.items():
+            if value:
+                LLM_TOKENS.labels(model, _TOKEN_KINDS[field]).inc(value)
+
+        logger.info(
+            "LLM usage [%s]: input=%d output=%d cache_read=%d cache_write=%d (%.0f ms)",
+            endpoint,
+            counts["input_tokens"],
+            counts["output_tokens"],
+            counts["cache_read_input_tokens"],
+            counts["cache_creation_input_tokens"],
+            elapsed * 1000,
+        )
+
+    def reset(self) -> None:
+        self._endpoints.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "endpoints": {
+                name: entry.stats() for name, entry in sorted(self._endpoints.items())
+            }
+        }
+
+
+llm_usage = LLMUsageTracker()
@@ -0,0 +1,419 @@
+"""In-process metrics exposed in the Prometheus text format at ``/metrics``.
+
+A small registry of counters, gauges and histograms -- enough for the
+service's own instrumentation without adding a client library.  Recording
+is a dict lookup and an increment (plus a bisect for histograms), cheap
+enough to leave on under full load; all formatting happens at scrape time.
+Metrics are recorded from the event-loop thread and are per process, like
+the other ``/health`` stats.
+
+State that other components already count (pool occupancy, executors,
+structured-output repairs) is exported through collectors: callables
+registered with :meth:`MetricsRegistry.register_collector` that turn the
+existing ``stats()`` dicts into metric families at scrape time.  Caches
+register their ``stats`` with :meth:`MetricsRegistry.register_cache` and are
+exported together, labelled by cache name.
+
+The metrics recorded by the pipelines are defined at the bottom of this
+module.
+"""
+
+import bisect
+import math
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans rule matching (sub-millisecond) to slow LLM calls.
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+@dataclass
+class MetricFamily:
+    """Samples of one metric produced by a collector at scrape time."""
+
+    name: str
+    kind: str
+    documentation: str
+    samples: list[tuple[dict[str, Any], float]] = field(default_factory=list)
+
+    def add(self, value: float, **labels: Any) -> None:
+        self.samples.append((labels, value))
+
+
+# ---------------------------------------------------------------------------
+# Metric types
+# ---------------------------------------------------------------------------
+
+
+class _Timer:
+    """Context manager observing its elapsed time on a histogram child."""
+
+    __slots__ = ("_child", "_started")
+
+    def __init__(self, child: "_HistogramChild") -> None:
+        self._child = child
+        self._started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._child.observe(time.perf_counter() - self._started)
+
+
+class _InProgress:
+    """Context manager holding a gauge child up by one while inside."""
+
+    __slots__ = ("_child",)
+
+    def __init__(self, child: "_GaugeChild") -> None:
+        self._child = child
+
+    def __enter__(self) -> None:
+        self._child.value += 1
+
+    def __exit__(self, *exc: Any) -> None:
+        self._child.value -= 1
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def track_in_progress(self) -> _InProgress:
+        return _InProgress(self)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; cumulated only when rendered.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, *values: Any) -> Any:
+        """Return the child for these label values (positional, in order)."""
+        key = values if all(type(v) is str for v in values) else tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values!r}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _render(self, lines: list[str]) -> None:
+        for key, child in sorted(self._children.items()):
+            labels = list(zip(self.labelnames, key))
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(child.value)}")
+
+
+class Counter(_Metric):
+    """Monotonically increasing count; the name should end in ``_total``."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (seconds, by convention)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def _render(self, lines: list[str]) -> None:
+        for key, child in sorted(self._children.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), child.counts):
+                cumulative += count
+                bucket_labels = _format_labels([*labels, ("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {child.count}")
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+
+class MetricsRegistry:
+    """Own every metric and collector of the process and render them."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[MetricFamily]]] = [self._collect_caches]
+        self._caches: list[Callable[[], Mapping[str, Any]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Add a callable returning :class:`MetricFamily` objects at scrape time."""
+        self._collectors.append(collector)
+
+    def register_cache(self, stats: Callable[[], Mapping[str, Any]]) -> None:
+        """Export a cache's ``stats()`` (which must include its ``name``)."""
+        self._caches.append(stats)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            metric._render(lines)
+        for collector in self._collectors:
+            for family in collector():
+                lines.append(f"# HELP {family.name} {family.documentation}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for labels, value in family.samples:
+                    rendered = _format_labels([(k, str(v)) for k, v in labels.items()])
+                    lines.append(f"{family.name}{rendered} {_format_value(float(value))}")
+        return "\n".join(lines) + "\n"
+
+    def _collect_caches(self) -> list[MetricFamily]:
+        return stats_families(
+            "ai_service_cache",
+            _CACHE_FIELDS,
+            [({"cache": stats["name"]}, stats) for stats in (fn() for fn in self._caches)],
+        )
+
+    def _register(self, metric: Any) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+metrics = MetricsRegistry()
+
+# ---------------------------------------------------------------------------
+# HTTP middleware
+# ---------------------------------------------------------------------------
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and in-flight requests.
+
+    The route label is the matched path template (``/signals/generate``),
+    or ``unmatched``, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels()
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, status).observe(
+                time.perf_counter() - started
+            )
+
+
+def stats_families(
+    prefix: str,
+    fields: Mapping[str, tuple[str, str]],
+    rows: Sequence[tuple[dict[str, Any], Mapping[str, Any]]],
+) -> list[MetricFamily]:
+    """Turn ``(labels, stats)`` rows into one family per stats key in *fields*.
+
+    *fields* maps a key to ``(kind, help)``; counters get a ``_total``
+    suffix.  Rows without the key are skipped.
+    """
+    families = []
+    for key, (kind, documentation) in fields.items():
+        name = f"{prefix}_{key}_total" if kind == "counter" else f"{prefix}_{key}"
+        family = MetricFamily(name, kind, documentation)
+        for labels, stats in rows:
+            if stats.get(key) is not None:
+                family.add(float(stats[key]), **labels)
+        families.append(family)
+    return families
+
+
+_CACHE_FIELDS = {
+    "hits": ("counter", "Cache lookups answered from the cache."),
+    "persistent_hits": ("counter", "Cache lookups answered from persistent storage."),
+    "misses": ("counter", "Cache lookups that missed."),
+    "coalesced": ("counter", "Lookups that joined an identical in-flight computation."),
+    "errors": ("counter", "Computations behind the cache that raised."),
+    "size": ("gauge", "Entries currently cached."),
+    "in_flight": ("gauge", "Computations currently in flight."),
+}
+
+
+def pipeline_of(endpoint: str) -> str:
+    """Pipeline label of an LLM endpoint name (``"scam.batch"`` -> ``"scam"``)."""
+    return endpoint.partition(".")[0]
+
+
+# ---------------------------------------------------------------------------
+# Pipeline metrics
+# ---------------------------------------------------------------------------
+
+STAGE_SECONDS = metrics.histogram(
+    "ai_service_stage_seconds",
+    "Time spent in each stage of the signal and scam pipelines.",
+    ("pipeline", "stage"),
+)
+LLM_REQUEST_SECONDS = metrics.histogram(
+    "ai_service_llm_request_seconds",
+    "Latency of successful Anthropic calls by endpoint and model.",
+    ("endpoint", "model"),
+)
+LLM_TOKENS = metrics.counter(
+    "ai_service_llm_tokens_total",
+    "Anthropic tokens by model and kind (input, output, cache_read, cache_write).",
+    ("model", "kind"),
+)
+FALLBACKS = metrics.counter(
+    "ai_service_fallbacks_total",
+    "Results served from a fallback instead of the primary path.",
+    ("pipeline", "reason"),
+)
+ERRORS = metrics.counter(
+    "ai_service_errors_total",
+    "Errors caught inside a pipeline stage.",
+    ("pipeline", "stage"),
+)
+IN_FLIGHT = metrics.gauge(
+    "ai_service_in_flight",
+    "Pipeline requests currently being processed.",
+    ("pipeline",),
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "ai_service_http_request_seconds",
+    "HTTP request latency by method, route and status.",
+    ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = metrics.gauge(
+    "ai_service_http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+
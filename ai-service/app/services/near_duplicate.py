@@ -0,0 +1,216 @@
+"""Locality-sensitive index for spotting near-duplicate messages.
+
+Each message is reduced to a MinHash signature over character shingles of
+its normalised text, and signatures are bucketed with LSH banding so a
+lookup only compares against the handful of entries that share a band.
+The estimated Jaccard similarity of the best candidate decides whether a
+previously stored value can be reused.
+"""
+
+import re
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Any, Generic, Optional, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+_SHIFT = np.uint64(32)
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b[\w.-]+\.(?:com|net|org|info|co|io|ly|me)(?:/\S*)?\b")
+_EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")
+_NUMBER_RE = re.compile(r"[$€£]?\d[\d,.]*")
+
+
+def normalise_text(text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different copies match.
+
+    Used for exact, content-addressed cache keys; see
+    :func:`normalise_for_shingling` for the looser near-duplicate form.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def normalise_for_shingling(text: str) -> str:
+    """Lower-case *text* and mask the parts scam variants usually mutate.
+
+    URLs, e-mail addresses and amounts are replaced by placeholders so two
+    messages that differ only in the link or the sum shingle identically.
+    """
+    text = text.casefold()
+    text = _EMAIL_RE.sub(" <email> ", text)
+    text = _URL_RE.sub(" <url> ", text)
+    text = _NUMBER_RE.sub("0", text)
+    return " ".join(text.split())
+
+
+class NearDuplicateIndex(Generic[T]):
+    """Bounded MinHash/LSH index mapping message text to a stored value.
+
+    Parameters
+    ----------
+    maxsize:
+        Maximum number of stored messages; the least recently stored or
+        matched entry is evicted first.
+    threshold:
+        Minimum estimated Jaccard similarity for :meth:`query` to return a
+        match.
+    ttl:
+        Seconds an entry stays eligible for matching.
+    num_perm / bands:
+        Signature length and number of LSH bands.  ``num_perm`` must be a
+        multiple of ``bands``; more bands raise recall at lower similarity.
+    shingle_size:
+        Length of the character shingles.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        threshold: float,
+        ttl: float = 3600.0,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: h(x) = ((a * x + b) mod 2**64) >> 32 is a
+        # 2-independent family for 32-bit keys, and uint64 arithmetic wraps.
+        self._a = rng.integers(0, 1 << 64, size=num_perm, dtype=np.uint64, endpoint=False)
+        self._b = rng.integers(0, 1 << 64, size=num_perm, dtype=np.uint64, endpoint=False)
+
+        # entry id -> (namespace, signature, value, expires_at)
+        self._entries: OrderedDict[int, tuple[str, np.ndarray, T, float]] = OrderedDict()
+        self._buckets: dict[tuple[str, int, bytes], set[int]] = {}
+        self._next_id = 0
+
+        self.lookups = 0
+        self.matches = 0
+        self.candidates_checked = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the MinHash signature (``uint32[num_perm]``) of *text*."""
+        normalised = normalise_for_shingling(text)
+        k = self.shingle_size
+        if len(normalised) <= k:
+            shingles = {normalised}
+        else:
+            shingles = {normalised[i : i + k] for i in range(len(normalised) - k + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) >> _SHIFT
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def query(self, text: str, namespace: str = "") -> Optional[tuple[T, float]]:
+        """Return ``(value, similarity)`` of the closest stored match, if any."""
+        self.lookups += 1
+        if not self._entries:
+            return None
+
+        sig = self.signature(text)
+        now = time.monotonic()
+        best_id: Optional[int] = None
+        best_similarity = 0.0
+        for entry_id in self._candidates(namespace, sig):
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            if entry[3] <= now:
+                self._remove(entry_id)
+                continue
+            self.candidates_checked += 1
+            similarity = float(np.count_nonzero(entry[1] == sig)) / self.num_perm
+            if similarity > best_similarity:
+                best_id, best_similarity = entry_id, similarity
+
+        if best_id is None or best_similarity < self.threshold:
+            return None
+
+        self.matches += 1
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id][2], best_similarity
+
+    def add(self, text: str, value: T, namespace: str = "") -> None:
+        """Store *value* for *text*, evicting the oldest entry when full."""
+        if self.maxsize <= 0:
+            return
+        sig = self.signature(text)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (namespace, sig, value, time.monotonic() + self.ttl)
+        for key in self._band_keys(namespace, sig):
+            self._buckets.setdefault(key, set()).add(entry_id)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Drop every stored entry."""
+        self._entries.clear()
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        """Return lookup/match counters and current occupancy."""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "match_rate": round(self.matches / self.lookups, 4) if self.lookups else 0.0,
+            "avg_candidates": (
+                round(self.candidates_checked / self.lookups, 2) if self.lookups else 0.0
+            ),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _band_keys(self, namespace: str, sig: np.ndarray) -> list[tuple[str, int, bytes]]:
+        rows = self.rows
+        return [
+            (namespace, band, sig[band * rows : (band + 1) * rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _candidates(self, namespace: str, sig: np.ndarray) -> set[int]:
+        candidates: set[int] = set()
+        for key in self._band_keys(namespace, sig):
+            bucket = self._buckets.get(key)
+            if bucket:
+                candidates |= bucket
+        return candidates
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in self._band_keys(entry[0], entry[1]):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
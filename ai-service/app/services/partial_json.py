@@ -0,0 +1,240 @@
+"""Incremental parser for a JSON object arriving in streamed fragments.
+
+LLM completions are streamed a few characters at a time.  Rather than waiting
+for the full text and calling ``json.loads``, :class:`StreamingObjectParser`
+consumes each fragment once and reports top-level fields as soon as they are
+complete, array elements as they close, and string values as they grow.
+"""
+
+import json
+from typing import Any, NamedTuple, Optional
+
+_WHITESPACE = " \t\r\n"
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class ParseEvent(NamedTuple):
+    """One observation emitted by :class:`StreamingObjectParser`.
+
+    ``kind`` is ``"field"`` (a top-level value completed), ``"item"`` (an
+    element of a top-level array completed) or ``"delta"`` (more characters
+    of a top-level string value arrived).
+    """
+
+    kind: str
+    key: str
+    value: Any
+
+
+class _StringReader:
+    """Decode a JSON string body character by character."""
+
+    def __init__(self) -> None:
+        self.chars: list[str] = []
+        self._escape = False
+        self._unicode: Optional[str] = None
+
+    def push(self, ch: str) -> bool:
+        """Consume *ch*; return ``True`` when the closing quote is reached."""
+        if self._unicode is not None:
+            self._unicode += ch
+            if len(self._unicode) == 4:
+                self.chars.append(chr(int(self._unicode, 16)))
+                self._unicode = None
+            return False
+        if self._escape:
+            self._escape = False
+            if ch == "u":
+                self._unicode = ""
+            else:
+                self.chars.append(_ESCAPES.get(ch, ch))
+            return False
+        if ch == "\\":
+            self._escape = True
+            return False
+        if ch == '"':
+            return True
+        self.chars.append(ch)
+        return False
+
+    @property
+    def value(self) -> str:
+        return "".join(self.chars)
+
+
+class _RawReader:
+    """Collect a nested object/array verbatim until its brackets balance."""
+
+    def __init__(self, opening: str) -> None:
+        self.chars = [opening]
+        self._depth = 1
+        self._in_string = False
+        self._escape = False
+
+    def push(self, ch: str) -> bool:
+        """Consume *ch*; return ``True`` once the value is complete."""
+        self.chars.append(ch)
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+            return False
+        if ch == '"':
+            self._in_string = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+        return self._depth == 0
+
+    @property
+    def value(self) -> Any:
+        return json.loads("".join(self.chars))
+
+
+class StreamingObjectParser:
+    """Parse one top-level JSON object fed in arbitrary fragments.
+
+    Anything before the opening ``{`` (such as a Markdown code fence) is
+    ignored.  After each :meth:`feed` the completed values are also available
+    through :attr:`result`.
+    """
+
+    def __init__(self) -> None:
+        self.result: dict[str, Any] = {}
+        self.done = False
+        self._state = "start"
+        self._key = ""
+        self._reader: Any = None
+        self._array: list[Any] = []
+        self._emitted = 0
+
+    def feed(self, chunk: str) -> list[ParseEvent]:
+        """Consume *chunk* and return the events it completed."""
+        events: list[ParseEvent] = []
+        for ch in chunk:
+            if self.done:
+                break
+            self._step(ch, events)
+        if self._state == "string" and len(self._reader.chars) > self._emitted:
+            events.append(ParseEvent("delta", self._key, "".join(self._reader.chars[self._emitted:])))
+            self._emitted = len(self._reader.chars)
+        return events
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _step(self, ch: str, events: list[ParseEvent]) -> None:
+        state = self._state
+
+        if state == "start":
+            if ch == "{":
+                self._state = "key_or_end"
+
+        elif state == "key_or_end":
+            if ch == '"':
+                self._reader = _StringReader()
+                self._state = "key"
+            elif ch == "}":
+                self.done = True
+
+        elif state == "key":
+            if self._reader.push(ch):
+                self._key = self._reader.value
+                self._state = "colon"
+
+        elif state == "colon":
+            if ch == ":":
+                self._state = "value"
+
+        elif state == "value":
+            if ch in _WHITESPACE:
+                return
+            if ch == '"':
+                self._reader = _StringReader()
+                self._emitted = 0
+                self._state = "string"
+            elif ch == "[":
+                self._array = []
+                self._state = "array"
+            elif ch == "{":
+                self._reader = _RawReader(ch)
+                self._state = "nested"
+            else:
+                self._reader = [ch]
+                self._state = "scalar"
+
+        elif state == "string":
+            if self._reader.push(ch):
+                if len(self._reader.chars) > self._emitted:
+                    events.append(
+                        ParseEvent("delta", self._key, "".join(self._reader.chars[self._emitted:]))
+                    )
+                self._complete(self._reader.value, events)
+
+        elif state == "scalar":
+            if ch in ",}" or ch in _WHITESPACE:
+                self._complete(json.loads("".join(self._reader)), events)
+                self._after_value(ch)
+            else:
+                self._reader.append(ch)
+
+        elif state == "nested":
+            if self._reader.push(ch):
+                self._complete(self._reader.value, events)
+
+        elif state == "array":
+            if ch in _WHITESPACE or ch == ",":
+                return
+            if ch == "]":
+                self._complete(self._array, events)
+            elif ch == '"':
+                self._reader = _StringReader()
+                self._state = "array_string"
+            elif ch in "{[":
+                self._reader = _RawReader(ch)
+                self._state = "array_nested"
+            else:
+                self._reader = [ch]
+                self._state = "array_scalar"
+
+        elif state == "array_string":
+            if self._reader.push(ch):
+                self._array_item(self._reader.value, events)
+
+        elif state == "array_nested":
+            if self._reader.push(ch):
+                self._array_item(self._reader.value, events)
+
+        elif state == "array_scalar":
+            if ch in ",]" or ch in _WHITESPACE:
+                self._array_item(json.loads("".join(self._reader)), events)
+                if ch == "]":
+                    self._complete(self._array, events)
+            else:
+                self._reader.append(ch)
+
+        elif state == "after_value":
+            self._after_value(ch)
+
+    def _complete(self, value: Any, events: list[ParseEvent]) -> None:
+        self.result[self._key] = value
+        events.append(ParseEvent("field", self._key, value))
+        self._state = "after_value"
+
+    def _array_item(self, value: Any, events: list[ParseEvent]) -> None:
+        self._array.append(value)
+        events.append(ParseEvent("item", self._key, value))
+        self._state = "array"
+
+    def _after_value(self, ch: str) -> None:
+        if ch == ",":
+            self._state = "key_or_end"
+        elif ch == "}":
+            self.done = True
+        else:
+            self._state = "after_value"
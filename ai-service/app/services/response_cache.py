@@ -0,0 +1,235 @@
+"""Bounded TTL/LRU response cache with in-flight request coalescing."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from typing import Any, Generic, Optional, TypeVar, Union
+
+from cachetools import TLRUCache
+
+from .shared_cache import SharedTier
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _expires_at(_key: Hashable, entry: tuple[Any, float], _now: float) -> float:
+    return entry[1]
+
+
+def _settle_batch(task: asyncio.Future, futures: dict[Hashable, asyncio.Future]) -> None:
+    """Resolve the per-key futures of a batch from its factory *task*."""
+    if task.cancelled():
+        for future in futures.values():
+            future.cancel()
+        return
+    exc = task.exception()
+    values = task.result() if exc is None else {}
+    for key, future in futures.items():
+        if exc is not None:
+            future.set_exception(exc)
+        elif key not in values:
+            future.set_exception(LookupError(f"batch did not compute {key!r}"))
+        elif isinstance(values[key], BaseException):
+            future.set_exception(values[key])
+        else:
+            future.set_result(values[key])
+
+
+class AsyncResponseCache(Generic[T]):
+    """Cache the results of an async computation keyed by a hashable key.
+
+    Entries expire after *ttl* seconds and the least recently used entry is
+    evicted once *maxsize* entries are held.  Concurrent callers asking for
+    the same key while it is being computed share a single computation
+    instead of each starting their own, whether they ask for one key
+    (:meth:`get_or_compute`) or for a batch (:meth:`get_or_compute_many`).
+    Failed computations are never cached, nor are results rejected by the
+    optional *cache_if* predicate (those are still shared with callers that
+    coalesced onto them).
+
+    With a *shared* tier, local misses are looked up there (counted as
+    ``persistent_hits``) and stored values are written to both.  Entries
+    carry an absolute expiry time, kept when they move between tiers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        enabled: bool = True,
+        cache_if: Optional[Callable[[T], bool]] = None,
+        shared: Optional[SharedTier[T]] = None,
+    ) -> None:
+        self.name = name
+        self.enabled = enabled and maxsize > 0 and ttl > 0
+        self.maxsize = max(1, maxsize)
+        self.ttl = max(ttl, 0.001)
+        self._cache_if = cache_if
+        self._shared = shared if self.enabled else None
+        # (value, expires_at) by key, expiring on the wall clock so entries
+        # read from the shared tier expire when they do in other workers.
+        self._entries: TLRUCache = TLRUCache(
+            maxsize=self.maxsize, ttu=_expires_at, timer=time.time
+        )
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: Hashable, count_miss: bool = False) -> Optional[T]:
+        """Return the cached value for *key* (counting a hit) or ``None``.
+
+        With *count_miss*, a ``None`` result is counted as a miss -- for
+        callers that compute and :meth:`set` the value themselves.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+        if self._shared is not None:
+            entry = self._shared.get(key)
+            if entry is not None:
+                self.persistent_hits += 1
+                self._entries[key] = entry
+                return entry[0]
+        if count_miss:
+            self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: T) -> None:
+        """Store *value* under *key*."""
+        if self.enabled:
+            self._store(key, value)
+
+    async def get_or_compute(
+        self, key: Hashable, factory: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Return the cached value for *key*, computing it with *factory* on a miss."""
+        if not self.enabled:
+            return await factory()
+
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        return await asyncio.shield(task)
+
+    async def get_or_compute_many(
+        self,
+        keys: Iterable[Hashable],
+        factory: Callable[
+            [list[Hashable]], Awaitable[Mapping[Hashable, Union[T, BaseException]]]
+        ],
+    ) -> dict[Hashable, Union[T, BaseException]]:
+        """Batch form of :meth:`get_or_compute`.
+
+        The keys neither cached nor already in flight are passed to a single
+        *factory* call and count as in flight until it returns, so
+        concurrent single and batch lookups coalesce onto them.  *factory*
+        maps each key to its value or to the exception that prevented it;
+        the result does the same for every key, like ``asyncio.gather(...,
+        return_exceptions=True)``.  If *factory* itself fails, every key it
+        was computing fails with it.
+        """
+        results: dict[Hashable, Union[T, BaseException]] = {}
+        waiting: dict[Hashable, asyncio.Future] = {}
+        missing: list[Hashable] = []
+        for key in dict.fromkeys(keys):
+            cached = self.get(key)
+            if cached is not None:
+                results[key] = cached
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                missing.append(key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            owned = {key: loop.create_future() for key in missing}
+            for key, future in owned.items():
+                if self.enabled:
+                    self.misses += 1
+                    self._inflight[key] = future
+                    future.add_done_callback(lambda f, key=key: self._on_done(key, f))
+            task = asyncio.ensure_future(factory(missing))
+            task.add_done_callback(lambda t: _settle_batch(t, owned))
+            waiting.update(owned)
+
+        if waiting:
+            # Like shield(): cancelling this caller leaves the computations running.
+            await asyncio.wait(waiting.values())
+        for key, future in waiting.items():
+            if future.cancelled():
+                results[key] = asyncio.CancelledError()
+            else:
+                results[key] = future.exception() or future.result()
+        return results
+
+    def clear(self) -> None:
+        """Drop every in-process entry (in-flight computations and the
+        shared tier are unaffected)."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss/coalesce counters and current occupancy."""
+        hits = self.hits + self.persistent_hits + self.coalesced
+        lookups = hits + self.misses
+        return {
+            "name": self.name,
+            "enabled": self.enabled,
+            "shared": self._shared is not None,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _on_done(self, key: Hashable, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            self.errors += 1
+            return
+        result = task.result()
+        if result is not None and (self._cache_if is None or self._cache_if(result)):
+            self._store(key, result)
+
+    def _store(self, key: Hashable, value: T) -> None:
+        expires_at = time.time() + self.ttl
+        self._entries[key] = (value, expires_at)
+        if self._shared is not None:
+            self._shared.set(key, value, expires_at)
@@ -0,0 +1,174 @@
+"""Compiled keyword rules for the rule-based scam scorer.
+
+Rules are loaded once from a JSON data file and every distinct keyword is
+compiled into a single Aho-Corasick automaton, so one pass over the
+lower-cased text yields every matching red-flag and category rule.  Matching
+keeps plain substring semantics (``"won"`` matches inside ``"wonderful"``),
+exactly like the original ``any(kw in text ...)`` checks.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Attempt to import pyahocorasick; fall back to one substring scan per
+# distinct keyword if unavailable.
+try:
+    import ahocorasick
+
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+    logger.warning(
+        "pyahocorasick not installed; scam rules will use per-keyword substring scans."
+    )
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / "data" / "scam_rules.json"
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    """Result of matching the rules against a single piece of text."""
+
+    red_flags: list[str]
+    """Every matching red-flag rule, in rule-file order."""
+
+    category: str
+    """Highest-priority matching category, or ``"other"``."""
+
+
+class ScamRuleSet:
+    """Red-flag and category keyword rules compiled into one matcher."""
+
+    def __init__(
+        self,
+        red_flags: list[tuple[str, list[str]]],
+        categories: list[tuple[str, list[str]]],
+    ) -> None:
+        self.red_flags = [(flag, tuple(k.lower() for k in kws)) for flag, kws in red_flags]
+        self.categories = [(name, tuple(k.lower() for k in kws)) for name, kws in categories]
+
+        # keyword -> bitmask of rules it belongs to (red flags first, then categories)
+        rule_masks: dict[str, int] = {}
+        for bit, (_, keywords) in enumerate(self.red_flags + self.categories):
+            for keyword in keywords:
+                rule_masks[keyword] = rule_masks.get(keyword, 0) | (1 << bit)
+        self._rule_masks = rule_masks
+        # Once every red flag and the top-priority category have matched,
+        # nothing later in the text can change the result.
+        self._saturated = (1 << (len(self.red_flags) + 1)) - 1 if self.categories else (
+            (1 << len(self.red_flags)) - 1
+        )
+
+        self._automaton: Optional[Any] = None
+        if HAS_AHOCORASICK and rule_masks:
+            automaton = ahocorasick.Automaton()
+            for keyword, mask in rule_masks.items():
+                automaton.add_word(keyword, mask)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ScamRuleSet":
+        """Build a rule set from the parsed rules-file structure."""
+        return cls(
+            red_flags=[(r["flag"], list(r["keywords"])) for r in data.get("red_flags", [])],
+            categories=[
+                (r["category"], list(r["keywords"])) for r in data.get("categories", [])
+            ],
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ScamRuleSet":
+        """Load and compile the rules stored in the JSON file at *path*."""
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def match(self, text: str) -> RuleMatch:
+        """Return every red-flag and category rule matched by *text*."""
+        mask = self._match_mask(text.lower())
+        red_flags = [flag for bit, (flag, _) in enumerate(self.red_flags) if mask >> bit & 1]
+        category = next(
+            (
+                name
+                for bit, (name, _) in enumerate(self.categories, len(self.red_flags))
+                if mask >> bit & 1
+            ),
+            "other",
+        )
+        return RuleMatch(red_flags=red_flags, category=category)
+
+    def _match_mask(self, text: str) -> int:
+        saturated = self._saturated
+        mask = 0
+        if self._automaton is not None:
+            for _, rules in self._automaton.iter(text):
+                mask |= rules
+                if mask & saturated == saturated:
+                    break
+            return mask
+
+        for keyword, rules in self._rule_masks.items():
+            if rules & ~mask and keyword in text:
+                mask |= rules
+                if mask & saturated == saturated:
+                    break
+        return mask
+
+
+default_rules = ScamRuleSet.load(settings.scam_rules_path or DEFAULT_RULES_PATH)
+
+
+class RuleTriage:
+    """Decide which rule-scored messages are clear-cut enough to skip the LLM.
+
+    A message whose rule-based risk score is at or below *benign_max* or at
+    or above *critical_min* is settled by the rules; everything in between
+    is escalated.  Counters let the thresholds be tuned against the
+    escalation rate.
+    """
+
+    def __init__(self, benign_max: int, critical_min: int) -> None:
+        self.benign_max = benign_max
+        self.critical_min = critical_min
+        self.benign = 0
+        self.critical = 0
+        self.escalated = 0
+
+    def decide(self, risk_score: int) -> Optional[str]:
+        """Return ``"benign"``/``"critical"`` if settled by rules, else ``None``."""
+        if risk_score <= self.benign_max:
+            self.benign += 1
+            return "benign"
+        if risk_score >= self.critical_min:
+            self.critical += 1
+            return "critical"
+        self.escalated += 1
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        """Return decision counters and the escalation rate."""
+        total = self.benign + self.critical + self.escalated
+        return {
+            "benign_max": self.benign_max,
+            "critical_min": self.critical_min,
+            "total": total,
+            "decided_benign": self.benign,
+            "decided_critical": self.critical,
+            "escalated": self.escalated,
+            "escalation_rate": round(self.escalated / total, 4) if total else 0.0,
+        }
@@ -1,21 +1,50 @@
 """Sentiment analysis service using Claude API."""
 
-import json
+import asyncio
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from ..config import settings
 from ..models.schemas import ArticleInput, SentimentResponse
+from .anthropic_pool import client_registry
+from .executors import LoopSemaphore
+from .metrics import ERRORS, FALLBACKS
+from .sentiment_cache import SentimentCache, article_key, sentiment_cache
+from .structured_output import ToolSpec, derive_model, structured_output
+
+if TYPE_CHECKING:
+    import anthropic
 
 logger = logging.getLogger(__name__)
 
-# Import Anthropic client lazily to avoid hard failure if the package is
-# installed but the API key is missing.
-try:
-    import anthropic
-except ImportError:
-    anthropic = None  # type: ignore[assignment]
-    logger.warning("anthropic package not installed; sentiment analysis will return neutral defaults.")
+# Per-article output: the SentimentResponse fields the model fills in.  The
+# headline is not echoed back; entries are keyed by article number.
+_ARTICLE_SENTIMENT = derive_model(
+    "ArticleSentiment",
+    SentimentResponse,
+    ["sentiment", "score"],
+    choices={"sentiment": ("bullish", "bearish", "neutral")},
+)
+_SENTIMENT_TOOL = ToolSpec(
+    "record_sentiments",
+    "Record the sentiment of each article, keyed by its number.",
+    _ARTICLE_SENTIMENT,
+    keyed=True,
+)
+
+# Rough output cost of one keyed entry ("12": {"sentiment": ..., "score": ...}),
+# used to size max_tokens so a chunk's tool call is never truncated.
+_OUTPUT_TOKENS_PER_ARTICLE = 32
+_OUTPUT_TOKENS_OVERHEAD = 64
+
+# Fixed instructions, sent as a cached system prefix ahead of the articles.
+_SYSTEM_PROMPT = (
+    "You are a financial sentiment analyst. For each of the numbered news "
+    "articles you are given, classify the sentiment as exactly one of: "
+    "bullish, bearish, or neutral. Also provide a numeric score from "
+    "-1.0 (most bearish) to 1.0 (most bullish). Record every article by "
+    "calling the tool provided, keyed by the article number."
+)
 
 
 class SentimentAnalyzer:
@@ -23,12 +52,14 @@ class SentimentAnalyzer:
 
     HAIKU_MODEL = "claude-haiku-4-5-20251001"
 
-    def __init__(self) -> None:
-        self._client: Optional["anthropic.AsyncAnthropic"] = None
-        if anthropic and settings.anthropic_api_key:
-            self._client = anthropic.AsyncAnthropic(
-                api_key=settings.anthropic_api_key,
-            )
+    def __init__(self, cache: Optional[SentimentCache] = None) -> None:
+        self.cache = cache or sentiment_cache
+        self._chunk_slots = LoopSemaphore(settings.sentiment_concurrency)
+
+    @property
+    def _client(self) -> Optional["anthropic.AsyncAnthropic"]:
+        """Return the process-wide pooled client (``None`` when unconfigured)."""
+        return client_registry.client
 
     # ------------------------------------------------------------------
     # Public helpers
@@ -37,10 +68,12 @@ class SentimentAnalyzer:
     async def analyze_articles(
         self, articles: list[ArticleInput]
     ) -> list[SentimentResponse]:
-        """Return per-article sentiment classifications.
+        """Return per-article sentiment classifications, in input order.
 
-        If the Anthropic API key is not configured, every article is
-        classified as *neutral* with a score of ``0.0``.
+        Articles already in the sentiment cache (by normalised headline and
+        summary) are not sent again.  If the Anthropic API key is not
+        configured, every article is classified as *neutral* with a score of
+        ``0.0``.
         """
         if not articles:
             return []
@@ -58,65 +91,26 @@ class SentimentAnalyzer:
                 for a in articles
             ]
 
-        # Build the prompt
-        articles_text = "\n".join(
-            f'{i + 1}. Headline: "{a.headline}"\n   Summary: "{a.summary}"'
-            for i, a in enumerate(articles)
-        )
-
-        prompt = (
-            "You are a financial sentiment analyst. For each of the following "
-            "news articles, classify the sentiment as exactly one of: "
-            "bullish, bearish, or neutral. Also provide a numeric score from "
-            "-1.0 (most bearish) to 1.0 (most bullish).\n\n"
-            f"{articles_text}\n\n"
-            "Respond with ONLY a JSON array where each element has the keys: "
-            '"headline" (string), "sentiment" (string), and "score" (float). '
-            "Do not include any text outside the JSON array."
-        )
-
-        try:
-            response = await self._client.messages.create(
-                model=self.HAIKU_MODEL,
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}],
+        # --- Cached articles; only unseen ones go to the model ----------
+        keys = [article_key(a) for a in articles]
+        known = self.cache.get_many(keys)
+        pending = {key: a for key, a in zip(keys, articles) if key not in known}
+        if pending:
+            classified = await self._classify(list(pending.values()))
+            fresh = {
+                key: classified[i] for i, key in enumerate(pending) if i in classified
+            }
+            self.cache.set_many(fresh)
+            known.update(fresh)
+
+        # Merge back in input order; an article without a valid entry is neutral.
+        results: list[SentimentResponse] = []
+        for key, article in zip(keys, articles):
+            sentiment, score = known.get(key, ("neutral", 0.0))
+            results.append(
+                SentimentResponse(headline=article.headline, sentiment=sentiment, score=score)
             )
-
-            raw_text = response.content[0].text.strip()
-            # Handle possible markdown code fences
-            if raw_text.startswith("```"):
-                raw_text = raw_text.split("\n", 1)[-1]
-                if raw_text.endswith("```"):
-                    raw_text = raw_text[: -len("```")].strip()
-
-            parsed: list[dict] = json.loads(raw_text)
-
-            results: list[SentimentResponse] = []
-            for item in parsed:
-                sentiment = str(item.get("sentiment", "neutral")).lower()
-                if sentiment not in ("bullish", "bearish", "neutral"):
-                    sentiment = "neutral"
-                score = float(item.get("score", 0.0))
-                score = max(-1.0, min(1.0, score))
-                results.append(
-                    SentimentResponse(
-                        headline=str(item.get("headline", "")),
-                        sentiment=sentiment,
-                        score=score,
-                    )
-                )
-            return results
-
-        except Exception:
-            logger.exception("Error during sentiment analysis; returning neutral defaults.")
-            return [
-                SentimentResponse(
-                    headline=a.headline,
-                    sentiment="neutral",
-                    score=0.0,
-                )
-                for a in articles
-            ]
+        return results
 
     async def get_aggregate_sentiment(
         self, articles: list[ArticleInput]
@@ -144,3 +138,83 @@ class SentimentAnalyzer:
             overall = "neutral"
 
         return overall, round(avg_score, 4)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _classify(self, articles: list[ArticleInput]) -> dict[int, tuple[str, float]]:
+        """Classify *articles*; return ``(sentiment, score)`` by index.
+
+        Articles are split into chunks by estimated token budget and the
+        chunks are classified concurrently.  Articles the model did not
+        classify validly -- including every article of a chunk whose call
+        failed -- are left out.
+        """
+        chunks = self._chunk(articles)
+        results = await asyncio.gather(
+            *[self._classify_chunk([articles[i] for i in chunk]) for chunk in chunks]
+        )
+        classified: dict[int, tuple[str, float]] = {}
+        for chunk, chunk_result in zip(chunks, results):
+            for position, value in chunk_result.items():
+                classified[chunk[position]] = value
+        return classified
+
+    @staticmethod
+    def _chunk(articles: list[ArticleInput]) -> list[list[int]]:
+        """Group article indices so each chunk fits the configured budgets."""
+        budget = max(1, settings.sentiment_chunk_token_budget)
+        max_articles = max(1, settings.sentiment_chunk_max_articles)
+        chunks: list[list[int]] = []
+        current: list[int] = []
+        used = 0
+        for i, article in enumerate(articles):
+            tokens = _estimate_tokens(article)
+            if current and (used + tokens > budget or len(current) >= max_articles):
+                chunks.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _classify_chunk(self, articles: list[ArticleInput]) -> dict[int, tuple[str, float]]:
+        """Classify one chunk in a single call; return results by position."""
+        # Only the articles vary between calls
+        articles_text = "\n".join(
+            f'{i + 1}. Headline: "{a.headline}"\n   Summary: "{a.summary}"'
+            for i, a in enumerate(articles)
+        )
+
+        try:
+            async with self._chunk_slots:
+                entries = await structured_output.request(
+                    self._client,
+                    endpoint="signals.sentiment",
+                    model=self.HAIKU_MODEL,
+                    max_tokens=_OUTPUT_TOKENS_OVERHEAD + _OUTPUT_TOKENS_PER_ARTICLE * len(articles),
+                    system=_SYSTEM_PROMPT,
+                    prompt=articles_text,
+                    tool=_SENTIMENT_TOOL,
+                    keys=[str(i + 1) for i in range(len(articles))],
+                )
+        except Exception:
+            ERRORS.labels("signals", "sentiment").inc()
+            FALLBACKS.labels("signals", "neutral_sentiment").inc()
+            logger.exception(
+                "Sentiment analysis failed for a chunk of %d articles; using neutral defaults.",
+                len(articles),
+            )
+            return {}
+        return {
+            i: (entry.sentiment, entry.score)
+            for i in range(len(articles))
+            if (entry := entries.get(str(i + 1))) is not None
+        }
+
+
+def _estimate_tokens(article: ArticleInput) -> int:
+    """Approximate prompt tokens for *article* (about four characters per token)."""
+    return (len(article.headline) + len(article.summary) + 32) // 4
@@ -0,0 +1,142 @@
+"""Per-article sentiment cache keyed on a normalised (headline, summary) hash.
+
+The same wire story reaches :meth:`SentimentAnalyzer.analyze_articles` for
+many users and many symbols.  Each classified article is cached under a
+digest of its case-folded, whitespace-collapsed headline and summary, so
+only articles never seen before (or expired) are sent to the model.
+
+Entries live in a bounded in-process TTL cache, backed by the host-wide
+shared cache tier when one is configured (see
+:mod:`app.services.shared_cache`), so classifications survive restarts and
+are shared by the workers on one host.
+"""
+
+import hashlib
+import json
+import time
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from cachetools import TLRUCache
+
+from ..config import settings
+from ..models.schemas import ArticleInput
+from .metrics import metrics
+from .near_duplicate import normalise_text
+from .shared_cache import Codec, SharedTier, json_codec, shared_tier
+
+
+def _decode_sentiment(data: bytes) -> tuple[str, float]:
+    sentiment, score = json.loads(data)
+    return sentiment, float(score)
+
+
+SENTIMENT_CODEC: Codec[tuple[str, float]] = Codec(json_codec().encode, _decode_sentiment)
+
+
+def article_key(article: ArticleInput) -> str:
+    """Content-addressed key of *article* (normalised headline and summary)."""
+    parts = (normalise_text(article.headline), normalise_text(article.summary))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """Bounded TTL cache of ``(sentiment, score)`` by :func:`article_key`.
+
+    Parameters
+    ----------
+    maxsize:
+        Entries kept in memory.
+    ttl:
+        Seconds an entry stays valid.
+    enabled:
+        When ``False`` every lookup misses and nothing is stored.
+    shared:
+        Optional shared tier consulted on in-memory misses and written on
+        every store.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        enabled: bool = True,
+        shared: Optional[SharedTier[tuple[str, float]]] = None,
+    ) -> None:
+        self.enabled = enabled and maxsize > 0 and ttl > 0
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        # (value, expires_at) by key; see AsyncResponseCache.
+        self._entries: TLRUCache = TLRUCache(
+            maxsize=self.maxsize, ttu=lambda _key, entry, _now: entry[1], timer=time.time
+        )
+        self._shared = shared if self.enabled else None
+
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, tuple[str, float]]:
+        """Return the cached ``(sentiment, score)`` of each key that has one."""
+        if not self.enabled:
+            return {}
+        found: dict[str, tuple[str, float]] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            entry = self._entries.get(key)
+            if entry is not None:
+                found[key] = entry[0]
+            else:
+                missing.append(key)
+        self.hits += len(found)
+
+        if missing and self._shared is not None:
+            loaded = self._shared.get_many(missing)
+            self.persistent_hits += len(loaded)
+            for key, entry in loaded.items():
+                self._entries[key] = entry
+                found[key] = entry[0]
+            self.misses += len(missing) - len(loaded)
+        else:
+            self.misses += len(missing)
+        return found
+
+    def set_many(self, values: dict[str, tuple[str, float]]) -> None:
+        """Store ``(sentiment, score)`` for each key."""
+        if not self.enabled or not values:
+            return
+        expires_at = time.time() + self.ttl
+        for key, value in values.items():
+            self._entries[key] = (value, expires_at)
+        if self._shared is not None:
+            self._shared.set_many(values, expires_at)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "persistent": self._shared is not None,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                round((self.hits + self.persistent_hits) / lookups, 4) if lookups else 0.0
+            ),
+        }
+
+
+# Shared by every SentimentAnalyzer in the process.
+sentiment_cache = SentimentCache(
+    maxsize=settings.sentiment_cache_max_entries,
+    ttl=settings.sentiment_cache_ttl,
+    enabled=settings.sentiment_cache_enabled,
+    shared=shared_tier("sentiment", SENTIMENT_CODEC, settings.sentiment_cache_path or None),
+)
+metrics.register_cache(lambda: {"name": "sentiment", **sentiment_cache.stats()})
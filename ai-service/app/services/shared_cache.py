@@ -0,0 +1,409 @@
+"""Host-wide cache tier shared by every worker process on one machine.
+
+Each uvicorn worker keeps its own in-process caches, so with N workers every
+distinct request misses up to N times and every entry is held N times.  A
+:class:`SharedTier` sits behind an in-process cache (see
+:class:`~app.services.response_cache.AsyncResponseCache` and
+:class:`~app.services.sentiment_cache.SentimentCache`): local misses are
+looked up in a :class:`CacheBackend` that every worker on the host reads and
+writes, and computed values are written to both.
+
+The backend is pluggable; :class:`SQLiteBackend` keeps entries in one SQLite
+file in WAL mode, which lets readers in every worker proceed while one
+writes.  Lookups and stores run on the event loop, so they wait only a few
+milliseconds for a lock held by another worker: a busy database counts as a
+miss (or a skipped store), and pruning runs on a background thread.  Entries
+are stored compactly -- a 16-byte digest of the key and the value as compact
+JSON, zlib-compressed when that is smaller -- with an absolute expiry time.
+Values promoted into an in-process tier keep that expiry, so an entry
+expires at the same moment in every worker however it got there.
+
+The tier is enabled by setting ``shared_cache_path`` (e.g.
+``var/cache.sqlite3``); otherwise every cache stays per process.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Generic, Optional, Protocol, TypeVar
+
+from pydantic import BaseModel
+
+from ..config import settings
+from .metrics import MetricFamily, metrics, stats_families
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+# Expired rows are deleted (and the row bound enforced) every this many writes.
+_PRUNE_EVERY = 1_000
+# Opening and pruning happen off the request path, so they can wait longer
+# for another worker's lock.
+_SETUP_TIMEOUT = 5.0
+# Stay well under SQLite's bound-parameter limit.
+_SQL_CHUNK = 500
+
+# One-byte header of every stored value.
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+# Values shorter than this are never worth compressing.
+_COMPRESS_MIN_BYTES = 256
+
+
+# ---------------------------------------------------------------------------
+# Serialisation
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Codec(Generic[T]):
+    """Turns cached values into bytes and back."""
+
+    encode: Callable[[T], bytes]
+    decode: Callable[[bytes], T]
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_codec() -> Codec[Any]:
+    """Codec for JSON-compatible values (tuples come back as lists)."""
+    return Codec(_json_dumps, json.loads)
+
+
+def model_codec(model: type[M]) -> Codec[M]:
+    """Codec for a pydantic model, validated again on the way back."""
+    return Codec(
+        lambda value: value.model_dump_json().encode("utf-8"),
+        model.model_validate_json,
+    )
+
+
+def pack(data: bytes) -> bytes:
+    """Prefix *data* with a header byte, compressing it when that is smaller."""
+    if len(data) >= _COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            return _ZLIB + compressed
+    return _RAW + data
+
+
+def unpack(blob: bytes) -> bytes:
+    """Inverse of :func:`pack`."""
+    header, data = blob[:1], blob[1:]
+    if header == _ZLIB:
+        return zlib.decompress(data)
+    if header == _RAW:
+        return data
+    raise ValueError(f"unknown shared cache value header {header!r}")
+
+
+def digest_key(key: Hashable) -> bytes:
+    """16-byte digest of a string or a tuple of JSON-compatible parts."""
+    text = key if isinstance(key, str) else _json_dumps(key).decode("utf-8")
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+class CacheBackend(Protocol):
+    """Storage shared by the workers on a host, keyed by ``(namespace, key)``."""
+
+    def get_many(
+        self, namespace: str, keys: Sequence[bytes]
+    ) -> dict[bytes, tuple[bytes, float]]:
+        """Return ``(value, expires_at)`` for each key held and not yet expired."""
+        ...
+
+    def set_many(self, namespace: str, entries: Mapping[bytes, tuple[bytes, float]]) -> None:
+        """Store ``(value, expires_at)`` for each key."""
+        ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+    def close(self) -> None: ...
+
+
+class SQLiteBackend:
+    """:class:`CacheBackend` in a local SQLite file in WAL mode.
+
+    Parameters
+    ----------
+    path:
+        Database file; its directory is created if needed.
+    max_entries:
+        Rows kept across all namespaces; the soonest to expire go first.
+    busy_timeout:
+        Seconds a lookup or store waits for another writer's lock before
+        giving up (a miss, or a store skipped).
+    """
+
+    def __init__(self, path: str, max_entries: int, busy_timeout: float = 0.005) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.busy_timeout = busy_timeout
+        self._writes = 0
+        self._pruning = threading.Lock()
+        self.reads = 0
+        self.read_hits = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.busy = 0
+        self.errors = 0
+        self._db: Optional[sqlite3.Connection] = self._open(path)
+        if self._db is not None:
+            self._prune_in_background()
+
+    def get_many(
+        self, namespace: str, keys: Sequence[bytes]
+    ) -> dict[bytes, tuple[bytes, float]]:
+        if self._db is None or not keys:
+            return {}
+        now = time.time()
+        found: dict[bytes, tuple[bytes, float]] = {}
+        try:
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[start : start + _SQL_CHUNK]
+                rows = self._db.execute(
+                    "SELECT key, value, expires_at FROM cache_entries"
+                    " WHERE namespace = ? AND expires_at > ?"
+                    f" AND key IN ({','.join('?' * len(chunk))})",
+                    (namespace, now, *chunk),
+                )
+                found.update((key, (value, expires_at)) for key, value, expires_at in rows)
+        except sqlite3.Error as exc:
+            self._failed(exc, "read")
+        self.reads += len(keys)
+        self.read_hits += len(found)
+        return found
+
+    def set_many(self, namespace: str, entries: Mapping[bytes, tuple[bytes, float]]) -> None:
+        if self._db is None or not entries:
+            return
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    [
+                        (namespace, key, value, expires_at)
+                        for key, (value, expires_at) in entries.items()
+                    ],
+                )
+        except sqlite3.Error as exc:
+            self._failed(exc, "write")
+            return
+        self.writes += len(entries)
+        self.bytes_written += sum(len(value) for value, _ in entries.values())
+        self._writes += len(entries)
+        if self._writes >= _PRUNE_EVERY:
+            self._writes = 0
+            self._prune_in_background()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": "sqlite",
+            "path": self.path,
+            "open": self._db is not None,
+            "reads": self.reads,
+            "read_hits": self.read_hits,
+            "writes": self.writes,
+            "bytes_written": self.bytes_written,
+            "busy": self.busy,
+            "errors": self.errors,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _open(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, timeout=_SETUP_TIMEOUT, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key BLOB NOT NULL, value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS cache_entries_expires_at"
+                " ON cache_entries (expires_at)"
+            )
+            db.execute(f"PRAGMA busy_timeout={max(0, round(self.busy_timeout * 1000))}")
+        except sqlite3.Error:
+            logger.exception("Cannot open shared cache at %s; caches stay per process.", path)
+            return None
+        return db
+
+    def _failed(self, exc: sqlite3.Error, operation: str) -> None:
+        if isinstance(exc, sqlite3.OperationalError) and "locked" in str(exc):
+            # Another worker holds the lock; not worth stalling the loop for.
+            self.busy += 1
+            return
+        self.errors += 1
+        logger.error("Shared cache %s failed: %s", operation, exc)
+
+    def _prune_in_background(self) -> None:
+        """Start :meth:`_prune` on its own thread unless one is running."""
+        if not self._pruning.acquire(blocking=False):
+            return
+        threading.Thread(target=self._prune, name="shared-cache-prune", daemon=True).start()
+
+    def _prune(self) -> None:
+        """Delete expired rows and enforce ``max_entries`` on a separate connection."""
+        try:
+            db = sqlite3.connect(self.path, timeout=_SETUP_TIMEOUT)
+        except sqlite3.Error:
+            self.errors += 1
+            self._pruning.release()
+            logger.exception("Shared cache prune failed.")
+            return
+        try:
+            with db:
+                db.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+                (rows,) = db.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+                if rows > self.max_entries:
+                    db.execute(
+                        "DELETE FROM cache_entries WHERE (namespace, key) IN ("
+                        " SELECT namespace, key FROM cache_entries"
+                        " ORDER BY expires_at LIMIT ?)",
+                        (rows - self.max_entries,),
+                    )
+        except sqlite3.Error:
+            self.errors += 1
+            logger.exception("Shared cache prune failed.")
+        finally:
+            db.close()
+            self._pruning.release()
+
+
+# ---------------------------------------------------------------------------
+# Per-cache view
+# ---------------------------------------------------------------------------
+
+
+class SharedTier(Generic[T]):
+    """One cache's namespace in a :class:`CacheBackend`, with its codec.
+
+    Values that fail to decode (e.g. written by an older model version) are
+    treated as misses.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, codec: Codec[T]) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.codec = codec
+        self.decode_errors = 0
+
+    def get(self, key: Hashable) -> Optional[tuple[T, float]]:
+        """Return ``(value, expires_at)`` for *key*, or ``None``."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict[Hashable, tuple[T, float]]:
+        """Return ``(value, expires_at)`` for each key that has a live entry."""
+        by_digest = {digest_key(key): key for key in keys}
+        rows = self.backend.get_many(self.namespace, list(by_digest))
+        found: dict[Hashable, tuple[T, float]] = {}
+        for digest, (blob, expires_at) in rows.items():
+            try:
+                value = self.codec.decode(unpack(blob))
+            except Exception:
+                self.decode_errors += 1
+                logger.warning("Dropping undecodable %s shared cache entry.", self.namespace)
+                continue
+            found[by_digest[digest]] = (value, expires_at)
+        return found
+
+    def set(self, key: Hashable, value: T, expires_at: float) -> None:
+        self.set_many({key: value}, expires_at)
+
+    def set_many(self, values: Mapping[Hashable, T], expires_at: float) -> None:
+        """Store every value with the same absolute expiry time."""
+        self.backend.set_many(
+            self.namespace,
+            {
+                digest_key(key): (pack(self.codec.encode(value)), expires_at)
+                for key, value in values.items()
+            },
+        )
+
+
+# ---------------------------------------------------------------------------
+# Process-wide backends
+# ---------------------------------------------------------------------------
+
+_backends: dict[str, SQLiteBackend] = {}
+
+
+def shared_backend(path: Optional[str] = None) -> Optional[SQLiteBackend]:
+    """Return this process's backend for *path*, opening it on first use.
+
+    *path* defaults to ``settings.shared_cache_path``; ``None`` is returned
+    when it is empty (no shared tier).
+    """
+    path = settings.shared_cache_path if path is None else path
+    if not path:
+        return None
+    backend = _backends.get(path)
+    if backend is None:
+        backend = _backends[path] = SQLiteBackend(
+            path, settings.shared_cache_max_entries, settings.shared_cache_busy_timeout
+        )
+    return backend
+
+
+def shared_tier(
+    namespace: str, codec: Codec[T], path: Optional[str] = None
+) -> Optional[SharedTier[T]]:
+    """Return a :class:`SharedTier` for *namespace*, or ``None`` if none is configured."""
+    backend = shared_backend(path)
+    return SharedTier(backend, namespace, codec) if backend is not None else None
+
+
+def close_backends() -> None:
+    """Close every backend opened by this process."""
+    for backend in _backends.values():
+        backend.close()
+    _backends.clear()
+
+
+_BACKEND_FIELDS = {
+    "reads": ("counter", "Keys looked up in the shared cache tier."),
+    "read_hits": ("counter", "Shared cache lookups that found a live entry."),
+    "writes": ("counter", "Entries written to the shared cache tier."),
+    "bytes_written": ("counter", "Encoded bytes written to the shared cache tier."),
+    "busy": ("counter", "Shared cache reads and writes skipped because the database was locked."),
+    "errors": ("counter", "Shared cache backend errors."),
+}
+
+
+def _collect_backends() -> list[MetricFamily]:
+    return stats_families(
+        "ai_service_shared_cache",
+        _BACKEND_FIELDS,
+        [({"path": backend.path}, backend.stats()) for backend in _backends.values()],
+    )
+
+
+metrics.register_collector(_collect_backends)
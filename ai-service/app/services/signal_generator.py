@@ -1,27 +1,124 @@
 """Signal generator combining technical, sentiment, and LLM analysis."""
 
+import asyncio
+import hashlib
 import logging
-from typing import Any, Optional
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Union
 
+from ..config import settings
 from ..models.schemas import ArticleInput, CandleData, SignalResponse
-from .technical import TechnicalAnalyzer
+from .candle_store import CandleStore, build_fetcher
+from .candles import CandleArrays
+from .executors import LoopSemaphore, executors
+from .indicator_state import IndicatorStateStore
+from .metrics import IN_FLIGHT, STAGE_SECONDS, MetricFamily, metrics
+from .response_cache import AsyncResponseCache
+from .shared_cache import Codec, json_codec, shared_tier
+from .technical import (
+    DECISION_THRESHOLD,
+    HAS_PANDAS_TA,
+    TECHNICAL_WEIGHT,
+    TechnicalAnalyzer,
+)
 from .sentiment import SentimentAnalyzer
 from .llm_client import LLMClient
 
 logger = logging.getLogger(__name__)
 
+# Only entries that passed ``cache_if`` (``cacheable`` is True) are stored.
+_SIGNAL_ENTRY_CODEC: Codec[tuple[SignalResponse, bool]] = Codec(
+    lambda entry: entry[0].model_dump_json().encode("utf-8"),
+    lambda data: (SignalResponse.model_validate_json(data), True),
+)
+
+
+@dataclass(slots=True)
+class _PreparedSignal:
+    """One symbol's technical and sentiment results, ready for the LLM layer."""
+
+    symbol: str
+    key: tuple[str, str, str]
+    indicators: dict
+    tech_signal: str
+    tech_confidence: float
+    sentiment_data: dict[str, Any]
+    llm_key: tuple
+    # Technical and sentiment terms of the weighted score, without the LLM.
+    partial_score: float
+
+    def llm_request(self) -> dict[str, Any]:
+        """Keyword arguments for :meth:`LLMClient.deep_analysis`."""
+        return {
+            "symbol": self.symbol,
+            "technical_data": self.indicators,
+            "sentiment_data": self.sentiment_data,
+            "price": self.indicators.get("current_price", 0.0),
+        }
+
 
 class SignalGenerator:
     """Orchestrate all analysis layers and produce a final trading signal."""
 
-    TECHNICAL_WEIGHT = 0.45
+    # Defined in .technical, which the backtest imports without this module.
+    TECHNICAL_WEIGHT = TECHNICAL_WEIGHT
     SENTIMENT_WEIGHT = 0.20
     LLM_WEIGHT = 0.35
+    DECISION_THRESHOLD = DECISION_THRESHOLD
 
     def __init__(self) -> None:
         self.technical = TechnicalAnalyzer()
         self.sentiment = SentimentAnalyzer()
         self.llm = LLMClient()
+        self.indicator_states = IndicatorStateStore(
+            maxsize=settings.indicator_state_max_symbols,
+            run_blocking=executors.indicators.run,
+        )
+        if settings.incremental_indicators and HAS_PANDAS_TA:
+            logger.warning(
+                "incremental_indicators is ignored: analyze() uses pandas-ta, "
+                "whose values the incremental state does not reproduce."
+            )
+        self.candle_store = CandleStore(
+            settings.candle_store_dir,
+            build_fetcher(settings.candle_fetcher, settings.candle_backfill_period),
+            refresh_interval=settings.candle_refresh_interval,
+            window=settings.candle_window,
+            run_blocking=executors.io.run,
+            max_concurrent_fetches=settings.market_data_concurrency,
+        )
+        # Shared by every caller, so a scan cannot starve the LLM upstream.
+        self._llm_slots = LoopSemaphore(settings.llm_concurrency)
+        # Background enrichment of fast decisions, by signal cache key.
+        self._enrichments: dict[tuple, asyncio.Task] = {}
+        self.decision_paths = {"llm": 0, "fast": 0, "enriched": 0}
+
+        # Per-layer caches keyed on the candle-window fingerprint; each also
+        # collapses concurrent identical computations into one.  Signals and
+        # LLM analyses are also shared across workers when a shared tier is
+        # configured; indicators are cheaper to recompute than to fetch.
+        cache_size, cache_ttl = settings.signal_cache_max_entries, settings.signal_cache_ttl
+        enabled = settings.signal_cache_enabled
+        self.signal_cache: AsyncResponseCache[tuple[SignalResponse, bool]] = AsyncResponseCache(
+            "signals",
+            cache_size,
+            cache_ttl,
+            enabled,
+            cache_if=lambda entry: entry[1],
+            shared=shared_tier("signals", _SIGNAL_ENTRY_CODEC),
+        )
+        self.indicator_cache: AsyncResponseCache[dict] = AsyncResponseCache(
+            "indicators", cache_size, cache_ttl, enabled
+        )
+        self.llm_cache: AsyncResponseCache[dict[str, Any]] = AsyncResponseCache(
+            "llm",
+            cache_size,
+            cache_ttl,
+            enabled,
+            cache_if=lambda result: not result.get("fallback"),
+            shared=shared_tier("llm", json_codec()),
+        )
 
     # ------------------------------------------------------------------
     # Public API
@@ -30,63 +127,328 @@ class SignalGenerator:
     async def generate_signal(
         self,
         symbol: str,
-        candles: list[CandleData],
+        candles: Union[list[CandleData], CandleArrays],
         articles: Optional[list[ArticleInput]] = None,
     ) -> SignalResponse:
         """Generate a composite trading signal for *symbol*.
 
+        Concurrent requests for the same symbol, candle window and articles
+        share one computation, and the result is reused for
+        ``settings.signal_cache_ttl`` seconds unless the LLM layer failed.
+
         Steps
         -----
         1. Technical analysis on *candles*.
         2. Sentiment analysis on *articles* (if provided).
-        3. Deep LLM analysis combining both datasets.
+        3. Deep LLM analysis combining both datasets -- skipped in fast
+           decision mode when steps 1-2 alone are decisive.
         4. Weighted combination of scores.
         5. Final signal determination.
         """
-        # --- 0. If candles are empty, attempt yfinance fallback -----------
-        if not candles:
-            candles = self._fetch_candles_fallback(symbol)
+        with IN_FLIGHT.labels("signals").track_in_progress():
+            arrays, key = await self._load(symbol, candles, articles)
+            signal, _ = await self.signal_cache.get_or_compute(
+                key,
+                lambda: self._compute_signal(symbol, arrays, key, articles, stored=not len(candles)),
+            )
+        return signal
+
+    async def generate_signals(
+        self, symbols: list[str]
+    ) -> list[Union[SignalResponse, Exception]]:
+        """Generate signals for several symbols, batching their LLM analyses.
+
+        Candles come from the local store.  Cached signals are reused and
+        signals (or deep analyses) already being computed by other requests
+        are awaited; the other symbols are prepared concurrently and their
+        deep analyses are sent ``settings.llm_batch_size`` at a time through
+        :meth:`LLMClient.deep_analysis_batch`.  Returns one entry per symbol,
+        in order, with the exception in place of the signal for any symbol
+        that failed.
+        """
+        with IN_FLIGHT.labels("signals").track_in_progress():
+            return await self._generate_signals(symbols)
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Return cache counters for every layer of :meth:`generate_signal`."""
+        return {
+            "signals": self.signal_cache.stats(),
+            "candles": self.candle_store.stats(),
+            "indicators": self.indicator_cache.stats(),
+            "llm": self.llm_cache.stats(),
+            "sentiment": self.sentiment.cache.stats(),
+            "decision_paths": dict(self.decision_paths),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _generate_signals(
+        self, symbols: list[str]
+    ) -> list[Union[SignalResponse, Exception]]:
+        unique = list(dict.fromkeys(symbols))
+        loaded = await asyncio.gather(
+            *[self._load(s, [], None) for s in unique], return_exceptions=True
+        )
+        by_symbol: dict[str, Union[SignalResponse, BaseException]] = {}
+        windows: dict[tuple[str, str, str], CandleArrays] = {}
+        for symbol, item in zip(unique, loaded):
+            if isinstance(item, BaseException):
+                by_symbol[symbol] = item
+            else:
+                arrays, key = item
+                windows[key] = arrays
+
+        # Symbols already being computed elsewhere are awaited, not redone.
+        entries = await self.signal_cache.get_or_compute_many(
+            windows, lambda keys: self._compute_signals({key: windows[key] for key in keys})
+        )
+        for key, entry in entries.items():
+            by_symbol[key[0]] = entry if isinstance(entry, BaseException) else entry[0]
+        return [by_symbol[s] for s in symbols]
+
+    async def _compute_signals(
+        self, windows: dict[tuple[str, str, str], CandleArrays]
+    ) -> dict[tuple[str, str, str], Union[tuple[SignalResponse, bool], BaseException]]:
+        """Batch form of :meth:`_compute_signal` for symbols without articles."""
+        keys = list(windows)
+        prepared = await asyncio.gather(
+            *[self._prepare(key[0], windows[key], key, None, stored=True) for key in keys],
+            return_exceptions=True,
+        )
+        ready = [item for item in prepared if isinstance(item, _PreparedSignal)]
+        decisive = [item for item in ready if self._is_decisive(item)]
+        needed = {item.llm_key: item for item in ready if not self._is_decisive(item)}
+
+        # --- LLM phase: cache hits first, the rest in batches -------------
+        llm_results = await self.llm_cache.get_or_compute_many(
+            needed, lambda llm_keys: self._deep_analysis_many([needed[k] for k in llm_keys])
+        )
+        self._schedule_enrichment(decisive)
+
+        # --- Combine -----------------------------------------------------
+        entries: dict[tuple[str, str, str], Any] = {}
+        for key, item in zip(keys, prepared):
+            if not isinstance(item, _PreparedSignal):
+                entries[key] = item
+                continue
+            llm_result = llm_results.get(item.llm_key)
+            if isinstance(llm_result, BaseException):
+                entries[key] = llm_result
+            else:
+                entries[key] = self._combine(item, llm_result)
+        return entries
+
+    async def _load(
+        self,
+        symbol: str,
+        candles: Union[list[CandleData], CandleArrays],
+        articles: Optional[list[ArticleInput]],
+    ) -> tuple[CandleArrays, tuple[str, str, str]]:
+        """Resolve the candle window and the signal cache key for a request."""
+        # --- 0. If candles are empty, read the local candle store ---------
+        if not len(candles):
+            with STAGE_SECONDS.labels("signals", "candles").time():
+                candles = await self.candle_store.window(symbol)
+        arrays = CandleArrays.coerce(candles)
+        return arrays, (symbol, arrays.fingerprint(), self._articles_fingerprint(articles))
+
+    async def _compute_signal(
+        self,
+        symbol: str,
+        candles: CandleArrays,
+        key: tuple[str, str, str],
+        articles: Optional[list[ArticleInput]],
+        stored: bool = False,
+    ) -> tuple[SignalResponse, bool]:
+        """Run every layer for one request; the flag says whether to cache it."""
+        prepared = await self._prepare(symbol, candles, key, articles, stored)
+        if self._is_decisive(prepared):
+            self._schedule_enrichment([prepared])
+            return self._combine(prepared, None)
+        llm_result = await self.llm_cache.get_or_compute(
+            prepared.llm_key, lambda: self._single_deep_analysis(prepared)
+        )
+        return self._combine(prepared, llm_result)
+
+    async def _prepare(
+        self,
+        symbol: str,
+        candles: CandleArrays,
+        key: tuple[str, str, str],
+        articles: Optional[list[ArticleInput]],
+        stored: bool = False,
+    ) -> _PreparedSignal:
+        """Technical and sentiment layers: everything before the LLM call.
+
+        *stored* says *candles* is the candle store's window for *symbol*.
+        """
+        fingerprint = key[1]
 
         # --- 1. Technical analysis ----------------------------------------
-        indicators = self.technical.analyze(candles)
-        tech_signal, tech_confidence = self.technical.get_signal_from_technicals(indicators)
-        tech_score = self._signal_to_score(tech_signal, tech_confidence)
+        with STAGE_SECONDS.labels("signals", "indicators").time():
+            indicators = await self.indicator_cache.get_or_compute(
+                (symbol, fingerprint, stored),
+                lambda: self._compute_indicators(symbol, candles, stored),
+            )
+            tech_signal, tech_confidence = self.technical.get_signal_from_technicals(indicators)
 
         # --- 2. Sentiment analysis ----------------------------------------
         sentiment_score = 0.0
         overall_sentiment = "neutral"
         if articles:
-            overall_sentiment, sentiment_score = await self.sentiment.get_aggregate_sentiment(articles)
+            with STAGE_SECONDS.labels("signals", "sentiment").time():
+                async with self._llm_slots:
+                    overall_sentiment, sentiment_score = (
+                        await self.sentiment.get_aggregate_sentiment(articles)
+                    )
 
-        # --- 3. LLM deep analysis ----------------------------------------
-        current_price = indicators.get("current_price", 0.0)
         sentiment_data: dict[str, Any] = {
             "overall_sentiment": overall_sentiment,
             "sentiment_score": sentiment_score,
             "num_articles_analysed": len(articles) if articles else 0,
         }
-        llm_result = await self.llm.deep_analysis(
+        tech_score = self._signal_to_score(tech_signal, tech_confidence)
+        return _PreparedSignal(
             symbol=symbol,
-            technical_data=indicators,
+            key=key,
+            indicators=indicators,
+            tech_signal=tech_signal,
+            tech_confidence=tech_confidence,
             sentiment_data=sentiment_data,
-            price=current_price,
+            llm_key=(
+                symbol,
+                fingerprint,
+                overall_sentiment,
+                round(sentiment_score, 4),
+                sentiment_data["num_articles_analysed"],
+            ),
+            partial_score=(
+                tech_score * self.TECHNICAL_WEIGHT + sentiment_score * self.SENTIMENT_WEIGHT
+            ),
+        )
+
+    def _is_decisive(self, prepared: _PreparedSignal) -> bool:
+        """Whether fast decision mode may skip the LLM for *prepared*.
+
+        Past the threshold an opposing LLM term (at most ``LLM_WEIGHT``) can
+        still pull the full path back to HOLD -- a 0.31 partial score with a
+        full-confidence LLM SELL combines to -0.04 -- but not to the opposite
+        signal.  Only a threshold of ``DECISION_THRESHOLD + LLM_WEIGHT``
+        (0.65) guarantees the full path would agree.
+        """
+        return (
+            settings.fast_decision_enabled
+            and abs(prepared.partial_score) > settings.fast_decision_threshold
         )
-        llm_score = self._signal_to_score(
+
+    def _schedule_enrichment(self, items: list[_PreparedSignal]) -> None:
+        """Start background LLM analysis of fast decisions, if enabled."""
+        if not settings.fast_decision_enrich or not self.llm.available:
+            return
+        items = [item for item in items if item.key not in self._enrichments]
+        if not items:
+            return
+        task = asyncio.create_task(self._enrich(items))
+        keys = [item.key for item in items]
+        for key in keys:
+            self._enrichments[key] = task
+
+        def forget(_: asyncio.Task) -> None:
+            for key in keys:
+                self._enrichments.pop(key, None)
+
+        task.add_done_callback(forget)
+
+    async def _enrich(self, items: list[_PreparedSignal]) -> None:
+        """Replace cached fast decisions with full LLM-backed signals."""
+        size = max(1, settings.llm_batch_size)
+        for start in range(0, len(items), size):
+            batch = items[start : start + size]
+            try:
+                results = await self._deep_analysis(batch)
+            except Exception:
+                logger.exception("Background enrichment failed for %d symbols.", len(batch))
+                continue
+            for item, result in zip(batch, results):
+                if result.get("fallback"):
+                    continue
+                self.llm_cache.set(item.llm_key, result)
+                signal, _ = self._combine(item, result, decision_path="enriched")
+                self.signal_cache.set(item.key, (signal, True))
+
+    async def _single_deep_analysis(self, prepared: _PreparedSignal) -> dict[str, Any]:
+        return (await self._deep_analysis([prepared]))[0]
+
+    async def _deep_analysis_many(
+        self, items: list[_PreparedSignal]
+    ) -> dict[tuple, dict[str, Any]]:
+        """Deep analyses of *items* by ``llm_key``, ``settings.llm_batch_size`` per call."""
+        size = max(1, settings.llm_batch_size)
+        batches = [items[i : i + size] for i in range(0, len(items), size)]
+        results = await asyncio.gather(*[self._deep_analysis(batch) for batch in batches])
+        return {
+            item.llm_key: result
+            for batch, batch_results in zip(batches, results)
+            for item, result in zip(batch, batch_results)
+        }
+
+    async def _deep_analysis(self, batch: list[_PreparedSignal]) -> list[dict[str, Any]]:
+        """Deep LLM analysis for *batch*, in one request where possible.
+
+        Symbols the batched request could not analyse are retried one by
+        one, each holding its own LLM slot.
+        """
+        requests = [item.llm_request() for item in batch]
+        async with self._llm_slots:
+            results = await self.llm.deep_analysis_batch(requests)
+        retry = [i for i, result in enumerate(results) if result is None]
+        if retry:
+            logger.info("Retrying %d of %d batched symbols individually.", len(retry), len(batch))
+            retried = await asyncio.gather(*[self._retry_deep_analysis(requests[i]) for i in retry])
+            for i, result in zip(retry, retried):
+                results[i] = result
+        return results  # type: ignore[return-value]
+
+    async def _retry_deep_analysis(self, request: dict[str, Any]) -> dict[str, Any]:
+        async with self._llm_slots:
+            return await self.llm.deep_analysis(**request)
+
+    def _combine(
+        self,
+        prepared: _PreparedSignal,
+        llm_result: Optional[dict[str, Any]],
+        decision_path: str = "llm",
+    ) -> tuple[SignalResponse, bool]:
+        """Weight the layers into the final signal; the flag says whether to cache it.
+
+        A ``None`` *llm_result* is a fast decision: the LLM term is left out
+        and the summaries are built locally.
+        """
+        started = time.perf_counter()
+        symbol = prepared.symbol
+        indicators = prepared.indicators
+        tech_signal, tech_confidence = prepared.tech_signal, prepared.tech_confidence
+        overall_sentiment = prepared.sentiment_data["overall_sentiment"]
+        sentiment_score = prepared.sentiment_data["sentiment_score"]
+
+        fast = llm_result is None
+        if fast:
+            decision_path = "fast"
+            llm_result = {}
+        llm_score = 0.0 if fast else self._signal_to_score(
             llm_result.get("signal", "HOLD"),
             llm_result.get("confidence", 0.5),
         )
 
         # --- 4. Weighted combination -------------------------------------
-        combined_score = (
-            tech_score * self.TECHNICAL_WEIGHT
-            + sentiment_score * self.SENTIMENT_WEIGHT
-            + llm_score * self.LLM_WEIGHT
-        )
+        combined_score = prepared.partial_score + llm_score * self.LLM_WEIGHT
 
         # --- 5. Final signal determination --------------------------------
-        if combined_score > 0.3:
+        if combined_score > self.DECISION_THRESHOLD:
             final_signal = "BUY"
-        elif combined_score < -0.3:
+        elif combined_score < -self.DECISION_THRESHOLD:
             final_signal = "SELL"
         else:
             final_signal = "HOLD"
@@ -113,18 +475,26 @@ class SignalGenerator:
             f"Overall sentiment: {overall_sentiment} (score: {sentiment_score:.2f})",
         )
 
-        reasoning = llm_result.get(
-            "reasoning",
-            (
+        if fast:
+            default_reasoning = (
+                f"Fast decision for {symbol}: "
+                f"technical={tech_signal}({tech_confidence:.2f}), "
+                f"sentiment={overall_sentiment}({sentiment_score:.2f}). "
+                f"Weighted score without the LLM: {combined_score:.4f}, past the "
+                f"{settings.fast_decision_threshold} threshold, so LLM analysis was skipped; "
+                f"an opposing LLM view could have pulled this back to HOLD."
+            )
+        else:
+            default_reasoning = (
                 f"Combined analysis for {symbol}: "
                 f"technical={tech_signal}({tech_confidence:.2f}), "
                 f"sentiment={overall_sentiment}({sentiment_score:.2f}), "
                 f"LLM={llm_result.get('signal', 'HOLD')}({llm_result.get('confidence', 0.5):.2f}). "
                 f"Weighted score: {combined_score:.4f}."
-            ),
-        )
+            )
+        reasoning = llm_result.get("reasoning", default_reasoning)
 
-        return SignalResponse(
+        signal = SignalResponse(
             symbol=symbol,
             signal_type=final_signal,
             confidence=round(final_confidence, 4),
@@ -134,11 +504,40 @@ class SignalGenerator:
             risk_level=risk_level,
             price_target=llm_result.get("price_target"),
             stop_loss=llm_result.get("stop_loss"),
+            decision_path=decision_path,
         )
+        self.decision_paths[decision_path] += 1
+        STAGE_SECONDS.labels("signals", "combine").observe(time.perf_counter() - started)
+        return signal, not llm_result.get("fallback", False)
 
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
+    async def _compute_indicators(
+        self, symbol: str, candles: CandleArrays, stored: bool
+    ) -> dict:
+        """Indicators of *candles*, or, with ``incremental_indicators`` and
+        *stored* candles, of the symbol's whole stored history (kept up to
+        date incrementally; a sliding window could not be).
+
+        The incremental state reproduces the NumPy fallback path of
+        ``analyze()`` only, so it is not used when pandas-ta is installed.
+        """
+        if settings.incremental_indicators and stored and not HAS_PANDAS_TA:
+            try:
+                return await self.indicator_states.advance(
+                    symbol, self.candle_store.history(symbol)
+                )
+            except ValueError as exc:
+                logger.warning("Incremental indicators failed for %s (%s); recomputing.", symbol, exc)
+        return await executors.indicators.run(self.technical.analyze, candles)
+
+    @staticmethod
+    def _articles_fingerprint(articles: Optional[list[ArticleInput]]) -> str:
+        if not articles:
+            return ""
+        digest = hashlib.blake2b(digest_size=16)
+        for article in articles:
+            digest.update(article.model_dump_json().encode())
+            digest.update(b"\x1e")
+        return digest.hexdigest()
 
     @staticmethod
     def _signal_to_score(signal: str, confidence: float) -> float:
@@ -148,38 +547,27 @@ class SignalGenerator:
         )
         return direction * confidence
 
-    @staticmethod
-    def _fetch_candles_fallback(symbol: str) -> list[CandleData]:
-        """Attempt to fetch recent candle data via yfinance.
 
-        Returns an empty list if yfinance is unavailable or the download
-        fails.
-        """
-        try:
-            import yfinance as yf
-
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period="3mo", interval="1d")
-            if df.empty:
-                return []
-
-            candles: list[CandleData] = []
-            for ts, row in df.iterrows():
-                candles.append(
-                    CandleData(
-                        time=int(ts.timestamp()),
-                        open=float(row["Open"]),
-                        high=float(row["High"]),
-                        low=float(row["Low"]),
-                        close=float(row["Close"]),
-                        volume=float(row["Volume"]),
-                    )
-                )
-            return candles
+# Shared by every router so they all hit the same caches.
+signal_generator = SignalGenerator()
 
-        except Exception:
-            logger.warning(
-                "yfinance fallback failed for %s; proceeding with empty candles.",
-                symbol,
-            )
-            return []
+for _cache in (
+    signal_generator.signal_cache,
+    signal_generator.indicator_cache,
+    signal_generator.llm_cache,
+):
+    metrics.register_cache(_cache.stats)
+
+
+def _collect_decision_paths() -> list[MetricFamily]:
+    family = MetricFamily(
+        "ai_service_signal_decisions_total",
+        "counter",
+        "Signals produced by decision path (llm, fast, enriched).",
+    )
+    for path, count in signal_generator.decision_paths.items():
+        family.add(count, path=path)
+    return [family]
+
+
+metrics.register_collector(_collect_decision_paths)
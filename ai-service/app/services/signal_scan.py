@@ -0,0 +1,183 @@
+"""Bounded-concurrency scans that stream signals for many symbols.
+
+A :class:`SignalScan` works through its symbol list with a fixed number of
+workers and yields one event per symbol as soon as that symbol finishes, so
+a scan of thousands of tickers starts producing output immediately and never
+has more than ``concurrency`` symbols in progress.  Each worker takes
+``batch_size`` symbols at a time so their LLM analyses share one request.  Upstream limits (market
+data, LLM) are enforced separately by :class:`SignalGenerator`, so scans and
+ordinary requests share them.
+
+Scans are registered by id in a :class:`ScanRegistry` so a client can
+cancel one from another request, even before its stream has started.  A
+scan whose stream is never read (e.g. the client went away before the
+response started) is dropped from the registry after ``start_timeout``.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, Optional, Union
+
+from ..config import settings
+from ..models.schemas import SignalResponse
+
+logger = logging.getLogger(__name__)
+
+
+class SignalScan:
+    """One scan over *symbols* with at most *concurrency* in progress."""
+
+    def __init__(self, symbols: list[str], concurrency: int, batch_size: int = 1) -> None:
+        self.scan_id = uuid.uuid4().hex
+        self.symbols = symbols
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, min(batch_size, self.concurrency))
+        self.started_at = time.time()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = False
+        self.streaming = False
+        self._queue: asyncio.Queue[Optional[dict[str, Any]]] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+
+    async def events(
+        self, generate: Callable[[list[str]], Awaitable[list[Union[SignalResponse, Exception]]]]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield a ``scan`` header, one ``result``/``error`` per symbol, then ``done``.
+
+        *generate* takes a batch of symbols and returns a signal or an
+        exception for each.  Closing the iterator (e.g. on client
+        disconnect) cancels the scan, and a scan cancelled before iteration
+        starts goes straight to ``done``.
+        """
+        self.streaming = True
+        yield {"type": "scan", "scan_id": self.scan_id, "total": len(self.symbols)}
+
+        pending = (
+            (start, self.symbols[start : start + self.batch_size])
+            for start in range(0, len(self.symbols), self.batch_size)
+        )
+        batches = -(-len(self.symbols) // self.batch_size)
+        remaining = 0 if self.cancelled else min(self.concurrency // self.batch_size, batches)
+
+        async def worker() -> None:
+            nonlocal remaining
+            try:
+                for start, batch in pending:
+                    for event in await self._run_batch(generate, start, batch):
+                        self._queue.put_nowait(event)
+            finally:
+                remaining -= 1
+                if remaining == 0:
+                    self._queue.put_nowait(None)
+
+        self._workers = [asyncio.create_task(worker()) for _ in range(remaining)]
+        if not self._workers:
+            self._queue.put_nowait(None)
+
+        try:
+            while (event := await self._queue.get()) is not None:
+                yield event
+        finally:
+            self.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+        yield {
+            "type": "done",
+            "scan_id": self.scan_id,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "elapsed": round(time.time() - self.started_at, 3),
+        }
+
+    def cancel(self) -> None:
+        """Stop starting new symbols and abandon the ones in progress."""
+        if self.completed + self.failed < len(self.symbols):
+            self.cancelled = True
+        for task in self._workers:
+            task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "scan_id": self.scan_id,
+            "total": len(self.symbols),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+    async def _run_batch(
+        self,
+        generate: Callable[[list[str]], Awaitable[list[Union[SignalResponse, Exception]]]],
+        start: int,
+        batch: list[str],
+    ) -> list[dict[str, Any]]:
+        try:
+            results: list[Union[SignalResponse, Exception]] = await generate(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            results = [exc] * len(batch)
+
+        events = []
+        for index, (symbol, result) in enumerate(zip(batch, results), start):
+            if isinstance(result, SignalResponse):
+                self.completed += 1
+                events.append(
+                    {"type": "result", "index": index, "symbol": symbol, "signal": result.model_dump()}
+                )
+                continue
+            logger.error(
+                "Scan %s: error generating signal for %s", self.scan_id, symbol, exc_info=result
+            )
+            self.failed += 1
+            events.append({"type": "error", "index": index, "symbol": symbol, "detail": str(result)})
+        return events
+
+
+class ScanRegistry:
+    """Scans created or streaming in this process, by id.
+
+    A scan whose stream has not started *start_timeout* seconds after it
+    was created is dropped.
+    """
+
+    def __init__(self, start_timeout: float = 60.0) -> None:
+        self.start_timeout = start_timeout
+        self._scans: dict[str, SignalScan] = {}
+
+    def start(self, symbols: list[str], concurrency: int, batch_size: int = 1) -> SignalScan:
+        self._drop_unstarted()
+        scan = SignalScan(symbols, concurrency, batch_size)
+        self._scans[scan.scan_id] = scan
+        return scan
+
+    def finish(self, scan_id: str) -> None:
+        self._scans.pop(scan_id, None)
+
+    def cancel(self, scan_id: str) -> bool:
+        """Cancel a scan; return ``False`` if it is unknown."""
+        self._drop_unstarted()
+        scan = self._scans.get(scan_id)
+        if scan is None:
+            return False
+        scan.cancel()
+        return True
+
+    def active(self) -> list[dict[str, Any]]:
+        self._drop_unstarted()
+        return [scan.stats() for scan in self._scans.values()]
+
+    def _drop_unstarted(self) -> None:
+        cutoff = time.time() - self.start_timeout
+        for scan_id, scan in list(self._scans.items()):
+            if not scan.streaming and scan.started_at < cutoff:
+                logger.info("Dropping scan %s; its stream never started.", scan_id)
+                del self._scans[scan_id]
+
+
+scan_registry = ScanRegistry(settings.scan_start_timeout)
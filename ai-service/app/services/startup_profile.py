@@ -0,0 +1,100 @@
+"""Startup-time breakdown of the application process.
+
+``app.main`` wraps each step of its cold start -- importing a router module,
+opening the Anthropic pool, starting the executors, warming up -- in
+:meth:`StartupProfile.phase`.  Each phase records its wall time and the
+third-party packages first imported during it, so the report shows where
+import and initialisation time goes (e.g. the ``signals`` router bringing in
+pandas, pandas-ta and numba).  The report is logged once the app is ready
+and served at ``/health/startup``.
+
+For a per-module import breakdown, run
+``python -m benchmarks.bench_startup`` (which uses ``python -X importtime``).
+"""
+
+import logging
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def _top_level_packages() -> set[str]:
+    """Top-level names in ``sys.modules``, excluding the standard library."""
+    names = {name.partition(".")[0] for name in list(sys.modules)}
+    return {
+        name for name in names
+        if name not in sys.stdlib_module_names and not name.startswith("_")
+    }
+
+
+@dataclass
+class StartupPhase:
+    name: str
+    seconds: float
+    modules_loaded: int
+    packages: list[str] = field(default_factory=list)
+
+
+class StartupProfile:
+    """Record the duration and new third-party imports of each cold-start phase."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.ready_at: float = 0.0
+        self.phases: list[StartupPhase] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and note the packages it imported."""
+        modules_before = len(sys.modules)
+        packages_before = _top_level_packages()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                StartupPhase(
+                    name=name,
+                    seconds=time.perf_counter() - started,
+                    modules_loaded=len(sys.modules) - modules_before,
+                    packages=sorted(_top_level_packages() - packages_before),
+                )
+            )
+
+    def ready(self) -> None:
+        """Mark the process ready to serve and log the report."""
+        self.ready_at = time.perf_counter()
+        report = self.report()
+        logger.info(
+            "Startup took %.3fs (%d modules loaded): %s",
+            report["total_seconds"],
+            report["modules_loaded"],
+            ", ".join(f"{p['name']} {p['seconds']:.3f}s" for p in report["phases"]),
+        )
+
+    def report(self) -> dict[str, Any]:
+        end = self.ready_at or time.perf_counter()
+        return {
+            "ready": bool(self.ready_at),
+            "total_seconds": round(end - self.started, 4),
+            "modules_loaded": len(sys.modules),
+            "phases": [
+                {
+                    "name": phase.name,
+                    "seconds": round(phase.seconds, 4),
+                    "modules_loaded": phase.modules_loaded,
+                    "packages": phase.packages,
+                }
+                for phase in self.phases
+            ],
+        }
+
+
+# Created when ``app.main`` starts importing, so ``total_seconds`` covers the
+# application's own imports (not interpreter start-up).
+startup_profile = StartupProfile()
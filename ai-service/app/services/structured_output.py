@@ -0,0 +1,338 @@
+"""Structured LLM output through forced tool use.
+
+Rather than asking for "ONLY the JSON object" and parsing free text, each
+call site declares a :class:`ToolSpec` whose input schema is derived from a
+Pydantic model and forces the model to call that tool, so the API returns
+the arguments already parsed.
+
+Validation is per entry -- each symbol, article or message of a batched
+call -- so one bad entry does not discard the rest of a paid completion.
+Only the invalid entries are sent back, once, in a short repair prompt
+holding their values and the validation errors (not the original prompt).
+Missing entries are never repaired -- without the original input the model
+could only invent them -- so they, and whatever is still invalid after the
+repair, are left out of the result for the caller to fall back on.  Failure counts are kept per
+endpoint.
+"""
+
+import json
+import logging
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal, Optional
+
+from pydantic import BaseModel, ValidationError, create_model
+
+from .llm_usage import cached_system, llm_usage
+from .metrics import STAGE_SECONDS, pipeline_of
+
+if TYPE_CHECKING:
+    import anthropic
+
+logger = logging.getLogger(__name__)
+
+# Key under which the entry of a single-object tool is returned.
+SINGLE = ""
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a response carries no call to the requested tool."""
+
+
+def derive_model(
+    name: str,
+    base: type[BaseModel],
+    fields: Sequence[str],
+    choices: Optional[Mapping[str, Sequence[str]]] = None,
+) -> type[BaseModel]:
+    """Return a model with *fields* of *base*, restricting some to *choices*.
+
+    Constraints and descriptions are kept; a field listed in *choices*
+    becomes a ``Literal`` of those values, which also puts an ``enum`` in
+    the JSON schema.
+    """
+    choices = choices or {}
+    definitions: dict[str, Any] = {}
+    for field_name in fields:
+        info = base.model_fields[field_name]
+        if field_name in choices:
+            annotation = Literal[tuple(choices[field_name])]
+        else:
+            annotation = info.annotation
+        definitions[field_name] = (annotation, info)
+    return create_model(name, **definitions)
+
+
+def _strip_titles(schema: Any) -> Any:
+    """Drop Pydantic's generated ``title`` keys; they only cost tokens."""
+    if isinstance(schema, dict):
+        return {
+            k: _strip_titles(v)
+            for k, v in schema.items()
+            if not (k == "title" and isinstance(v, str))
+        }
+    if isinstance(schema, list):
+        return [_strip_titles(v) for v in schema]
+    return schema
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A tool whose input is one *entry_model* object, or several keyed ones.
+
+    A *keyed* tool takes an object mapping caller-chosen keys (symbols,
+    message numbers) to entries.  Its schema does not list the keys, so the
+    tool definition -- and the cached prompt prefix after it -- is the same
+    on every call.
+    """
+
+    name: str
+    description: str
+    entry_model: type[BaseModel]
+    keyed: bool = False
+    input_schema: dict[str, Any] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        entry = _strip_titles(self.entry_model.model_json_schema())
+        if self.keyed:
+            schema = {
+                "type": "object",
+                "additionalProperties": {"$ref": "#/$defs/Entry"},
+                "$defs": {"Entry": entry},
+            }
+        else:
+            schema = entry
+        object.__setattr__(self, "input_schema", schema)
+
+    def param(self) -> dict[str, Any]:
+        """The ``tools`` entry for this tool."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "input_schema": self.input_schema,
+        }
+
+    def choice(self) -> dict[str, Any]:
+        """The ``tool_choice`` forcing a call to this tool."""
+        return {"type": "tool", "name": self.name}
+
+
+class _EndpointCounters:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.no_tool_calls = 0
+        self.entries = 0
+        self.invalid_entries = 0
+        self.repair_calls = 0
+        self.repaired_entries = 0
+        self.failed_entries = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "no_tool_calls": self.no_tool_calls,
+            "entries": self.entries,
+            "invalid_entries": self.invalid_entries,
+            "repair_calls": self.repair_calls,
+            "repaired_entries": self.repaired_entries,
+            "failed_entries": self.failed_entries,
+            "parse_failure_rate": (
+                round(self.invalid_entries / self.entries, 4) if self.entries else 0.0
+            ),
+        }
+
+
+class StructuredOutput:
+    """Request, validate and repair tool-use output; count failures per endpoint."""
+
+    def __init__(self) -> None:
+        self._endpoints: dict[str, _EndpointCounters] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def request(
+        self,
+        client: "anthropic.AsyncAnthropic",
+        *,
+        endpoint: str,
+        model: str,
+        max_tokens: int,
+        system: str,
+        prompt: str,
+        tool: ToolSpec,
+        keys: Optional[Sequence[str]] = None,
+    ) -> dict[str, BaseModel]:
+        """Call *tool* through the model and return its validated entries.
+
+        For a keyed tool, *keys* are the entries expected back; otherwise
+        the single entry is returned under :data:`SINGLE`.  Invalid entries
+        are repaired once and omitted if that fails too; missing entries are
+        omitted.  Raises if the call fails or returns no tool call at all.
+        """
+        started = time.perf_counter()
+        response = await client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=cached_system(system),
+            tools=[tool.param()],
+            tool_choice=tool.choice(),
+            messages=[{"role": "user", "content": prompt}],
+        )
+        llm_usage.record(endpoint, response, time.perf_counter() - started)
+        return await self.complete(
+            client,
+            response,
+            endpoint=endpoint,
+            model=model,
+            system=system,
+            tool=tool,
+            keys=keys,
+        )
+
+    async def complete(
+        self,
+        client: "anthropic.AsyncAnthropic",
+        response: Any,
+        *,
+        endpoint: str,
+        model: str,
+        system: str,
+        tool: ToolSpec,
+        keys: Optional[Sequence[str]] = None,
+    ) -> dict[str, BaseModel]:
+        """Validate (and if needed repair) the tool call in *response*.
+
+        Used directly by callers that obtained the response themselves,
+        e.g. by streaming it.
+        """
+        counters = self._endpoints.setdefault(endpoint, _EndpointCounters())
+        counters.calls += 1
+        expected = list(keys) if tool.keyed else [SINGLE]
+        counters.entries += len(expected)
+
+        with STAGE_SECONDS.labels(pipeline_of(endpoint), "parse").time():
+            try:
+                tool_input = self.tool_input(response, tool)
+            except StructuredOutputError:
+                counters.no_tool_calls += 1
+                counters.invalid_entries += len(expected)
+                counters.failed_entries += len(expected)
+                raise
+            valid, invalid, missing = self._validate(tool, tool_input, expected)
+        if missing:
+            counters.invalid_entries += len(missing)
+            counters.failed_entries += len(missing)
+            logger.warning(
+                "%s: %d of %d entries missing from the reply; leaving them to the caller.",
+                endpoint,
+                len(missing),
+                len(expected),
+            )
+        if not invalid:
+            return valid
+
+        counters.invalid_entries += len(invalid)
+        logger.warning(
+            "%s: %d of %d entries failed validation; requesting a repair.",
+            endpoint,
+            len(invalid),
+            len(expected),
+        )
+        repaired = await self._repair(client, endpoint, model, system, tool, invalid)
+        counters.repair_calls += 1
+        counters.repaired_entries += len(repaired)
+        counters.failed_entries += len(invalid) - len(repaired)
+        return {**valid, **repaired}
+
+    @staticmethod
+    def tool_input(response: Any, tool: ToolSpec) -> Any:
+        """Return the input of the call to *tool* in *response*."""
+        for block in getattr(response, "content", None) or []:
+            if getattr(block, "type", None) == "tool_use" and getattr(block, "name", None) == tool.name:
+                return block.input
+        raise StructuredOutputError(f"response has no {tool.name} tool call")
+
+    def reset(self) -> None:
+        self._endpoints.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "endpoints": {
+                name: counters.stats() for name, counters in sorted(self._endpoints.items())
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _validate(
+        tool: ToolSpec, tool_input: Any, expected: Sequence[str]
+    ) -> tuple[dict[str, BaseModel], dict[str, tuple[Any, str]], list[str]]:
+        """Split entries into validated ones, ``(value, errors)`` for invalid
+        ones, and the keys missing altogether."""
+        if not tool.keyed:
+            tool_input = {SINGLE: tool_input}
+        elif not isinstance(tool_input, dict):
+            tool_input = {}
+
+        valid: dict[str, BaseModel] = {}
+        invalid: dict[str, tuple[Any, str]] = {}
+        missing: list[str] = []
+        for key in expected:
+            if key not in tool_input:
+                missing.append(key)
+                continue
+            try:
+                valid[key] = tool.entry_model.model_validate(tool_input[key])
+            except ValidationError as exc:
+                errors = "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc']) or 'value'}: {err['msg']}"
+                    for err in exc.errors()
+                )
+                invalid[key] = (tool_input[key], errors)
+        return valid, invalid, missing
+
+    async def _repair(
+        self,
+        client: "anthropic.AsyncAnthropic",
+        endpoint: str,
+        model: str,
+        system: str,
+        tool: ToolSpec,
+        invalid: dict[str, tuple[Any, str]],
+    ) -> dict[str, BaseModel]:
+        """Ask once for corrected versions of *invalid*; return those that validate."""
+        lines = []
+        for key, (value, errors) in invalid.items():
+            label = f"Entry {json.dumps(key)}" if tool.keyed else "Your call"
+            lines.append(f"{label}: {json.dumps(value)}\n  Errors: {errors}")
+        scope = "with corrected values for these entries only" if tool.keyed else "with corrected values"
+        prompt = (
+            f"Your previous {tool.name} call did not match its schema:\n\n"
+            + "\n\n".join(lines)
+            + f"\n\nCall {tool.name} again {scope}."
+        )
+        try:
+            started = time.perf_counter()
+            response = await client.messages.create(
+                model=model,
+                max_tokens=min(8192, 1024 * len(invalid)),
+                system=cached_system(system),
+                tools=[tool.param()],
+                tool_choice=tool.choice(),
+                messages=[{"role": "user", "content": prompt}],
+            )
+            llm_usage.record(endpoint, response, time.perf_counter() - started)
+            valid, _, _ = self._validate(tool, self.tool_input(response, tool), list(invalid))
+        except Exception:
+            logger.exception("%s: repair call failed.", endpoint)
+            return {}
+        return valid
+
+
+structured_output = StructuredOutput()
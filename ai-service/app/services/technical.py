@@ -1,12 +1,15 @@
 """Technical analysis service using pandas and pandas-ta."""
 
 import logging
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, Union
 
 import numpy as np
 import pandas as pd
 
 from ..models.schemas import CandleData
+from .candles import CandleArrays
+from .indicator_engine import latest_indicators, stack_panel
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +25,43 @@ except ImportError:
     )
 
 
+@dataclass(frozen=True)
+class ScoringRules:
+    """Thresholds and weights of :meth:`TechnicalAnalyzer.get_signal_from_technicals`.
+
+    The defaults are the live rules; :mod:`app.services.backtest` evaluates
+    alternative sets over history.
+    """
+
+    rsi_oversold: float = 30.0
+    rsi_weak_oversold: float = 40.0
+    rsi_overbought: float = 70.0
+    rsi_weak_overbought: float = 60.0
+    rsi_strong_weight: float = 0.3
+    rsi_weak_weight: float = 0.1
+    macd_scale: float = 10.0
+    macd_cap: float = 0.3
+    bb_low: float = 0.2
+    bb_high: float = 0.8
+    bb_weight: float = 0.2
+    sma_weight: float = 0.15
+    ema_weight: float = 0.1
+    high_volume_ratio: float = 1.5
+    high_volume_factor: float = 1.2
+    low_volume_ratio: float = 0.5
+    low_volume_factor: float = 0.8
+    signal_threshold: float = 0.15
+
+
+DEFAULT_SCORING_RULES = ScoringRules()
+
+# Final weighting of the technical score in ``SignalGenerator``; kept here so
+# the backtest can use the live values without importing the signal pipeline.
+TECHNICAL_WEIGHT = 0.45
+# The weighted score must pass +/- this for BUY / SELL.
+DECISION_THRESHOLD = 0.3
+
+
 class TechnicalAnalyzer:
     """Computes technical indicators from candlestick data."""
 
@@ -76,11 +116,13 @@ class TechnicalAnalyzer:
     # Public API
     # ------------------------------------------------------------------
 
-    def analyze(self, candles: list[CandleData]) -> dict:
+    def analyze(self, candles: Union[list[CandleData], CandleArrays]) -> dict:
         """Return a dict of technical indicators computed from *candles*.
 
-        If the list is empty or too short for meaningful analysis the method
-        returns neutral default values.
+        *candles* may be a list of :class:`CandleData` or, to skip per-row
+        objects entirely, a :class:`CandleArrays`.  If the history is empty
+        or too short for meaningful analysis the method returns neutral
+        default values.
         """
         defaults: dict = {
             "rsi": 50.0,
@@ -99,15 +141,12 @@ class TechnicalAnalyzer:
             "volume_ratio": 1.0,
         }
 
-        if not candles or len(candles) < 2:
+        if len(candles) < 2:
             return defaults
 
-        df = pd.DataFrame([c.model_dump() for c in candles])
-        df.sort_values("time", inplace=True)
-        df.reset_index(drop=True, inplace=True)
-
-        close = df["close"]
-        volume = df["volume"]
+        arrays = CandleArrays.coerce(candles)
+        close = pd.Series(arrays.close, copy=False)
+        volume = pd.Series(arrays.volume, copy=False)
         current_price = float(close.iloc[-1])
 
         if HAS_PANDAS_TA:
@@ -121,9 +160,10 @@ class TechnicalAnalyzer:
 
             rsi_val = float(rsi_series.iloc[-1]) if rsi_series is not None and not rsi_series.empty else 50.0
             if macd_df is not None and not macd_df.empty:
-                macd_val = float(macd_df.iloc[-1, 0])
-                macd_signal_val = float(macd_df.iloc[-1, 1])
-                macd_hist_val = float(macd_df.iloc[-1, 2])
+                # Columns are MACD, histogram (MACDh), signal (MACDs).
+                macd_val = float(macd_df["MACD_12_26_9"].iloc[-1])
+                macd_signal_val = float(macd_df["MACDs_12_26_9"].iloc[-1])
+                macd_hist_val = float(macd_df["MACDh_12_26_9"].iloc[-1])
             else:
                 macd_val = macd_signal_val = macd_hist_val = 0.0
             if bb_df is not None and not bb_df.empty:
@@ -179,8 +219,40 @@ class TechnicalAnalyzer:
             "volume_ratio": volume_ratio,
         }
 
+    def analyze_batch(
+        self,
+        close: np.ndarray,
+        volume: np.ndarray,
+        lengths: Optional[np.ndarray] = None,
+    ) -> dict[str, np.ndarray]:
+        """Return the latest indicators for a panel of many symbols at once.
+
+        *close* and *volume* are ``(symbols, bars)`` arrays, right-aligned with
+        left padding; *lengths* gives each symbol's number of valid bars.  The
+        result maps every key of :meth:`analyze` to a ``(symbols,)`` array.
+        Values match the NumPy fallback path of :meth:`analyze`.
+        """
+        return latest_indicators(close, volume, lengths)
+
+    def analyze_many(
+        self, candles_by_symbol: dict[str, Union[list[CandleData], CandleArrays]]
+    ) -> dict[str, dict]:
+        """Vectorised :meth:`analyze` for several symbols' candle histories."""
+        symbols = list(candles_by_symbol)
+        series = []
+        for symbol in symbols:
+            arrays = CandleArrays.coerce(candles_by_symbol[symbol])
+            series.append((arrays.close, arrays.volume))
+        if not series:
+            return {}
+        panel = self.analyze_batch(*stack_panel(series))
+        return {
+            symbol: {key: float(values[i]) for key, values in panel.items()}
+            for i, symbol in enumerate(symbols)
+        }
+
     def get_signal_from_technicals(
-        self, indicators: dict
+        self, indicators: dict, rules: ScoringRules = DEFAULT_SCORING_RULES
     ) -> tuple[str, float]:
         """Score the indicators and return ``(signal_type, confidence)``.
 
@@ -194,22 +266,22 @@ class TechnicalAnalyzer:
         current_price = indicators.get("current_price", 0.0)
 
         # --- RSI ---
-        if rsi < 30:
-            score += 0.3  # oversold -> bullish
-        elif rsi < 40:
-            score += 0.1
-        elif rsi > 70:
-            score -= 0.3  # overbought -> bearish
-        elif rsi > 60:
-            score -= 0.1
+        if rsi < rules.rsi_oversold:
+            score += rules.rsi_strong_weight  # oversold -> bullish
+        elif rsi < rules.rsi_weak_oversold:
+            score += rules.rsi_weak_weight
+        elif rsi > rules.rsi_overbought:
+            score -= rules.rsi_strong_weight  # overbought -> bearish
+        elif rsi > rules.rsi_weak_overbought:
+            score -= rules.rsi_weak_weight
         components += 1
 
         # --- MACD ---
         macd_hist = indicators.get("macd_histogram", 0.0)
         if macd_hist > 0:
-            score += min(0.3, macd_hist * 10)  # bullish momentum
+            score += min(rules.macd_cap, macd_hist * rules.macd_scale)  # bullish momentum
         else:
-            score += max(-0.3, macd_hist * 10)  # bearish momentum
+            score += max(-rules.macd_cap, macd_hist * rules.macd_scale)  # bearish momentum
         components += 1
 
         # --- Bollinger Bands position ---
@@ -219,10 +291,10 @@ class TechnicalAnalyzer:
             bb_range = bb_upper - bb_lower
             if bb_range > 0:
                 bb_position = (current_price - bb_lower) / bb_range
-                if bb_position < 0.2:
-                    score += 0.2  # near lower band -> bullish
-                elif bb_position > 0.8:
-                    score -= 0.2  # near upper band -> bearish
+                if bb_position < rules.bb_low:
+                    score += rules.bb_weight  # near lower band -> bullish
+                elif bb_position > rules.bb_high:
+                    score -= rules.bb_weight  # near upper band -> bearish
         components += 1
 
         # --- SMA crossover (20 vs 50) ---
@@ -230,9 +302,9 @@ class TechnicalAnalyzer:
         sma_50 = indicators.get("sma_50", 0.0)
         if sma_20 > 0 and sma_50 > 0:
             if sma_20 > sma_50:
-                score += 0.15  # golden crossover signal
+                score += rules.sma_weight  # golden crossover signal
             else:
-                score -= 0.15  # death crossover signal
+                score -= rules.sma_weight  # death crossover signal
         components += 1
 
         # --- EMA crossover (12 vs 26) ---
@@ -240,27 +312,27 @@ class TechnicalAnalyzer:
         ema_26 = indicators.get("ema_26", 0.0)
         if ema_12 > 0 and ema_26 > 0:
             if ema_12 > ema_26:
-                score += 0.1
+                score += rules.ema_weight
             else:
-                score -= 0.1
+                score -= rules.ema_weight
         components += 1
 
         # --- Volume ---
         volume_ratio = indicators.get("volume_ratio", 1.0)
-        if volume_ratio > 1.5:
+        if volume_ratio > rules.high_volume_ratio:
             # High volume amplifies the current direction
-            score *= 1.2
-        elif volume_ratio < 0.5:
+            score *= rules.high_volume_factor
+        elif volume_ratio < rules.low_volume_ratio:
             # Low volume dampens confidence
-            score *= 0.8
+            score *= rules.low_volume_factor
         components += 1
 
         # Normalise to [-1, 1]
         score = max(-1.0, min(1.0, score))
 
-        if score > 0.15:
+        if score > rules.signal_threshold:
             signal_type = "BUY"
-        elif score < -0.15:
+        elif score < -rules.signal_threshold:
             signal_type = "SELL"
         else:
             signal_type = "HOLD"
@@ -0,0 +1,6 @@
+"""Benchmarks for the Kohlcorp Shield AI Service.
+
+Run from the ``ai-service`` directory, e.g.::
+
+    python -m benchmarks.bench_near_duplicate
+"""
@@ -0,0 +1,94 @@
+"""Benchmark of the vectorised backtest engine.
+
+Runs the parity checks of :mod:`benchmarks.check_backtest_parity` first (on
+their own: ``python -m benchmarks.check_backtest_parity``), then times
+``run_backtest`` over a random-walk panel for a small grid of weight sets
+and prints their metrics, with the scalar per-bar loop extrapolated from a
+sample for comparison.
+
+Usage::
+
+    python -m benchmarks.bench_backtest [--symbols 1000] [--bars 2520]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.backtest import WeightSet, indicator_series, run_backtest
+from app.services.technical import ScoringRules, TechnicalAnalyzer
+from benchmarks import check_backtest_parity
+from benchmarks.check_backtest_parity import random_panel, to_candles
+
+
+def _weight_grid() -> list[WeightSet]:
+    sets = [WeightSet("live")]
+    for weight in (0.45, 0.6, 0.8):
+        for threshold in (0.15, 0.3):
+            sets.append(
+                WeightSet(
+                    f"w={weight} t={threshold}",
+                    technical_weight=weight,
+                    decision_threshold=threshold,
+                )
+            )
+    sets.append(
+        WeightSet(
+            "w=0.8 t=0.15 rsi 25/75",
+            rules=ScoringRules(rsi_oversold=25, rsi_overbought=75),
+            technical_weight=0.8,
+            decision_threshold=0.15,
+        )
+    )
+    return sets
+
+
+def run(n_symbols: int, n_bars: int, loop_sample: int, seed: int) -> None:
+    assert check_backtest_parity.run(samples=200, warm_up=100, seed=seed), (
+        "vectorised backtest diverges from the scalar code"
+    )
+    rng = np.random.default_rng(seed)
+    analyzer = TechnicalAnalyzer()
+
+    close, volume = random_panel(rng, n_symbols, n_bars)
+    weight_sets = _weight_grid()
+
+    # Scalar baseline: analyze() + score per bar, timed on a sample of bars.
+    started = time.perf_counter()
+    for t in np.linspace(60, n_bars - 1, loop_sample).astype(int):
+        candles = to_candles(close[0, : t + 1], volume[0, : t + 1])
+        analyzer.get_signal_from_technicals(analyzer.analyze(candles))
+    scalar = (time.perf_counter() - started) / loop_sample * n_symbols * n_bars
+
+    started = time.perf_counter()
+    indicator_series(close, volume)
+    indicators = time.perf_counter() - started
+    started = time.perf_counter()
+    results = run_backtest(close, volume, weight_sets)
+    total = time.perf_counter() - started
+
+    print(f"\n{n_symbols} symbols x {n_bars} bars, {len(weight_sets)} weight sets")
+    print(f"  scalar loop (extrapolated): {scalar:,.0f} s")
+    print(f"  indicator series:           {indicators:.2f} s")
+    print(f"  run_backtest (all sets):    {total:.2f} s")
+    print(f"\n{'weight set':>24} {'signals':>9} {'hit rate':>9} {'avg ret':>9} "
+          f"{'total ret':>10} {'max DD':>8} {'exposure':>9}")
+    for result in results:
+        print(f"{result.name:>24} {result.signals:>9} {result.hit_rate:>9.4f} "
+              f"{result.avg_signal_return:>9.5f} {result.total_return:>10.4f} "
+              f"{result.max_drawdown:>8.4f} {result.exposure:>9.4f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=1_000)
+    parser.add_argument("--bars", type=int, default=2_520, help="bars per symbol (2520 = ~10 years daily)")
+    parser.add_argument("--loop-sample", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.symbols, args.bars, args.loop_sample, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark row-wise vs columnar candle ingestion for ``POST /analyze``.
+
+For each history length the same random-walk candles are encoded three ways
+-- the ``candles`` list of objects, ``columns`` as JSON arrays, and
+``columns`` as base64 little-endian buffers -- and each body is taken from
+raw JSON through request validation to ``TechnicalAnalyzer.analyze``.  The
+``rows/dataframe`` path replays the previous ingestion (``model_dump`` of
+every candle into a DataFrame) as a baseline.  Reports the best wall time and
+the tracemalloc peak per path, after checking that all paths produce the same
+indicators.
+
+Usage::
+
+    python -m benchmarks.bench_candle_ingestion [--sizes 1000 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import base64
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import AnalyzeRequest
+from app.services.candles import CandleArrays
+from app.services.technical import TechnicalAnalyzer
+
+
+def _bodies(rng: np.random.Generator, n: int) -> dict[str, bytes]:
+    t = 1_600_000_000 + 60 * np.arange(n, dtype=np.int64)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    columns = {
+        "time": t,
+        "open": close * (1 + rng.normal(0, 0.0005, n)),
+        "high": close * 1.001,
+        "low": close * 0.999,
+        "close": close,
+        "volume": rng.uniform(1e3, 1e5, n),
+    }
+    as_lists = {k: v.tolist() for k, v in columns.items()}
+    rows = [dict(zip(as_lists, values)) for values in zip(*as_lists.values())]
+    binary = {
+        k: base64.b64encode(v.astype("<i8" if k == "time" else "<f8").tobytes()).decode()
+        for k, v in columns.items()
+    }
+    return {
+        "rows": json.dumps({"symbol": "BENCH", "candles": rows}).encode(),
+        "columns/json": json.dumps({"symbol": "BENCH", "columns": as_lists}).encode(),
+        "columns/f64le": json.dumps(
+            {"symbol": "BENCH", "columns": {"encoding": "f64le", **binary}}
+        ).encode(),
+    }
+
+
+def _ingest(analyzer: TechnicalAnalyzer, body: bytes) -> dict:
+    request = AnalyzeRequest.model_validate_json(body)
+    if request.columns is not None:
+        return analyzer.analyze(CandleArrays.from_columns(request.columns))
+    return analyzer.analyze(request.candles)
+
+
+def _ingest_dataframe(analyzer: TechnicalAnalyzer, body: bytes) -> dict:
+    request = AnalyzeRequest.model_validate_json(body)
+    df = pd.DataFrame([c.model_dump() for c in request.candles])
+    df.sort_values("time", inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    arrays = CandleArrays(*(df[field].to_numpy() for field in df.columns))
+    return analyzer.analyze(arrays)
+
+
+def _measure(fn: Callable[[], dict], repeat: int) -> tuple[float, float]:
+    """Return ``(best seconds, peak traced bytes)``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes: list[int], repeat: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    analyzer = TechnicalAnalyzer()
+
+    print(f"{'candles':>8} {'path':>15} {'body':>10} {'time':>10} {'peak mem':>10}")
+    for n in sizes:
+        bodies = _bodies(rng, n)
+        paths = [("rows/dataframe", _ingest_dataframe, bodies["rows"])]
+        paths += [(path, _ingest, body) for path, body in bodies.items()]
+        reference = _ingest_dataframe(analyzer, bodies["rows"])
+        for path, ingest, body in paths:
+            result = ingest(analyzer, body)
+            assert all(
+                abs(result[k] - reference[k]) <= 1e-9 * max(1.0, abs(reference[k]))
+                for k in reference
+            ), f"{path} diverges from row-wise ingestion"
+
+            seconds, peak = _measure(lambda: ingest(analyzer, body), repeat)
+            print(
+                f"{n:>8} {path:>15} {len(body) / 1e6:>8.2f}MB "
+                f"{seconds * 1e3:>8.1f}ms {peak / 1e6:>8.1f}MB"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.seed)
+
+
+if __name__ == "__main__":
+    main()
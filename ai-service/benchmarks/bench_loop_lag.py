@@ -0,0 +1,104 @@
+"""Benchmark event-loop lag under ``/signals/generate``-style fan-out.
+
+Runs ``SignalGenerator.generate_signal`` for N symbols concurrently, the way
+``routers/signals.py`` does, against a candle store whose fetcher blocks for
+a fixed time (standing in for yfinance).  It compares running the fetch and
+the indicator math inline on the event loop with running them on the
+executor pools, and reports wall time and the loop lag seen by
+:class:`LoopLagMonitor`.  The LLM layer is unconfigured, so it returns its
+default analysis immediately.
+
+Usage::
+
+    python -m benchmarks.bench_loop_lag [--symbols 20] [--bars 2000] [--fetch-ms 200]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+from app.services import executors as executors_module
+from app.services.candle_store import CandleStore
+from app.services.candles import CandleArrays
+from app.services.executors import ExecutorPool, LoopLagMonitor
+from app.services.signal_generator import SignalGenerator
+
+
+class _SlowFetcher:
+    """Blocking fetcher returning a random walk after a fixed delay."""
+
+    def __init__(self, bars: int, delay: float) -> None:
+        self.bars = bars
+        self.delay = delay
+
+    def fetch(self, symbol: str, since: Optional[int]) -> CandleArrays:
+        time.sleep(self.delay)
+        rng = np.random.default_rng(abs(hash(symbol)) % 2**32)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, self.bars)))
+        t = 1_600_000_000 + 86_400 * np.arange(self.bars, dtype=np.int64)
+        return CandleArrays(t, close, close, close, close, rng.uniform(1e5, 1e6, self.bars))
+
+
+async def _inline(fn: Any, *args: Any) -> Any:
+    return fn(*args)
+
+
+async def _scenario(mode: str, symbols: list[str], bars: int, delay: float, workers: int) -> dict:
+    registry = executors_module.executors
+    if mode == "inline":
+        registry.indicators = ExecutorPool("indicators", "inline", 1, 0, 60.0)
+        run_blocking = _inline
+    else:
+        registry.indicators = ExecutorPool("indicators", "process", workers, 256, 60.0)
+        registry.io = ExecutorPool("io", "thread", len(symbols), 256, 60.0)
+        run_blocking = registry.io.run
+        await registry.startup(prewarm=True)
+        await registry.loop_lag.stop()
+
+    generator = SignalGenerator()
+    with tempfile.TemporaryDirectory() as root:
+        generator.candle_store = CandleStore(
+            root, _SlowFetcher(bars, delay), refresh_interval=0, window=bars, run_blocking=run_blocking
+        )
+        monitor = LoopLagMonitor(interval=0.005, samples=100_000)
+        await monitor.start()
+        await asyncio.sleep(0)  # let the monitor schedule its first sleep
+        start = time.perf_counter()
+        await asyncio.gather(*[generator.generate_signal(symbol=s, candles=[]) for s in symbols])
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(2 * monitor.interval)  # record the final wake-up
+        await monitor.stop()
+
+    registry.io.shutdown()
+    registry.indicators.shutdown()
+    return {"elapsed": elapsed, **monitor.stats()}
+
+
+def run(n_symbols: int, bars: int, fetch_ms: float, workers: int) -> None:
+    symbols = [f"SYM{i:03d}" for i in range(n_symbols)]
+    print(f"{n_symbols} symbols, {bars} bars, {fetch_ms:.0f} ms blocking fetch, {workers} indicator workers")
+    print(f"{'mode':>10} {'wall':>9} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}")
+    for mode in ("inline", "executors"):
+        r = asyncio.run(_scenario(mode, symbols, bars, fetch_ms / 1000, workers))
+        print(
+            f"{mode:>10} {r['elapsed'] * 1000:>7.0f}ms {r['p50_ms']:>7.1f}ms "
+            f"{r['p99_ms']:>7.1f}ms {r['max_ms']:>7.1f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--bars", type=int, default=2_000)
+    parser.add_argument("--fetch-ms", type=float, default=200.0)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    run(args.symbols, args.bars, args.fetch_ms, args.workers)
+
+
+if __name__ == "__main__":
+    main()
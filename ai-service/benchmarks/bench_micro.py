@@ -0,0 +1,138 @@
+"""Microbenchmarks of the CPU-bound request paths.
+
+* ``TechnicalAnalyzer.analyze`` per history length, on the pandas-ta path
+  (when installed) and the NumPy fallback path;
+* ``_fallback_analysis`` (the rule-based scam verdict) per message size.
+
+Each case reports the best per-call time over several repeats.  Like
+:mod:`benchmarks.load`, results can be written as JSON and compared with an
+earlier run.
+
+Usage::
+
+    python -m benchmarks.bench_micro [--bars 63 252 1000] [--sizes 200 2000 20000]
+        [--output var/bench/micro.json] [--baseline var/bench/previous-micro.json]
+"""
+
+import argparse
+import json
+import platform
+import random
+import time
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.routers.scam import ScamAnalyzeRequest, _fallback_analysis
+from app.services import technical
+from app.services.candles import CandleArrays
+from app.services.technical import TechnicalAnalyzer
+
+from .bench_fallback_rules import FILLER
+
+
+def _best_us(fn: Callable[[], Any], repeats: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeats, number=number)) / number * 1e6
+
+
+def _candles(rng: np.random.Generator, bars: int) -> CandleArrays:
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    return CandleArrays(
+        1_700_000_000 + 86_400 * np.arange(bars, dtype=np.int64),
+        close,
+        close * 1.01,
+        close * 0.99,
+        close,
+        rng.uniform(1e5, 1e7, bars),
+    )
+
+
+def _message(rng: random.Random, size: int) -> str:
+    # Mostly filler with a few scam phrases, like a real phishing e-mail.
+    phrases = ["verify your account", "urgent action required", "gift card", "wire transfer"]
+    words: list[str] = []
+    while sum(len(w) + 1 for w in words) < size:
+        words.append(rng.choice(phrases) if rng.random() < 0.02 else rng.choice(FILLER))
+    return " ".join(words)[:size]
+
+
+def run(bars_list: list[int], sizes: list[int], repeats: int, seed: int) -> list[dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    analyzer = TechnicalAnalyzer()
+    results = []
+
+    paths = [False, True] if technical.HAS_PANDAS_TA else [False]
+    use_pandas_ta = technical.HAS_PANDAS_TA
+    try:
+        for bars in bars_list:
+            candles = _candles(rng, bars)
+            for pandas_ta in paths:
+                technical.HAS_PANDAS_TA = pandas_ta
+                analyzer.analyze(candles)  # warm-up
+                results.append(
+                    {
+                        "case": "TechnicalAnalyzer.analyze",
+                        "variant": f"{'pandas-ta' if pandas_ta else 'numpy'} bars={bars}",
+                        "us_per_call": round(_best_us(lambda: analyzer.analyze(candles), repeats), 1),
+                    }
+                )
+    finally:
+        technical.HAS_PANDAS_TA = use_pandas_ta
+
+    text_rng = random.Random(seed)
+    for size in sizes:
+        request = ScamAnalyzeRequest(type="email", content=_message(text_rng, size))
+        results.append(
+            {
+                "case": "_fallback_analysis",
+                "variant": f"chars={size}",
+                "us_per_call": round(_best_us(lambda: _fallback_analysis(request), repeats), 1),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, nargs="+", default=[63, 252, 1_000])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 2_000, 20_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    results = run(args.bars, args.sizes, args.repeats, args.seed)
+    baseline = {}
+    if args.baseline:
+        baseline = {
+            (r["case"], r["variant"]): r["us_per_call"]
+            for r in json.loads(Path(args.baseline).read_text())["results"]
+        }
+
+    print(f"{'case':>26} {'variant':>22} {'us/call':>10} {'change':>8}")
+    for result in results:
+        before = baseline.get((result["case"], result["variant"]))
+        change = f"{(result['us_per_call'] - before) / before * 100:+.1f}%" if before else ""
+        print(f"{result['case']:>26} {result['variant']:>22} {result['us_per_call']:>10.1f} {change:>8}")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+            "results": results,
+        }
+        output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+        print(f"\nresults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
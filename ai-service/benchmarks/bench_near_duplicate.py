@@ -0,0 +1,99 @@
+"""Benchmark near-duplicate lookup cost against index size.
+
+Fills a :class:`NearDuplicateIndex` with synthetic scam-campaign variants and
+unrelated messages, then times ``query`` for fresh variants (expected hits)
+and unrelated texts (expected misses) at several corpus sizes.
+
+Usage::
+
+    python -m benchmarks.bench_near_duplicate [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import random
+import string
+import time
+
+from app.config import settings
+from app.services.near_duplicate import NearDuplicateIndex
+
+TEMPLATES = [
+    "Hi {name}, your package could not be delivered due to an unpaid fee of ${amount}. "
+    "Pay now at {link} to avoid return to sender.",
+    "URGENT: {name}, your bank account has been suspended. Verify your identity at {link} "
+    "within 24 hours or lose access. Ref #{ref}",
+    "Congratulations {name}! You have won a ${amount} gift card. Claim your prize at {link} "
+    "before it expires.",
+    "This is the IRS. {name}, you owe ${amount} in back taxes. Call {phone} immediately "
+    "to avoid arrest.",
+    "{name}, Microsoft support detected a virus on your computer. Call {phone} now so a "
+    "technician can fix it remotely.",
+]
+NAMES = ["John", "Maria", "Wei", "Fatima", "Olga", "Carlos", "Priya", "Tom", "Aisha", "Ken"]
+
+
+def _random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+
+def _variant(rng: random.Random, template: str) -> str:
+    return template.format(
+        name=rng.choice(NAMES) + rng.choice(["", " " + rng.choice(NAMES)]),
+        amount=f"{rng.uniform(1, 5000):.2f}",
+        link=f"http://{_random_word(rng)}-{_random_word(rng)}.com/{_random_word(rng)}",
+        ref=rng.randint(10_000, 99_999),
+        phone=f"+1-{rng.randint(200, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+    )
+
+
+def _unrelated(rng: random.Random) -> str:
+    return " ".join(_random_word(rng) for _ in range(rng.randint(12, 40)))
+
+
+def run(sizes: list[int], queries: int, seed: int, threshold: float) -> None:
+    print(f"{'corpus':>8} {'build s':>9} {'hit us':>9} {'miss us':>9} {'recall':>7} {'false+':>7} {'cand':>6}")
+    for size in sizes:
+        rng = random.Random(seed)
+        index: NearDuplicateIndex[int] = NearDuplicateIndex(maxsize=size, threshold=threshold)
+
+        # One seeded variant per template; everything else is unrelated noise.
+        started = time.perf_counter()
+        for i, template in enumerate(TEMPLATES):
+            index.add(_variant(rng, template), i)
+        for i in range(size - len(TEMPLATES)):
+            index.add(_unrelated(rng), -1)
+        build = time.perf_counter() - started
+
+        hits = [(_variant(rng, t), i) for i, t in enumerate(TEMPLATES) for _ in range(queries // len(TEMPLATES))]
+        misses = [_unrelated(rng) for _ in range(queries)]
+
+        index.lookups = index.candidates_checked = 0
+        started = time.perf_counter()
+        found = sum(1 for text, expected in hits if (m := index.query(text)) and m[0] == expected)
+        hit_us = (time.perf_counter() - started) / len(hits) * 1e6
+
+        started = time.perf_counter()
+        false_positives = sum(1 for text in misses if index.query(text) is not None)
+        miss_us = (time.perf_counter() - started) / len(misses) * 1e6
+
+        print(
+            f"{size:>8} {build:>9.2f} {hit_us:>9.1f} {miss_us:>9.1f} "
+            f"{found / len(hits):>7.2%} {false_positives / len(misses):>7.2%} "
+            f"{index.stats()['avg_candidates']:>6}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000, 50_000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--threshold", type=float, default=settings.scam_near_duplicate_threshold
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.seed, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
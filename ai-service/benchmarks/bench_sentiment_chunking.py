@@ -0,0 +1,138 @@
+"""Benchmark sentiment latency against article count, one prompt vs chunked.
+
+``SentimentAnalyzer.analyze_articles`` runs against a simulated Anthropic
+client whose latency grows with the tokens it reads and writes, and which
+truncates its tool call at ``max_tokens`` the way a real completion does
+(entries past the cut are missing, so the structured-output layer has to
+repair them).  The ``one prompt`` mode replays the previous behaviour -- all
+articles in one call with ``max_tokens=1024`` -- and ``chunked`` uses the
+configured token budget and concurrency.  The sentiment cache is disabled.
+
+Latencies are reported in simulated milliseconds; ``--time-scale`` shrinks
+the real sleeps so the run stays short.
+
+Usage::
+
+    python -m benchmarks.bench_sentiment_chunking [--counts 10 50 100 200 500] [--time-scale 0.05]
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from app.config import settings
+from app.models.schemas import ArticleInput
+from app.services import anthropic_pool
+from app.services import sentiment as sentiment_module
+from app.services.sentiment import SentimentAnalyzer
+from app.services.sentiment_cache import SentimentCache
+from app.services.structured_output import structured_output
+
+_TOKENS_PER_ENTRY = 24
+_ARTICLE_LINE = re.compile(r"^\d+\. Headline", re.M)
+_REPAIR_ENTRY = re.compile(r'^Entry "(\d+)"', re.M)
+
+
+class _SimulatedMessages:
+    """``messages.create`` with token-proportional latency and truncation."""
+
+    def __init__(self, base_ms: float, ms_per_output_token: float, scale: float) -> None:
+        self.base_ms = base_ms
+        self.ms_per_output_token = ms_per_output_token
+        self.scale = scale
+        self.calls = 0
+
+    async def create(self, **kwargs: Any) -> Any:
+        self.calls += 1
+        prompt = kwargs["messages"][0]["content"]
+        keys = _REPAIR_ENTRY.findall(prompt) or [
+            str(i + 1) for i in range(len(_ARTICLE_LINE.findall(prompt)))
+        ]
+        emitted = keys[: kwargs["max_tokens"] // _TOKENS_PER_ENTRY]
+        output_tokens = len(emitted) * _TOKENS_PER_ENTRY
+        await asyncio.sleep(
+            (self.base_ms + self.ms_per_output_token * output_tokens) * self.scale / 1000
+        )
+        tool_input = {key: {"sentiment": "bullish", "score": 0.4} for key in emitted}
+        return SimpleNamespace(
+            content=[
+                SimpleNamespace(
+                    type="tool_use", name=kwargs["tools"][0]["name"], input=tool_input, id="bench"
+                )
+            ],
+            usage=SimpleNamespace(input_tokens=len(prompt) // 4, output_tokens=output_tokens),
+        )
+
+
+def _articles(n: int) -> list[ArticleInput]:
+    return [
+        ArticleInput(
+            headline=f"Company {i} reports quarterly results ahead of analyst expectations",
+            summary=(
+                f"Shares of company {i} moved after it reported revenue growth, "
+                "raised full-year guidance and announced a buyback programme."
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+async def _run(mode: str, n: int, messages: _SimulatedMessages) -> tuple[float, int, int]:
+    analyzer = SentimentAnalyzer(SentimentCache(maxsize=1, ttl=1, enabled=False))
+    articles = _articles(n)
+    messages.calls = 0
+    structured_output.reset()
+    start = time.perf_counter()
+    results = await analyzer.analyze_articles(articles)
+    elapsed = time.perf_counter() - start
+    neutral = sum(1 for r in results if r.sentiment == "neutral")
+    return elapsed / messages.scale * 1000, messages.calls, neutral
+
+
+def run(counts: list[int], base_ms: float, ms_per_token: float, scale: float) -> None:
+    messages = _SimulatedMessages(base_ms, ms_per_token, scale)
+    anthropic_pool.client_registry._client = SimpleNamespace(messages=messages)
+    output_budget = (
+        sentiment_module._OUTPUT_TOKENS_OVERHEAD,
+        sentiment_module._OUTPUT_TOKENS_PER_ARTICLE,
+    )
+    one_prompt = {"sentiment_chunk_token_budget": 10**9, "sentiment_chunk_max_articles": 10**9}
+    chunked = {
+        "sentiment_chunk_token_budget": settings.sentiment_chunk_token_budget,
+        "sentiment_chunk_max_articles": settings.sentiment_chunk_max_articles,
+    }
+
+    print(
+        f"chunk budget {chunked['sentiment_chunk_token_budget']} tokens / "
+        f"{chunked['sentiment_chunk_max_articles']} articles, "
+        f"concurrency {settings.sentiment_concurrency}; "
+        f"simulated latency {base_ms:.0f} ms + {ms_per_token} ms/output token"
+    )
+    print(f"{'articles':>8} {'mode':>10} {'latency':>10} {'calls':>6} {'neutral':>8}")
+    for n in counts:
+        for mode, overrides in (("one prompt", one_prompt), ("chunked", chunked)):
+            for key, value in overrides.items():
+                setattr(settings, key, value)
+            # The previous single call used a fixed max_tokens=1024.
+            overhead, per_article = (1024, 0) if mode == "one prompt" else output_budget
+            sentiment_module._OUTPUT_TOKENS_OVERHEAD = overhead
+            sentiment_module._OUTPUT_TOKENS_PER_ARTICLE = per_article
+            latency, calls, neutral = asyncio.run(_run(mode, n, messages))
+            print(f"{n:>8} {mode:>10} {latency:>8.0f}ms {calls:>6} {neutral:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 100, 200, 500])
+    parser.add_argument("--base-ms", type=float, default=400.0)
+    parser.add_argument("--ms-per-token", type=float, default=5.0)
+    parser.add_argument("--time-scale", type=float, default=0.05)
+    args = parser.parse_args()
+    run(args.counts, args.base_ms, args.ms_per_token, args.time_scale)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Single-tier (per-process) caches versus the in-process + shared SQLite tiers.
+
+Three parts:
+
+* **encoding** -- stored size of typical cached values (a scam verdict, a
+  signal, an LLM analysis, an article sentiment) as pickle, as compact JSON
+  and as the shared tier stores them (JSON, zlib when smaller);
+* **latency** -- microseconds per in-process hit, per shared-tier hit (a
+  fresh in-process tier each time) and per store;
+* **workers** -- N worker processes serve the same skewed stream of keys,
+  each miss costing ``--compute-ms`` (standing in for an LLM call).  With
+  per-process caches every worker computes every key it sees; with the
+  shared tier a key computed by one worker is a hit for the others.
+
+Usage::
+
+    python -m benchmarks.bench_shared_cache [--workers 4] [--keys 2000] [--requests 4000]
+        [--compute-ms 20] [--concurrency 16] [--zipf 1.1]
+"""
+
+import argparse
+import asyncio
+import pickle
+import random
+import statistics
+import tempfile
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from app.models.schemas import SignalResponse
+from app.routers.scam import ScamAnalyzeResponse
+from app.services.response_cache import AsyncResponseCache
+from app.services.sentiment_cache import SENTIMENT_CODEC
+from app.services.shared_cache import (
+    Codec,
+    SharedTier,
+    SQLiteBackend,
+    json_codec,
+    model_codec,
+    pack,
+)
+
+
+def _samples() -> list[tuple[str, Any, Codec]]:
+    verdict = ScamAnalyzeResponse(
+        riskScore=82,
+        riskLevel="critical",
+        category="phishing",
+        redFlags=[
+            "Urgent request to verify account details",
+            "Link to a look-alike domain",
+            "Threat of account suspension",
+        ],
+        analysis=(
+            "The message impersonates a bank and pressures the recipient into "
+            "verifying their account through a link to a look-alike domain. "
+        ) * 3,
+        recommendedAction="block",
+        tier="llm",
+    )
+    signal = SignalResponse(
+        symbol="AAPL",
+        signal_type="BUY",
+        confidence=0.72,
+        reasoning="Momentum and volume confirm the breakout above the 50-day average. " * 3,
+        technical_summary="RSI 61, MACD above signal, price in the upper Bollinger half.",
+        sentiment_summary="Mostly positive coverage of the product launch.",
+        risk_level="MEDIUM",
+        price_target=212.5,
+        stop_loss=188.0,
+    )
+    analysis = {
+        "signal": "BUY",
+        "confidence": 0.72,
+        "reasoning": "Momentum and volume confirm the breakout above the 50-day average. " * 3,
+        "risk_level": "medium",
+        "price_target": 212.5,
+        "stop_loss": 188.0,
+        "technical_summary": "RSI 61, MACD above signal, price in the upper Bollinger half.",
+        "sentiment_summary": "Mostly positive coverage of the product launch.",
+    }
+    return [
+        ("scam verdict", verdict, model_codec(ScamAnalyzeResponse)),
+        ("signal", signal, model_codec(SignalResponse)),
+        ("llm analysis", analysis, json_codec()),
+        ("sentiment", ("positive", 0.64), SENTIMENT_CODEC),
+    ]
+
+
+def run_encoding() -> None:
+    print(f"{'value':>14} {'pickle':>8} {'json':>8} {'stored':>8}")
+    for name, value, codec in _samples():
+        encoded = codec.encode(value)
+        print(
+            f"{name:>14} {len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)):>8} "
+            f"{len(encoded):>8} {len(pack(encoded)):>8}"
+        )
+
+
+def run_latency(directory: Path) -> None:
+    verdict_codec = model_codec(ScamAnalyzeResponse)
+    _, verdict, _ = _samples()[0]
+    backend = SQLiteBackend(str(directory / "latency.sqlite3"), 100_000)
+    tier = SharedTier(backend, "scam", verdict_codec)
+    local = AsyncResponseCache("local", 10_000, 3600)
+    tiered = AsyncResponseCache("tiered", 10_000, 3600, shared=tier)
+    for i in range(1_000):
+        local.set(f"key-{i}", verdict)
+        tiered.set(f"key-{i}", verdict)
+
+    def shared_hit() -> None:
+        cold = AsyncResponseCache("cold", 10, 3600, shared=tier)
+        cold.get("key-7")
+
+    counter = iter(range(10**9))
+
+    def timed(fn: Any) -> float:
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+    cases = [
+        ("in-process hit", lambda: tiered.get("key-7")),
+        ("shared-tier hit", shared_hit),
+        ("store, per-process only", lambda: local.set(f"n-{next(counter)}", verdict)),
+        ("store, both tiers", lambda: tiered.set(f"n-{next(counter)}", verdict)),
+    ]
+    print(f"{'operation':>28} {'us/op':>8}")
+    for name, fn in cases:
+        print(f"{name:>28} {timed(fn):>8.1f}")
+    backend.close()
+
+
+def _worker(
+    path: Optional[str], seed: int, keys: int, requests: int, zipf: float,
+    compute_ms: float, concurrency: int, start_at: float,
+) -> dict[str, Any]:
+    shared = SharedTier(SQLiteBackend(path, 1_000_000), "bench", json_codec()) if path else None
+    cache: AsyncResponseCache[dict] = AsyncResponseCache("bench", keys, 3600, shared=shared)
+    rng = random.Random(seed)
+    weights = [1 / rank**zipf for rank in range(1, keys + 1)]
+    stream = rng.choices(range(keys), weights=weights, k=requests)
+    computes = 0
+
+    async def compute(key: int) -> dict:
+        nonlocal computes
+        computes += 1
+        await asyncio.sleep(compute_ms / 1000)
+        return {"key": key, "verdict": "x" * 200}
+
+    async def main() -> float:
+        queue = iter(stream)
+        slots = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+
+        async def one(key: int) -> None:
+            async with slots:
+                await cache.get_or_compute(f"k{key}", lambda: compute(key))
+
+        await asyncio.gather(*[one(key) for key in queue])
+        return time.perf_counter() - started
+
+    time.sleep(max(0.0, start_at - time.time()))
+    elapsed = asyncio.run(main())
+    return {"computes": computes, "elapsed": elapsed, **cache.stats()}
+
+
+def run_workers(args: argparse.Namespace, directory: Path) -> None:
+    print(
+        f"{'tiers':>12} {'computes':>9} {'hit rate':>9} {'shared hits':>12} "
+        f"{'wall s':>7} {'entries/worker':>15}"
+    )
+    for label, path in (
+        ("per-process", None),
+        ("+ shared", str(directory / "workers.sqlite3")),
+    ):
+        with ProcessPoolExecutor(args.workers) as pool:
+            start_at = time.time() + 1.0
+            futures = [
+                pool.submit(
+                    _worker, path, args.seed + i, args.keys, args.requests, args.zipf,
+                    args.compute_ms, args.concurrency, start_at,
+                )
+                for i in range(args.workers)
+            ]
+            results = [future.result() for future in futures]
+        computes = sum(r["computes"] for r in results)
+        lookups = args.workers * args.requests
+        print(
+            f"{label:>12} {computes:>9} {1 - computes / lookups:>9.3f} "
+            f"{sum(r['persistent_hits'] for r in results):>12} "
+            f"{max(r['elapsed'] for r in results):>7.2f} "
+            f"{statistics.mean(r['size'] for r in results):>15.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=2_000, help="distinct keys")
+    parser.add_argument("--requests", type=int, default=4_000, help="per worker")
+    parser.add_argument("--zipf", type=float, default=1.1, help="key popularity skew")
+    parser.add_argument("--compute-ms", type=float, default=20.0, help="cost of a miss")
+    parser.add_argument("--concurrency", type=int, default=16, help="per worker")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        print("== encoding (bytes)")
+        run_encoding()
+        print("\n== latency")
+        run_latency(directory)
+        print(f"\n== {args.workers} workers, {args.requests} requests each over {args.keys} keys")
+        run_workers(args, directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cold-start import cost of ``app.main`` per deployment role.
+
+Each run imports ``app.main`` in a fresh interpreter with ``SERVICE_ROLE``
+set and ``python -X importtime`` enabled, then reports the wall time, the
+number of modules loaded and the most expensive imports: top-level packages
+and the app's own modules, each including whatever it imported first.  Heavy
+third-party packages (pandas, pandas-ta, numba, anthropic) are listed when
+present, so a role that should not need them is easy to spot.
+
+Usage::
+
+    python -m benchmarks.bench_startup [--roles scam signals all] [--repeats 3] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+HEAVY = ("numpy", "pandas", "pandas_ta", "numba", "anthropic")
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$")
+
+_PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import app.main\n"
+    "print('wall', time.perf_counter() - started, len(sys.modules))\n"
+    "print('heavy', *[name for name in {heavy!r} if name in sys.modules])\n"
+)
+
+
+def _run(role: str) -> tuple[float, int, list[str], dict[str, int]]:
+    """Import ``app.main`` once; return wall time, module count, heavy
+    packages and cumulative import microseconds per module."""
+    env = {**os.environ, "SERVICE_ROLE": role}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(heavy=HEAVY)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall, modules, heavy = 0.0, 0, []
+    for line in proc.stdout.splitlines():
+        kind, *values = line.split()
+        if kind == "wall":
+            wall, modules = float(values[0]), int(values[1])
+        elif kind == "heavy":
+            heavy = values
+
+    # Cumulative time (including everything it imported first) of each
+    # top-level package and of each of the app's own modules.
+    costs: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match is None:
+            continue
+        name = match[3]
+        if "." not in name or name.startswith("app."):
+            costs[name] = int(match[2])
+    return wall, modules, heavy, costs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roles", nargs="+", default=["scam", "signals", "all"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="imports listed per role")
+    args = parser.parse_args()
+
+    for role in args.roles:
+        runs = [_run(role) for _ in range(args.repeats)]
+        walls = [run[0] for run in runs]
+        _, modules, heavy, _ = runs[-1]
+        costs: dict[str, list[int]] = defaultdict(list)
+        for run in runs:
+            for name, us in run[3].items():
+                costs[name].append(us)
+
+        print(f"\nrole={role}")
+        print(
+            f"  import app.main: median {statistics.median(walls) * 1000:.0f} ms, "
+            f"min {min(walls) * 1000:.0f} ms, {modules} modules"
+        )
+        print(f"  heavy packages loaded: {', '.join(heavy) or 'none'}")
+        print(f"  {'import':>32} {'ms':>8}")
+        ranked = sorted(costs.items(), key=lambda item: -statistics.median(item[1]))
+        for name, samples in ranked[: args.top]:
+            print(f"  {name:>32} {statistics.median(samples) / 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
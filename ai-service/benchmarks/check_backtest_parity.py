@@ -0,0 +1,145 @@
+"""Parity check of the vectorised backtest engine against the scalar code.
+
+Runs in a few seconds on random-walk daily candles and exits non-zero on a
+mismatch; the Docker build runs it, so drift fails the image build:
+
+* ``indicator_series`` at sampled bars vs ``TechnicalAnalyzer.analyze`` on
+  the candles up to that bar, on its NumPy fallback path -- must agree to
+  floating-point rounding;
+* ``score_series`` vs ``get_signal_from_technicals`` on the same indicator
+  values, for every bar of a few symbols -- must agree exactly.
+
+When pandas-ta is installed, the largest difference from ``analyze()``'s
+pandas-ta path is also reported per indicator (bars with at least
+``--warm-up`` bars of history).  That path seeds its EMA and RSI averages
+differently (see :mod:`app.services.backtest`), so these figures are
+informational only.
+
+Usage::
+
+    python -m benchmarks.check_backtest_parity [--samples 200] [--warm-up 100] [--seed 7]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from app.models.schemas import CandleData
+from app.services import technical
+from app.services.backtest import BUY, SELL, indicator_series, score_series
+from app.services.indicator_engine import INDICATOR_KEYS
+from app.services.technical import ScoringRules, TechnicalAnalyzer
+
+_CODES = {"BUY": BUY, "SELL": SELL, "HOLD": 0}
+
+# Largest relative indicator error accepted on the NumPy fallback path.
+TOLERANCE = 1e-9
+
+
+def random_panel(
+    rng: np.random.Generator, n_symbols: int, n_bars: int
+) -> tuple[np.ndarray, np.ndarray]:
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.02, (n_symbols, n_bars)), axis=1))
+    volume = rng.lognormal(14, 0.6, (n_symbols, n_bars))
+    return close, volume
+
+
+def to_candles(close: np.ndarray, volume: np.ndarray) -> list[CandleData]:
+    return [
+        CandleData(time=1_700_000_000 + 86_400 * t, open=c, high=c, low=c, close=c, volume=v)
+        for t, (c, v) in enumerate(zip(close.tolist(), volume.tolist()))
+    ]
+
+
+def check_indicator_parity(
+    analyzer: TechnicalAnalyzer,
+    rng: np.random.Generator,
+    samples: int,
+    use_pandas_ta: bool = False,
+    min_history: int = 1,
+) -> dict[str, float]:
+    """Largest relative difference per indicator over *samples* random bars."""
+    n_symbols, n_bars = 8, 300
+    close, volume = random_panel(rng, n_symbols, n_bars)
+    lengths = rng.integers(min_history, n_bars + 1, size=n_symbols)
+    series = indicator_series(close, volume, lengths)
+    worst = dict.fromkeys(INDICATOR_KEYS, 0.0)
+    saved = technical.HAS_PANDAS_TA
+    technical.HAS_PANDAS_TA = use_pandas_ta
+    try:
+        for _ in range(samples):
+            i = int(rng.integers(0, n_symbols))
+            first = n_bars - int(lengths[i])
+            t = int(rng.integers(first + min_history - 1, n_bars))
+            reference = analyzer.analyze(
+                to_candles(close[i, first : t + 1], volume[i, first : t + 1])
+            )
+            for key in INDICATOR_KEYS:
+                expected = reference[key]
+                if np.isnan(expected):
+                    continue
+                error = abs(expected - series[key][i, t]) / max(1.0, abs(expected))
+                worst[key] = max(worst[key], error)
+    finally:
+        technical.HAS_PANDAS_TA = saved
+    return worst
+
+
+def check_score_parity(
+    analyzer: TechnicalAnalyzer, rng: np.random.Generator, rules: ScoringRules
+) -> tuple[int, int, float]:
+    """Signal mismatches, bars compared and largest confidence difference."""
+    close, volume = random_panel(rng, 4, 1_000)
+    series = indicator_series(close, volume)
+    signal, confidence = score_series(series, rules)
+    mismatches = 0
+    worst = 0.0
+    for i in range(close.shape[0]):
+        for t in range(close.shape[1]):
+            values = {key: float(series[key][i, t]) for key in INDICATOR_KEYS}
+            expected, expected_confidence = analyzer.get_signal_from_technicals(values, rules)
+            mismatches += _CODES[expected] != signal[i, t]
+            worst = max(worst, abs(expected_confidence - confidence[i, t]))
+    return mismatches, signal.size, worst
+
+
+def run(samples: int, warm_up: int, seed: int) -> bool:
+    """Run every check, print the results and return whether they passed."""
+    rng = np.random.default_rng(seed)
+    analyzer = TechnicalAnalyzer()
+    passed = True
+
+    worst = max(check_indicator_parity(analyzer, rng, samples).values())
+    print(f"indicator parity vs analyze() ({samples} sampled bars): max rel. error {worst:.2e}")
+    passed &= worst < TOLERANCE
+
+    for rules in (ScoringRules(), ScoringRules(rsi_oversold=25, macd_scale=25, bb_low=0.1)):
+        mismatches, total, worst = check_score_parity(analyzer, rng, rules)
+        print(f"score parity vs get_signal_from_technicals: {mismatches}/{total} signal "
+              f"mismatches, max confidence diff {worst:.1e}")
+        passed &= mismatches == 0 and worst == 0.0
+
+    if technical.HAS_PANDAS_TA:
+        drift = check_indicator_parity(
+            analyzer, rng, samples, use_pandas_ta=True, min_history=warm_up
+        )
+        print(f"\npandas-ta path (seeded differently; bars with >= {warm_up} bars of history):")
+        for key, error in drift.items():
+            print(f"  {key:>16} max rel. diff {error:.2e}")
+
+    print("\nparity OK" if passed else "\nparity FAILED")
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200, help="bars compared per indicator check")
+    parser.add_argument("--warm-up", type=int, default=100, help="history before pandas-ta bars are compared")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.samples, args.warm_up, args.seed) else 1)
+
+
+if __name__ == "__main__":
+    main()
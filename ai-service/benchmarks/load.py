@@ -0,0 +1,372 @@
+"""Load benchmark of the ai-service HTTP endpoints against local stub upstreams.
+
+Boots two processes -- the stub Anthropic endpoint
+(:mod:`benchmarks.stubs`), and ``app.main:app`` with a synthetic candle
+source (:mod:`benchmarks.load_app`) pointed at it -- then drives each
+endpoint at fixed concurrency levels and reports throughput, error counts
+and p50/p95/p99 latency.  Results are written as JSON (with the git commit
+and every knob used) so runs can be diffed; ``--baseline`` prints the
+change against an earlier result file.
+
+Response caches are disabled unless ``--caches`` is given, so every
+request reaches the stubs, and payloads are unique per request.  Output of
+the stub and service processes goes to a ``.log`` file next to the result.
+
+Endpoints: ``scam`` (POST /analyze/scam), ``analyze`` (POST /analyze),
+``signals`` (GET /signals/generate), ``sentiment`` (POST /sentiment/analyze).
+
+Usage::
+
+    python -m benchmarks.load [--endpoints scam analyze signals sentiment]
+        [--concurrency 1 8 32] [--requests 200] [--llm-latency-ms 800]
+        [--llm-failure-rate 0.01] [--candle-latency-ms 150] [--output var/bench/load.json]
+        [--baseline var/bench/previous.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+import numpy as np
+
+_SYMBOLS = [f"SYM{i:03d}" for i in range(200)]
+_SCAM_TEMPLATES = (
+    "Your account #{i} has been suspended. Verify your identity within 24 hours at "
+    "http://secure-login-{i}.example.com or it will be closed permanently.",
+    "Hi, this is the delivery team. Parcel {i} is held at customs; pay the $2.99 fee "
+    "using the link below to release it.",
+    "Reminder: the team meeting for project {i} moved to Thursday at 10am, room 4B.",
+)
+
+
+# ---------------------------------------------------------------------------
+# Request factories: (method, path, httpx kwargs) for request number i
+# ---------------------------------------------------------------------------
+
+
+def _scam_request(i: int, args: argparse.Namespace) -> tuple[str, str, dict[str, Any]]:
+    content = _SCAM_TEMPLATES[i % len(_SCAM_TEMPLATES)].format(i=i)
+    return "POST", "/analyze/scam", {"json": {"type": "email", "content": content}}
+
+
+def _analyze_request(i: int, args: argparse.Namespace) -> tuple[str, str, dict[str, Any]]:
+    return "POST", "/analyze", {"json": {"symbol": _SYMBOLS[i % len(_SYMBOLS)]}}
+
+
+def _signals_request(i: int, args: argparse.Namespace) -> tuple[str, str, dict[str, Any]]:
+    n = args.symbols_per_request
+    symbols = [_SYMBOLS[(i * n + j) % len(_SYMBOLS)] for j in range(n)]
+    return "GET", "/signals/generate", {"params": {"symbols": ",".join(symbols)}}
+
+
+def _sentiment_request(i: int, args: argparse.Namespace) -> tuple[str, str, dict[str, Any]]:
+    articles = [
+        {
+            "headline": f"Company {i}-{j} shares move after quarterly update",
+            "summary": f"Analysts revised estimates for company {i}-{j} following the report.",
+        }
+        for j in range(args.articles_per_request)
+    ]
+    return "POST", "/sentiment/analyze", {"json": {"articles": articles}}
+
+
+_ENDPOINTS: dict[str, Callable[[int, argparse.Namespace], tuple[str, str, dict[str, Any]]]] = {
+    "scam": _scam_request,
+    "analyze": _analyze_request,
+    "signals": _signals_request,
+    "sentiment": _sentiment_request,
+}
+
+
+# ---------------------------------------------------------------------------
+# Processes
+# ---------------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+
+def _start_processes(
+    args: argparse.Namespace, candle_dir: str, log: Any
+) -> tuple[list[subprocess.Popen], str]:
+    llm_port, app_port = _free_port(), _free_port()
+    seed = [] if args.seed is None else ["--seed", str(args.seed)]
+    llm = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.stubs",
+            "--port", str(llm_port),
+            "--latency-ms", str(args.llm_latency_ms),
+            "--latency-sigma", str(args.llm_latency_sigma),
+            "--ms-per-entry", str(args.llm_ms_per_entry),
+            "--failure-rate", str(args.llm_failure_rate),
+            *seed,
+        ],
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    processes = [llm]
+    try:
+        _wait_ready(f"http://127.0.0.1:{llm_port}/health", llm)
+
+        env = {
+            **os.environ,
+            "SERVICE_ROLE": "all",
+            "ANTHROPIC_API_KEY": "stub-key",
+            "ANTHROPIC_BASE_URL": f"http://127.0.0.1:{llm_port}",
+            "CANDLE_STORE_DIR": candle_dir,
+            "CANDLE_REFRESH_INTERVAL": str(args.candle_refresh_interval),
+        }
+        if args.llm_retries is not None:
+            env["ANTHROPIC_MAX_RETRIES"] = str(args.llm_retries)
+        if not args.caches:
+            for name in (
+                "SCAM_CACHE_ENABLED",
+                "SCAM_NEAR_DUPLICATE_ENABLED",
+                "SIGNAL_CACHE_ENABLED",
+                "SENTIMENT_CACHE_ENABLED",
+            ):
+                env[name] = "false"
+        app = subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.load_app",
+                "--port", str(app_port),
+                "--candle-latency-ms", str(args.candle_latency_ms),
+                "--candle-latency-sigma", str(args.candle_latency_sigma),
+                "--candle-failure-rate", str(args.candle_failure_rate),
+                *seed,
+            ],
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        processes.append(app)
+        _wait_ready(f"http://127.0.0.1:{app_port}/health", app)
+    except Exception:
+        _stop_processes(processes)
+        raise
+    return processes, f"http://127.0.0.1:{app_port}"
+
+
+def _stop_processes(processes: list[subprocess.Popen]) -> None:
+    for process in reversed(processes):
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+
+async def _drive(
+    base_url: str,
+    endpoint: str,
+    concurrency: int,
+    args: argparse.Namespace,
+    first_request: int,
+) -> dict[str, Any]:
+    """Send ``args.requests`` requests from *concurrency* workers; summarise them."""
+    factory = _ENDPOINTS[endpoint]
+    latencies: list[float] = []
+    statuses: Counter[str] = Counter()
+    counter = iter(range(first_request, first_request + args.requests))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+
+        async def worker() -> None:
+            for i in counter:
+                method, path, kwargs = factory(i, args)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    status = str(response.status_code)
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[status] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    ok = sum(n for status, n in statuses.items() if status.startswith("2"))
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "statuses": dict(sorted(statuses.items())),
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(float(ms.mean()), 1),
+            "p50": round(float(np.percentile(ms, 50)), 1),
+            "p95": round(float(np.percentile(ms, 95)), 1),
+            "p99": round(float(np.percentile(ms, 99)), 1),
+            "max": round(float(ms.max()), 1),
+        },
+    }
+
+
+async def _run_all(base_url: str, args: argparse.Namespace) -> list[dict[str, Any]]:
+    results = []
+    # Request numbers never repeat within a run, so payloads stay unique.
+    next_request = 0
+    for endpoint in args.endpoints:
+        if args.warmup:
+            warm = argparse.Namespace(**{**vars(args), "requests": args.warmup})
+            await _drive(base_url, endpoint, 1, warm, next_request)
+            next_request += args.warmup
+        for concurrency in args.concurrency:
+            result = await _drive(base_url, endpoint, concurrency, args, next_request)
+            next_request += args.requests
+            results.append(result)
+            latency = result["latency_ms"]
+            print(
+                f"{endpoint:>10} {concurrency:>5} {result['throughput_rps']:>9.1f} "
+                f"{latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f} "
+                f"{result['errors']:>7}"
+            )
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_baseline_diff(results: list[dict[str, Any]], baseline_path: str) -> None:
+    baseline = {
+        (r["endpoint"], r["concurrency"]): r
+        for r in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    print(f"\nchange vs {baseline_path}:")
+    print(f"{'endpoint':>10} {'conc':>5} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for result in results:
+        before = baseline.get((result["endpoint"], result["concurrency"]))
+        if before is None:
+            continue
+
+        def change(new: float, old: float) -> str:
+            return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+        print(
+            f"{result['endpoint']:>10} {result['concurrency']:>5} "
+            f"{change(result['throughput_rps'], before['throughput_rps']):>9} "
+            + " ".join(
+                f"{change(result['latency_ms'][q], before['latency_ms'][q]):>9}"
+                for q in ("p50", "p95", "p99")
+            )
+        )
+
+
+def run(args: argparse.Namespace) -> None:
+    output = Path(args.output or f"var/bench/load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    log_path = output.with_suffix(".log")
+    with (
+        tempfile.TemporaryDirectory(prefix="bench-candles-") as candle_dir,
+        log_path.open("w") as log,
+    ):
+        processes, base_url = _start_processes(args, candle_dir, log)
+        try:
+            print(f"{'endpoint':>10} {'conc':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} "
+                  f"{'p99 ms':>9} {'errors':>7}")
+            results = asyncio.run(_run_all(base_url, args))
+        finally:
+            _stop_processes(processes)
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "baseline")}
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": config,
+        "results": results,
+    }
+    output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    print(f"\nresults written to {output} (service logs: {log_path})")
+    if args.baseline:
+        _print_baseline_diff(results, args.baseline)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", nargs="+", choices=list(_ENDPOINTS), default=list(_ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="per endpoint and concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--symbols-per-request", type=int, default=5)
+    parser.add_argument("--articles-per-request", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="median latency")
+    parser.add_argument("--llm-latency-sigma", type=float, default=0.35, help="log-normal sigma")
+    parser.add_argument("--llm-ms-per-entry", type=float, default=40.0)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--llm-retries", type=int, default=None, help="default: the app's setting")
+    parser.add_argument("--candle-latency-ms", type=float, default=150.0, help="median latency")
+    parser.add_argument("--candle-latency-sigma", type=float, default=0.5)
+    parser.add_argument("--candle-failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--candle-refresh-interval",
+        type=float,
+        default=0.0,
+        help="seconds stored candles stay fresh (0 = hit the candle source on every request)",
+    )
+    parser.add_argument("--caches", action="store_true", help="keep the response caches enabled")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="result file (default var/bench/load-<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
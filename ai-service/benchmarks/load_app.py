@@ -0,0 +1,45 @@
+"""Serve ``app.main:app`` for the load benchmark, with a synthetic candle source.
+
+Started by :mod:`benchmarks.load` in its own process.  Market data comes
+from :class:`benchmarks.stubs.SyntheticFetcher` instead of the configured
+fetcher; every other setting (the Anthropic base URL, caches, limits) is
+read from the environment as usual.  Run it with ``SERVICE_ROLE=all`` (as
+:mod:`benchmarks.load` does) so every benchmarked endpoint is mounted.
+
+Usage::
+
+    SERVICE_ROLE=all python -m benchmarks.load_app [--port 8900] [--candle-latency-ms 150] [--candle-failure-rate 0.01]
+"""
+
+import argparse
+
+import uvicorn
+
+from app.config import settings
+from app.main import app
+from app.services.signal_generator import signal_generator
+
+from .stubs import LatencyModel, SyntheticFetcher
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--candle-latency-ms", type=float, default=150.0, help="median latency")
+    parser.add_argument("--candle-latency-sigma", type=float, default=0.5)
+    parser.add_argument("--candle-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    signal_generator.candle_store.fetcher = SyntheticFetcher(
+        LatencyModel(
+            args.candle_latency_ms, args.candle_latency_sigma, args.candle_failure_rate, args.seed
+        ),
+        bars=settings.candle_window,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
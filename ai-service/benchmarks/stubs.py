@@ -0,0 +1,233 @@
+"""Local stand-ins for the service's upstreams, used by the load benchmark.
+
+* :func:`stub_llm_app` -- a fake Anthropic ``POST /v1/messages`` endpoint.
+  It answers every forced tool call with an input generated from the tool's
+  JSON schema (one entry per key for keyed tools), after a latency drawn
+  from a :class:`LatencyModel`, and fails a configurable share of requests
+  with ``529 overloaded_error``.  Streaming is not supported.
+* :class:`SyntheticFetcher` -- a ``CandleFetcher`` returning deterministic
+  random-walk daily candles per symbol, with the same latency and failure
+  knobs.
+
+Run the LLM stub on its own (the app then needs ``ANTHROPIC_BASE_URL``)::
+
+    python -m benchmarks.stubs [--port 8901] [--latency-ms 800] [--failure-rate 0.01]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.services.candles import CandleArrays
+
+# How each keyed tool's prompt names its entries (repair prompts use "Entry").
+_KEY_PATTERNS = {
+    "record_analyses": re.compile(r"^=== (\S+) \(current price", re.M),
+    "record_verdicts": re.compile(r"^Message (\d+)$", re.M),
+    "record_sentiments": re.compile(r"^(\d+)\. Headline", re.M),
+}
+_REPAIR_KEYS = re.compile(r'^Entry "([^"]+)"', re.M)
+
+
+@dataclass
+class LatencyModel:
+    """Log-normal latency around *median_ms*, plus a share of failed calls."""
+
+    median_ms: float = 0.0
+    sigma: float = 0.0
+    failure_rate: float = 0.0
+    seed: Optional[int] = None
+    _rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def sample(self) -> float:
+        """Return a latency in seconds."""
+        if self.median_ms <= 0:
+            return 0.0
+        return self.median_ms * self._rng.lognormvariate(0.0, self.sigma) / 1000
+
+    def fails(self) -> bool:
+        return self._rng.random() < self.failure_rate
+
+
+# ---------------------------------------------------------------------------
+# Anthropic messages stub
+# ---------------------------------------------------------------------------
+
+
+def _sample(schema: dict[str, Any], defs: dict[str, Any], rng: random.Random) -> Any:
+    """Return a value that validates against *schema*."""
+    if "$ref" in schema:
+        return _sample(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, rng)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"] or schema["anyOf"]
+        return _sample(options[0], defs, rng)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _sample(prop, defs, rng) for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [_sample(schema.get("items", {}), defs, rng) for _ in range(2)]
+    if kind == "integer":
+        return rng.randint(int(schema.get("minimum", 0)), int(schema.get("maximum", 100)))
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 0.0), schema.get("maximum", 1.0)), 4)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    return "Stub response text."
+
+
+def stub_llm_app(latency: LatencyModel, ms_per_entry: float = 0.0) -> Starlette:
+    """Return an ASGI app serving a fake ``POST /v1/messages``."""
+    rng = random.Random(latency.seed)
+    counters = {"requests": 0, "failures": 0}
+
+    async def messages(request: Request) -> JSONResponse:
+        body = await request.json()
+        counters["requests"] += 1
+        if body.get("stream"):
+            return _error(400, "invalid_request_error", "the stub does not stream")
+
+        tool = body["tools"][0]
+        schema = tool["input_schema"]
+        defs = schema.get("$defs", {})
+        prompt = body["messages"][-1]["content"]
+        if "additionalProperties" in schema:
+            pattern = _KEY_PATTERNS.get(tool["name"])
+            keys = _REPAIR_KEYS.findall(prompt) or (pattern.findall(prompt) if pattern else [])
+            tool_input = {key: _sample(schema["additionalProperties"], defs, rng) for key in keys}
+            entries = len(keys)
+        else:
+            tool_input = _sample(schema, defs, rng)
+            entries = 1
+
+        await asyncio.sleep(latency.sample() + ms_per_entry * entries / 1000)
+        if latency.fails():
+            counters["failures"] += 1
+            return _error(529, "overloaded_error", "stub overloaded")
+
+        return JSONResponse(
+            {
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "stub"),
+                "content": [
+                    {
+                        "type": "tool_use",
+                        "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                        "name": tool["name"],
+                        "input": tool_input,
+                    }
+                ],
+                "stop_reason": "tool_use",
+                "stop_sequence": None,
+                "usage": {
+                    "input_tokens": len(json.dumps(body)) // 4,
+                    "output_tokens": len(json.dumps(tool_input)) // 4,
+                    "cache_creation_input_tokens": 0,
+                    "cache_read_input_tokens": 0,
+                },
+            }
+        )
+
+    async def health(_: Request) -> JSONResponse:
+        return JSONResponse(counters)
+
+    return Starlette(
+        routes=[
+            Route("/v1/messages", messages, methods=["POST"]),
+            Route("/health", health),
+        ]
+    )
+
+
+def _error(status: int, kind: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        {"type": "error", "error": {"type": kind, "message": message}}, status_code=status
+    )
+
+
+# ---------------------------------------------------------------------------
+# Candle source stub
+# ---------------------------------------------------------------------------
+
+
+class SyntheticFetcher:
+    """``CandleFetcher`` serving random-walk daily candles after a simulated delay.
+
+    Each symbol always gets the same series (seeded by its name), ending at
+    today's midnight UTC, so incremental fetches return no new bars.
+    """
+
+    def __init__(self, latency: LatencyModel, bars: int = 63) -> None:
+        self.latency = latency
+        self.bars = bars
+        self.calls = 0
+
+    def fetch(self, symbol: str, since: Optional[int]) -> CandleArrays:
+        self.calls += 1
+        time.sleep(self.latency.sample())  # runs on the I/O executor
+        if self.latency.fails():
+            raise ConnectionError(f"synthetic market data failure for {symbol}")
+
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, self.bars)))
+        spread = close * rng.uniform(0.002, 0.02, self.bars)
+        today = int(time.time()) // 86_400 * 86_400
+        times = today - 86_400 * np.arange(self.bars - 1, -1, -1, dtype=np.int64)
+        candles = CandleArrays(
+            times,
+            close * (1 + rng.normal(0, 0.003, self.bars)),
+            close + spread,
+            close - spread,
+            close,
+            rng.lognormal(14, 0.5, self.bars),
+        )
+        if since is not None:
+            candles = candles.tail(int(np.searchsorted(times, since, side="right")))
+        return candles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.35, help="log-normal sigma")
+    parser.add_argument("--ms-per-entry", type=float, default=40.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    latency = LatencyModel(args.latency_ms, args.latency_sigma, args.failure_rate, args.seed)
+    uvicorn.run(
+        stub_llm_app(latency, args.ms_per_entry),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()